@@ -1,10 +1,9 @@
-import pandas as pd
-from flask import Flask, render_template, request, redirect, url_for, flash, session
+from flask import Flask, render_template, request, redirect, url_for, flash, session, send_from_directory, jsonify, abort
 import os
 import csv
-import ast
+import uuid
+import shutil
 import plotly.io
-from plotly.io import to_html
 from werkzeug.utils import secure_filename
 
 
@@ -15,6 +14,13 @@ from functions.hrone_functions import (process_employee_hroneData,
 
 from functions.dashboard_function_new import *
 from functions.biometric_function_new import *
+from functions.result_cache import ResultCache
+from functions.shared_store import write_atomic
+from functions.processing_jobs import JobRunner
+from functions.fragment_cache import FragmentCache
+from functions.attendance_warehouse import AttendanceWarehouse
+from functions.attendance_history import AttendanceHistory
+from functions.multi_month import discover_biometric_files, ingest_biometric_folder, month_period
 
 app = Flask(__name__)
 app.secret_key = '123'  # Set a secret key for session management
@@ -23,15 +29,30 @@ app.secret_key = '123'  # Set a secret key for session management
 UPLOAD_FOLDER = os.path.join('static', 'resources', 'uploads')
 UPLOAD_FOLDER_BIOMETRIC = os.path.join('static', 'resources', 'uploads', 'BIOMETRIC_DATA')
 UPLOAD_FOLDER_HRONE = os.path.join('static', 'resources', 'uploads', 'HRONE_DATA')
+UPLOAD_FOLDER_STAGING = os.path.join('static', 'resources', 'uploads', 'STAGING')  # Uploads waiting for their processing job
 
 # Set Flask config values
 app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
 app.config['UPLOAD_FOLDER_BIOMETRIC'] = UPLOAD_FOLDER_BIOMETRIC
 app.config['UPLOAD_FOLDER_HRONE'] = UPLOAD_FOLDER_HRONE
+app.config['UPLOAD_FOLDER_STAGING'] = UPLOAD_FOLDER_STAGING
 app.config['ALLOWED_EXTENSIONS'] = {'xls', 'xlsx', 'csv'}
+app.config['RESULT_SNAPSHOT_FOLDER'] = os.path.join(app.instance_path, 'results')  # Shared by all worker processes
+app.config['ATTENDANCE_ENGINE'] = 'lazy'  # 'vectorized', 'fused', 'parallel', 'staged' (partial reruns after holiday
+                                          # edits), or 'reference' for the original chain of stage functions
+app.config['ATTENDANCE_WORKERS'] = None  # Processes of the 'parallel' engine (default: one per CPU)
+app.config['DASHBOARD_CACHE_SIZE'] = 32 * 1024 * 1024  # Characters of rendered dashboard HTML kept in memory
+app.config['DASHBOARD_WARM_EMPLOYEES'] = 50  # Dashboards rendered ahead of time after an upload
+app.config['PROCESSING_JOB_FOLDER'] = os.path.join(app.instance_path, 'jobs')  # Progress of upload processing jobs
+app.config['ATTENDANCE_WAREHOUSE'] = os.path.join(app.instance_path, 'attendance.sqlite3')  # Per-employee-day results of every month
 
 CREDENTIALS_FILE = os.path.join('static', 'resources', 'user_credentials', 'login_credential.csv')
 
+# plotly.js bundle shipped with the installed plotly package; the dashboard loads it once and
+# browsers cache it for a year (the URL carries the plotly version, so upgrades bypass the cache)
+PLOTLY_JS_FOLDER = os.path.join(os.path.dirname(plotly.__file__), 'package_data')
+PLOTLY_JS_MAX_AGE = 365 * 24 * 60 * 60
+
 # Helper function to check allowed file extensions
 def allowed_file(filename):
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in app.config['ALLOWED_EXTENSIONS']
@@ -72,103 +93,42 @@ def login():
 
 
 ################################ Home ##################################
-employee_dict = {}
-insights = {}
+# Processed results of each uploaded file, reused until the file or the rules change.
+# Results are published as memory-mapped snapshots, so gunicorn workers share one copy.
+result_cache = ResultCache(app.config['RESULT_SNAPSHOT_FOLDER'], app.config['ATTENDANCE_WORKERS'])
+
+# Rendered dashboard cards and figures per (dataset version, employee), least recently used evicted first
+dashboard_cache = FragmentCache(app.config['DASHBOARD_CACHE_SIZE'])
+
+# Uploaded files are processed in the background, one job at a time
+processing_jobs = JobRunner(app.config['PROCESSING_JOB_FOLDER'])
+
+# Per-employee-day results of every processed month, for indexed cross-month queries
+attendance_warehouse = AttendanceWarehouse(app.config['ATTENDANCE_WAREHOUSE'])
+
+# Date-range aggregates over the warehouse, rebuilt when another month has been loaded
+attendance_history = {'version': None, 'index': None}
+
+
+def load_attendance_history():
+    """Returns the AttendanceHistory of the warehouse, rebuilding it only after the warehouse changed."""
+    version = attendance_warehouse.version()
+    if attendance_history['version'] != version:
+        attendance_history['index'] = AttendanceHistory.from_warehouse(attendance_warehouse)
+        attendance_history['version'] = version
+    return attendance_history['index']
+
+
+def load_processed_month():
+    """Returns the processed results of the current biometric file, processing it only on a cache miss."""
+    saved_paths = load_saved_paths()
+    return result_cache.get(saved_paths['bio_path'], app.config['ATTENDANCE_ENGINE'],
+                            hrone_path=saved_paths.get('hrone_path'))
 
 
 @app.route('/home')
 def home():
-    load_saved_paths()
-    global report_html
-
-    global employee_dict
-    global insights
-
-    employee_dict = process_attendance_file(BIOMETRICPATH)
-    employee_dict = date_cleaning(employee_dict)
-    employee_dict = status_reset(employee_dict)
-    employee_dict = sunday_finder(employee_dict)
-    employee_dict = daily_working_hours_calculation_bulk(employee_dict)
-    employee_dict = fixed_holidays(employee_dict, holiday_dictionary)
-    employee_dict = absent_days(employee_dict)
-    employee_dict = calculate_daily_working_hours(employee_dict)
-    employee_dict, insights = missing_punch(employee_dict)
-    employee_dict = recalibrator(employee_dict)
-    employee_dict = half_day(employee_dict)
-    employee_dict = calculate_latemark(employee_dict)
-    employee_dict = early_leave(employee_dict)
-    employee_dict = nonworking_days_compoff(employee_dict)
-    employee_dict = overtime(employee_dict)
-    employee_dict = saturday_compoff(employee_dict)
-    employee_dict = calculate_metric(employee_dict)
-    employee_dict = finalAdjustment(employee_dict)
-    employee_dict = absentee_map(employee_dict)
-
-    ################### Ratios Calculation ##################
-
-    employee_dict = calculate_adherence_ratio(employee_dict)
-    employee_dict = calculate_work_deficit_ratio(employee_dict)
-    employee_dict = calculate_adjusted_absentee_rate(employee_dict)
-
-
-    # First, extract the data you need from each employee record
-    report_data = {}
-    for employee, data in employee_dict.items():
-        employee_data = {
-            'employeeId' : data['EmployeeID'],
-            'OfficeWorkingDays': data['reportMetric']['OfficeWorkingDays'],
-            'PublicHolidays': data['reportMetric']['PublicHolidays'],
-            'EmployeeTotalWorkingDay': data['reportMetric']['EmployeeTotalWorkingDay'],
-            'EmployeeTotalWorkingHours': data['reportMetric']['EmployeeTotalWorkingHours'],
-            'averageWorkingHour': data['averageWorkingHour'],
-            'incompleteHours': data['incompleteHours'],
-            'actualOverTime': data['actualOverTime'],
-            'payableOverTime': data['payableOverTime'],
-            'halfDayTotal': data['halfDayTotal'],
-            'lateMarkCount': data['lateMarkCount'],
-            'totalEarlyLeave': data['totalEarlyLeave'],
-
-            'compOff': data['compOff'],
-            'EmployeeActualAbsentee': data['reportMetric']['EmployeeActualAbsentee'],
-            'EmployeeAbsenteeWithLateMark': data['reportMetric']['EmployeeAbsenteeWithLateMark'],
-
-            # Main level fields
-
-            'averageInTime': data['averageInTime'],
-            'averageOutTime': data['averageOutTime'],
-
-        }
-        report_data[employee] = employee_data
-
-    # Create DataFrame from the flattened dictionary
-    reportDataframe = pd.DataFrame.from_dict(report_data, orient='index')
-    reportDataframe.reset_index(inplace=True)
-    reportDataframe.rename(columns={'index': 'Employee'}, inplace=True)
-
-    # Rename columns as per your requirements
-    reportDataframe.rename(columns={
-        'employeeId' : 'Biometric Id',
-        'OfficeWorkingDays': 'Office Working',
-        'EmployeeTotalWorkingDay': 'Employee Total Present',
-        'PublicHolidays': 'Public Holiday',
-        'EmployeeTotalWorkingHours': 'Employee Total Working Hours',
-        'EmployeeActualAbsentee': 'Physical Absentee',
-        'lateMarkAbsentee': 'Late Mark Absentee',
-        'lateMarkCount': 'Total Late Mark',
-        'EmployeeAbsenteeWithLateMark': 'Employee Total Absentee',
-        'compOff': 'Compensatory Off',
-        'actualOverTime': 'Over Time',
-        'payableOverTime': 'Payable Over Time',
-        'incompleteHours': 'Incomplete Hours',
-        'halfDayTotal': 'Total Half Days',
-        'totalEarlyLeave': 'Total Early Leaves',
-        'averageWorkingHour': 'Average Working Hours',
-        'averageInTime': 'Average In Time',
-        'averageOutTime': 'Average Out Time',
-    }, inplace=True)
-
-    # Convert DataFrame to HTML
-    report_html = reportDataframe.to_html(index=False)
+    load_processed_month()
 
     # Retrieve the user's name from the session
     user_name = session.get('name', 'User ')  # Default to 'User ' if not found
@@ -177,22 +137,25 @@ def home():
 
 @app.route('/user_dashboard', methods=['GET', 'POST'])
 def user_dashboard():
-    global employee_dict  # Ensure you're using the global variable
+    month = load_processed_month()
+    employee_dict = month.records
     employee_names = list(employee_dict.keys())  # Extract employee names
 
     employee_dict_dashboard = {}
-    total_work_hour_card = ""
-    average_work_hour_card = ""
-    actual_absantee_card = ""
-    late_mark_card = ""
     selected_employee = ""
-    target_gauge_html = ""
-    daily_working_trend_line_html = ""
-    status_donutChart_html = ""
-    heatmap_metric_html = ""
-    total_deduction_card = ""
-    overtime_barchart_html = ""
-    star_fig = ""
+    fragments = {
+        'total_work_hour_card': "",
+        'average_work_hour_card': "",
+        'actual_absantee_card': "",
+        'late_mark_card': "",
+        'total_deduction_card': "",
+        'target_gauge_html': "",
+        'daily_working_trend_line_html': "",
+        'status_donutChart_html': "",
+        'heatmap_metric_html': "",
+        'overtime_barchart_html': "",
+        'star_fig': "",
+    }
 
     # Handle POST request or default to first employee on GET request
     if request.method == 'POST':
@@ -202,155 +165,42 @@ def user_dashboard():
         if employee_names:
             selected_employee = employee_names[0]
 
-    # Process the selected employee data
+    # Render the selected employee's cards and figures, reusing them while the dataset is unchanged
     if selected_employee in employee_dict:
         employee_dict_dashboard = employee_dict[selected_employee]
-        total_work_hour_card = total_working_hours(employee_dict_dashboard)
-        average_work_hour_card = average_working_hours(employee_dict_dashboard)
-        actual_absantee_card = acutal_absantees(employee_dict_dashboard)
-        late_mark_card = late_marks_total(employee_dict_dashboard)
-        total_deduction_card = total_deduction(employee_dict_dashboard)
-
-        target_gauge = create_gauge_chart(employee_dict_dashboard)
-        target_gauge_html = to_html(target_gauge, full_html=False)
-
-        daily_working_trend_line = create_line_chart(employee_dict_dashboard)
-        daily_working_trend_line_html = to_html(daily_working_trend_line, full_html=False)
-
-        status_donutChart = create_donut_chart(employee_dict_dashboard)
-        status_donutChart_html = to_html(status_donutChart, full_html=False)
-
-        heatmap_metric = create_combined_barchart(employee_dict_dashboard)
-        heatmap_metric_html = to_html(heatmap_metric, full_html=False)
-
-        overtime_barchart = create_overtime_barchart(employee_dict_dashboard)
-        overtime_barchart_html = to_html(overtime_barchart, full_html=False)
-
-        star_fig = generate_star_rating_html(employee_dict_dashboard)
+        fragments = dashboard_cache.get_or_render(
+            (month.key, selected_employee),
+            lambda: render_dashboard_fragments(employee_dict_dashboard))
 
     return render_template('user_dashboard.html',
                            selected_employee=selected_employee,
                            employee_names=employee_names,
                            employee_dict=employee_dict,
                            employee_dict_dashboard=employee_dict_dashboard,
-                           total_work_hour_card=total_work_hour_card,
-                           average_work_hour_card=average_work_hour_card,
-                           actual_absantee_card=actual_absantee_card,
-                           late_mark_card=late_mark_card,
-                           total_deduction_card=total_deduction_card,
-                           target_gauge_html=target_gauge_html,
-                           daily_working_trend_line_html=daily_working_trend_line_html,
-                           status_donutChart_html=status_donutChart_html,
-                           heatmap_metric_html=heatmap_metric_html,
-                           overtime_barchart_html=overtime_barchart_html,
-                           star_fig=star_fig)
+                           plotly_js_url=url_for('plotly_js', v=plotly.__version__),
+                           **fragments)
+
+
+@app.route('/static/js/plotly.min.js')
+def plotly_js():
+    return send_from_directory(PLOTLY_JS_FOLDER, 'plotly.min.js', max_age=PLOTLY_JS_MAX_AGE)
 
 
 @app.route('/user_report')
 def user_report():
+    month = load_processed_month()
 
-    missing_data = process_missing_data(insights)
-    missing_data_html = missing_data.to_html(index=False)
-
+    # Admins see the admin report table, everyone else the user table
+    role = 'admin' if session.get('access') == 'admin' else 'user'
 
     return render_template('user_report.html',
-                           report_html=report_html,
-                           missing_data_html = missing_data_html)
+                           report_html=month.report_tables[role],
+                           missing_data_html = month.missing_data_html)
 
 ############################# ADMIN ################################
 @app.route('/admin')
 def admin():
-    load_saved_paths()
-    global report_html
-
-    global employee_dict
-    global insights
-
-    employee_dict = process_attendance_file(BIOMETRICPATH)
-    employee_dict = date_cleaning(employee_dict)
-    employee_dict = status_reset(employee_dict)
-    employee_dict = sunday_finder(employee_dict)
-    employee_dict = daily_working_hours_calculation_bulk(employee_dict)
-    employee_dict = fixed_holidays(employee_dict, holiday_dictionary)
-    employee_dict = absent_days(employee_dict)
-    employee_dict = calculate_daily_working_hours(employee_dict)
-    employee_dict, insights = missing_punch(employee_dict)
-    employee_dict = recalibrator(employee_dict)
-    employee_dict = half_day(employee_dict)
-    employee_dict = calculate_latemark(employee_dict)
-    employee_dict = early_leave(employee_dict)
-    employee_dict = nonworking_days_compoff(employee_dict)
-    employee_dict = overtime(employee_dict)
-    employee_dict = saturday_compoff(employee_dict)
-    employee_dict = calculate_metric(employee_dict)
-    employee_dict = finalAdjustment(employee_dict)
-    employee_dict = absentee_map(employee_dict)
-    ################### Ratios Calculation ##################
-
-    employee_dict = calculate_adherence_ratio(employee_dict)
-    employee_dict = calculate_work_deficit_ratio(employee_dict)
-    employee_dict = calculate_adjusted_absentee_rate(employee_dict)
-
-
-    # First, extract the data you need from each employee record
-    report_data = {}
-    for employee, data in employee_dict.items():
-        employee_data = {
-            'employeeId': data['EmployeeID'],
-            'CalenderDays': data['reportMetric']['CalenderDays'],
-            'TotalHolidays': data['reportMetric']['TotalHolidays'],
-            # 'OfficeWorkingDays': data['reportMetric']['OfficeWorkingDays'],
-            # 'PublicHolidays': data['reportMetric']['PublicHolidays'],
-            'EmployeeTotalWorkingDay': data['reportMetric']['EmployeeTotalWorkingDay'],
-            'EmployeeActualAbsentee': data['reportMetric']['EmployeeActualAbsentee'],
-            'EmployeeAbsenteeWithLateMark': data['reportMetric']['EmployeeAbsenteeWithLateMark'],
-            'EmployeeTotalWorkingHours': data['reportMetric']['EmployeeTotalWorkingHours'],
-            'averageWorkingHour': data['averageWorkingHour'],
-            'incompleteHours': data['incompleteHours'],
-            'actualOverTime': data['actualOverTime'],
-            'payableOverTime': data['payableOverTime'],
-            'lateMarkCount': data['lateMarkCount'],
-            'totalEarlyLeave': data['totalEarlyLeave'],
-            'compOff': data['compOff'],
-
-            # Main level fields
-            'averageInTime': data['averageInTime'],
-            'averageOutTime': data['averageOutTime'],
-
-        }
-        report_data[employee] = employee_data
-
-    # Create DataFrame from the flattened dictionary
-    reportDataframe = pd.DataFrame.from_dict(report_data, orient='index')
-    reportDataframe.reset_index(inplace=True)
-    reportDataframe.rename(columns={'index': 'Employee'}, inplace=True)
-
-    # Rename columns as per your requirements
-    reportDataframe.rename(columns={
-        'employeeId': 'Biometric Id',
-        'CalenderDays': 'Calender Days',
-        'TotalHolidays': 'Total Holidays',
-        # 'OfficeWorkingDays': 'Office Working',
-        'EmployeeTotalWorkingDay': 'Employee Present',
-        'EmployeeActualAbsentee': 'Physical Absentee',
-        'EmployeeAbsenteeWithLateMark': 'Employee Total Absentee',
-        # 'PublicHolidays': 'Public Holiday',
-        'EmployeeTotalWorkingHours': 'Employee Total Working Hours',
-        'lateMarkAbsentee': 'Late Mark Absentee',
-        'lateMarkCount': 'Total Late Mark',
-        'compOff': 'Compensatory Off',
-        'actualOverTime': 'Over Time',
-        'payableOverTime': 'Payable Over Time',
-        'incompleteHours': 'Incomplete Hours',
-        'totalEarlyLeave': 'Total Early Leaves',
-        'averageWorkingHour': 'Average Working Hours',
-        'averageInTime': 'Average In Time',
-        'averageOutTime': 'Average Out Time',
-
-    }, inplace=True)
-
-    # Convert DataFrame to HTML
-    report_html = reportDataframe.to_html(index=False)
+    load_processed_month()
 
     # Retrieve the user's name from the session
     user_name = session.get('name', 'User ')  # Default to 'User ' if not found
@@ -359,40 +209,136 @@ def admin():
 
 @app.route('/upload', methods=['GET', 'POST'])
 def upload():
-    global BIOMETRICPATH
-    global HRONEPATH
-
     # Define the path for saving file paths
     paths_file = os.path.join('static', 'paths.txt')
 
     if request.method == 'POST':
         biometric_file = request.files.get('biometric_file')
+        hrone_file = request.files.get('hrone_file')
         uploaded_files = []
 
-        # Create a dictionary to store paths
+        # Create dictionaries to store the final and the staged paths
         file_paths = {}
+        staged_paths = {}
 
-        # Save the biometric file
+        # Stage the biometric file; it replaces the file at its final path once it is processed
         if biometric_file and allowed_file(biometric_file.filename):
             # Get original filename and secure it
             biometric_filename = secure_filename(biometric_file.filename)
-            biometric_file_path = os.path.join(app.config['UPLOAD_FOLDER_BIOMETRIC'], biometric_filename)
-            biometric_file.save(biometric_file_path)
+            file_paths['bio_path'] = os.path.join(app.config['UPLOAD_FOLDER_BIOMETRIC'], biometric_filename)
+            staged_paths['bio_path'] = stage_upload(biometric_file, biometric_filename)
             uploaded_files.append(biometric_filename)
-            BIOMETRICPATH = biometric_file_path
-            file_paths['bio_path'] = BIOMETRICPATH
 
-        # Save the paths to a file
+            # The optional HROne register of the same month fills missing biometric punches
+            if hrone_file and allowed_file(hrone_file.filename):
+                hrone_filename = secure_filename(hrone_file.filename)
+                file_paths['hrone_path'] = os.path.join(app.config['UPLOAD_FOLDER_HRONE'], hrone_filename)
+                staged_paths['hrone_path'] = stage_upload(hrone_file, hrone_filename)
+                uploaded_files.append(hrone_filename)
+
+        # Process the new file in the background; pages keep showing the previous file until it is ready
+        status_url = None
         if file_paths:
-            with open(paths_file, 'w') as f:
-                for key, value in file_paths.items():
-                    f.write(f"{key}:{value}\n")
+            job = processing_jobs.submit(process_upload, paths_file, staged_paths, file_paths)
+            status_url = url_for('upload_status', job_id=job.job_id)
 
-        return render_template('upload_success.html', files=uploaded_files)
+        return render_template('upload_success.html', files=uploaded_files, status_url=status_url)
 
     return render_template('uploads.html')
 
 
+def stage_upload(file, filename):
+    """
+    Saves an uploaded file in a new folder of the staging area and returns its path.
+
+    The file keeps its name (the parser reads the month and year from it).
+    """
+    staging_folder = os.path.join(app.config['UPLOAD_FOLDER_STAGING'], uuid.uuid4().hex)
+    os.makedirs(staging_folder)
+    staged_path = os.path.join(staging_folder, filename)
+    file.save(staged_path)
+    return staged_path
+
+
+def discard_staged(staged_paths):
+    """Removes staged uploads, their staging folders and their entries in the result cache."""
+    for staged_path in staged_paths.values():
+        result_cache.forget_file(staged_path)
+        shutil.rmtree(os.path.dirname(staged_path), ignore_errors=True)
+
+
+def process_upload(job, paths_file, staged_paths, file_paths):
+    """
+    Background job of an upload: processes the staged files, switches the app over to them
+    and renders the dashboards of the first employees ahead of time.
+
+    The live files and static/paths.txt are only replaced after processing succeeded, so
+    until then every page keeps serving the previous results without waiting.
+
+    Args:
+        job (ProcessingJob): Progress of the job
+        paths_file (str): Path of static/paths.txt
+        staged_paths (dict): 'bio_path' (and 'hrone_path') -> staged upload
+        file_paths (dict): 'bio_path' (and 'hrone_path') -> final path of the upload
+    """
+    # Process the new file once; page loads in every worker reuse the published results
+    try:
+        month = result_cache.get(staged_paths['bio_path'], app.config['ATTENDANCE_ENGINE'], progress=job.start_stage,
+                                 hrone_path=staged_paths.get('hrone_path'))
+    except Exception:
+        discard_staged(staged_paths)
+        raise
+
+    # Move the files into place with their content hashes, then switch paths.txt over in one
+    # step so other workers never read it half written
+    for key, staged_path in staged_paths.items():
+        result_cache.move_file(staged_path, file_paths[key])
+    discard_staged(staged_paths)
+    write_atomic(paths_file, "".join(f"{key}:{value}\n" for key, value in file_paths.items()))
+
+    # Keep the month's per-day results for cross-month queries
+    job.start_stage('warehouse')
+    attendance_warehouse.load_month(month.records)
+
+    names = month.records.names[:app.config['DASHBOARD_WARM_EMPLOYEES']]
+    job.start_stage('dashboard_cache', total=len(names))
+    for done, name in enumerate(names, 1):
+        dashboard_cache.get_or_render((month.key, name), lambda: render_dashboard_fragments(month.records[name]))
+        job.advance(done)
+
+
+@app.route('/upload/status/<job_id>')
+def upload_status(job_id):
+    status = processing_jobs.status(job_id)
+    if status is None:
+        abort(404)
+    return jsonify(status)
+
+
+@app.route('/attendance/range')
+def attendance_range():
+    """
+    Date-range aggregates over every processed month as JSON, e.g.
+    /attendance/range?start=2025-01-15&end=2025-03-10&employee=<name>
+    Without an employee, the totals of the whole organisation are returned. Months processed
+    before the warehouse existed are loaded once with 'flask --app app backfill-warehouse'.
+    """
+    start_date, end_date = request.args.get('start'), request.args.get('end')
+    employee = request.args.get('employee')
+    if not start_date or not end_date:
+        return jsonify({'error': "'start' and 'end' dates (YYYY-MM-DD) are required"}), 400
+
+    history = load_attendance_history()
+    try:
+        if employee:
+            totals = history.employee_totals(employee, start_date, end_date)
+        else:
+            totals = history.org_totals(start_date, end_date)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    return jsonify({'start': start_date, 'end': end_date, 'employee': employee, 'totals': totals})
+
+
 @app.route('/record', methods=['GET', 'POST'])
 def record():
     if request.method == 'POST':
@@ -410,19 +356,77 @@ def logout():
 
 
 def load_saved_paths():
-    global BIOMETRICPATH
-    global HRONEPATH
-
+    """Returns the saved upload paths ('bio_path', 'hrone_path') from static/paths.txt."""
     paths_file = os.path.join('static', 'paths.txt')
+    saved_paths = {}
 
     if os.path.exists(paths_file):
         with open(paths_file, 'r') as f:
             for line in f:
                 key, value = line.strip().split(':', 1)  # Split on first colon only
-                if key == 'bio_path':
-                    BIOMETRICPATH = value
-                elif key == 'hrone_path':
-                    HRONEPATH = value
+                if key in ('bio_path', 'hrone_path'):
+                    saved_paths[key] = value
+    return saved_paths
+
+
+def backfill_warehouse():
+    """
+    Loads the months the warehouse does not hold yet, e.g. after a fresh deploy or for
+    exports uploaded before the warehouse existed (flask --app app backfill-warehouse).
+
+    The current month is loaded from its processed results (with the HROne register merged
+    in); the other exports of BIOMETRIC_DATA are processed with ingest_biometric_folder.
+
+    Returns:
+        int: Number of months loaded
+    """
+    loaded = attendance_warehouse.loaded_periods()
+    stores = []
+    if 'bio_path' in load_saved_paths():
+        try:
+            current_month = load_processed_month()
+        except (OSError, ValueError) as e:
+            print(f"Warning: Could not process the current upload: {e}")
+        else:
+            dates = [day_date_key(day) for day in current_month.records.days if isinstance(day, str)]
+            periods = {date[:7] for date in dates if date}
+            if not periods <= loaded:
+                stores.append(current_month.records)
+                loaded |= periods
+
+    folder = app.config['UPLOAD_FOLDER_BIOMETRIC']
+    if os.path.isdir(folder):
+        missing = {month_key for month_key, _ in discover_biometric_files(folder)
+                   if month_period(month_key) not in loaded}
+        if missing:
+            history = ingest_biometric_folder(folder, app.config['ATTENDANCE_ENGINE'],
+                                              app.config['ATTENDANCE_WORKERS'], month_keys=missing)
+            stores.extend(history.months.values())
+
+    for store in stores:
+        attendance_warehouse.load_month(store)
+    return len(stores)
+
+
+@app.cli.command('backfill-warehouse')
+def backfill_warehouse_command():
+    """Loads the processed months missing from the attendance warehouse."""
+    print(f"Loaded {backfill_warehouse()} month(s) into the attendance warehouse")
+
+
+def warm_start():
+    """Maps the published results of the current upload, so a new worker serves them without processing."""
+    saved_paths = load_saved_paths()
+    if 'bio_path' not in saved_paths:
+        return
+    try:
+        result_cache.load_published(saved_paths['bio_path'], app.config['ATTENDANCE_ENGINE'],
+                                    hrone_path=saved_paths.get('hrone_path'))
+    except (OSError, ValueError) as e:
+        print(f"Warning: Could not load the published results at startup: {e}")
+
+
+warm_start()
 
 if __name__ == '__main__':
 
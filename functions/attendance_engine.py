@@ -0,0 +1,413 @@
+from functions.biometric_function_new import *
+from functions.time_utils import MISSING_MINUTES, duration_minutes
+from functions.month_calendar import month_calendar
+from functions.holiday_calendar import load_holiday_calendar
+
+# Engine modes accepted by run_attendance_pipeline
+#   fused      -> one per-employee pass over the month (default)
+#   vectorized -> numpy matrix operations over employees x days (returns an AttendanceStore)
+#   lazy       -> vectorized, keeping only aggregates; dashboard-only per-day series are
+#                 computed per employee on first access
+#   parallel   -> fused, with large months sharded by employee across worker processes
+#                 (returns an AttendanceStore)
+#   staged     -> the stage functions of the reference chain run as a dependency graph
+#                 (functions.stage_graph), keeping every stage's output for partial reruns
+#   reference  -> the original chain of stage functions, kept for cross-checking
+ENGINE_MODES = ('fused', 'vectorized', 'lazy', 'parallel', 'staged', 'reference')
+
+# Bump whenever an attendance rule changes, so results cached per dataset are recomputed
+RULES_REVISION = 1
+
+
+def run_reference_pipeline(employee_dict, holidays=None):
+    """
+    Runs the original chain of stage functions, each walking every employee and day.
+
+    Args:
+        employee_dict (dict): Parsed attendance dictionary from process_attendance_file
+        holidays (HolidayCalendar): Holidays to apply (default: load_holiday_calendar())
+
+    Returns:
+        tuple: (employee_dict, missing_punch_insights)
+    """
+    if holidays is None:
+        holidays = load_holiday_calendar()
+
+    employee_dict = date_cleaning(employee_dict)
+    employee_dict = status_reset(employee_dict)
+    employee_dict = sunday_finder(employee_dict)
+    employee_dict = daily_working_hours_calculation_bulk(employee_dict)
+    employee_dict = fixed_holidays(employee_dict, holidays)
+    employee_dict = absent_days(employee_dict)
+    employee_dict = calculate_daily_working_hours(employee_dict)
+    employee_dict, insights = missing_punch(employee_dict)
+    employee_dict = recalibrator(employee_dict)
+    employee_dict = half_day(employee_dict)
+    employee_dict = calculate_latemark(employee_dict)
+    employee_dict = early_leave(employee_dict)
+    employee_dict = nonworking_days_compoff(employee_dict)
+    employee_dict = overtime(employee_dict)
+    employee_dict = saturday_compoff(employee_dict)
+    employee_dict = calculate_metric(employee_dict)
+    employee_dict = finalAdjustment(employee_dict)
+    employee_dict = absentee_map(employee_dict)
+
+    ################### Ratios Calculation ##################
+
+    employee_dict = calculate_adherence_ratio(employee_dict)
+    employee_dict = calculate_work_deficit_ratio(employee_dict)
+    employee_dict = calculate_adjusted_absentee_rate(employee_dict)
+
+    return employee_dict, insights
+
+
+def build_month_calendar(days, holidays):
+    """
+    Returns the per-day facts shared by every employee of a month.
+
+    Args:
+        days (list): Day labels from process_attendance_file (e.g. '1 T (01 April 2025, Tuesday)')
+        holidays (HolidayCalendar): Holidays of the site, from load_holiday_calendar
+
+    Returns:
+        MonthCalendar: Shared calendar with cleaned day labels, weekday codes and holiday mask
+    """
+    return month_calendar(days, holidays)
+
+
+def evaluate_employee(record, calendar, expected_work_hours=9):
+    """
+    Applies every attendance rule of the reference chain to one employee.
+
+    Day-level rules (status transitions, working minutes, missing punches, half day,
+    late mark, early leave, comp-off, overtime) run in one loop over the month once the
+    average punch times are known; month-level rules (Saturday comp-off, report metric,
+    final adjustment, ratios) then run on the aggregates collected by that loop.
+
+    Args:
+        record (dict): Parsed record with employee_id, Days, Status, InTime and OutTime
+        calendar (MonthCalendar): Month calendar from build_month_calendar
+        expected_work_hours (int): Expected working hours per day
+
+    Returns:
+        tuple: (employee details dict, list of missing punch insights)
+    """
+    days = calendar.day_labels
+    is_sunday = calendar.is_sunday.tolist()
+    is_saturday = calendar.is_saturday.tolist()
+    is_holiday = calendar.is_holiday.tolist()
+    expected_work_minutes = expected_work_hours * 60
+
+    num_days = len(record['Status'])
+    status = ['NYD'] * num_days
+    in_times = record['InTime'].copy()
+    out_times = record['OutTime'].copy()
+    mark_sundays = len(days) == num_days
+
+    # Status up to absent days, daily working minutes and averages
+    daily_working_hours = []
+    total_working_minutes = 0
+    valid_in_times = []
+    valid_out_times = []
+    for i in range(num_days):
+        if mark_sundays and is_sunday[i]:
+            status[i] = 'WO'
+
+        in_time = in_times[i]
+        out_time = out_times[i]
+        if in_time != MISSING_MINUTES and out_time != MISSING_MINUTES:
+            duration = duration_minutes(in_time, out_time)
+            daily_working_hours.append(duration)
+            total_working_minutes += duration
+            valid_in_times.append(in_time)
+            valid_out_times.append(out_time)
+            if status[i] == 'NYD':
+                status[i] = 'P'
+            elif status[i] == 'WO':
+                status[i] = 'WOP'
+        else:
+            daily_working_hours.append(MISSING_MINUTES)
+
+        if is_holiday[i]:
+            if status[i] == 'NYD':
+                status[i] = 'HO'
+            elif status[i] == 'P':
+                status[i] = 'HOP'
+        elif status[i] == 'NYD' and in_time == MISSING_MINUTES and out_time == MISSING_MINUTES:
+            status[i] = 'A'
+
+    total_days = len(valid_in_times)
+    if total_days > 0:
+        average_working_hour = total_working_minutes // total_days
+        average_in_time = sum(valid_in_times) // total_days
+        average_out_time = sum(valid_out_times) // total_days
+    else:
+        average_working_hour = average_in_time = average_out_time = 0
+
+    # Missing punches through overtime, day by day
+    insights = []
+    half_day_map = [0] * num_days
+    late_mark = [0] * num_days
+    early_leave_map = [0] * num_days
+    early_leave_time = [0] * num_days
+    over_time = [0] * num_days
+    total_incomplete_minutes = 0
+    comp_off = 0
+    total_actual_overtime_minutes = 0
+    total_payable_overtime_minutes = 0
+
+    for i in range(num_days):
+        day_status = status[i]
+        in_time = in_times[i]
+        out_time = out_times[i]
+
+        if day_status == 'NYD' or (in_time != MISSING_MINUTES and out_time == MISSING_MINUTES):
+            if in_time != MISSING_MINUTES:
+                forgot_out = out_time == MISSING_MINUTES
+                if in_time < 11 * 60:
+                    insights.append({
+                        'day': days[i],
+                        'issue': 'Missing punch-out',
+                        'current_status': day_status,
+                        'recommendation': 'Update OutTime' if forgot_out else 'Update OutTime, change status to P'
+                    })
+                    out_time = average_out_time
+                    if not forgot_out:
+                        day_status = 'P'
+                else:
+                    insights.append({
+                        'day': days[i],
+                        'issue': 'Missing punch-in, OutTime recorded as InTime',
+                        'current_status': day_status,
+                        'recommendation': 'Move InTime to OutTime, set InTime to NaT, update status to P'
+                    })
+                    out_time = in_time
+                    in_time = MISSING_MINUTES
+                    day_status = 'P'
+                in_times[i] = in_time
+                out_times[i] = out_time
+
+        punched = in_time != MISSING_MINUTES and out_time != MISSING_MINUTES
+
+        if day_status == 'NYD' and punched:
+            daily_working_hours[i] = duration_minutes(in_time, out_time)
+            day_status = 'P'
+
+        daily_minutes = daily_working_hours[i]
+        if daily_minutes != MISSING_MINUTES and daily_minutes < 420:  # less than 7 hours
+            half_day_map[i] = 1
+            if day_status == 'P':
+                day_status = 'P1/2'
+            elif day_status == 'WO':
+                day_status = 'WOP1/2'
+            elif day_status == 'HO':
+                day_status = 'HOP1/2'
+
+        if in_time != MISSING_MINUTES and in_time > 10 * 60 + 30:  # After 10:30
+            late_mark[i] = 1
+
+        if day_status == 'P' and punched:
+            worked_minutes = duration_minutes(in_time, out_time)
+            if worked_minutes < expected_work_minutes:
+                early_leave_map[i] = 1
+                early_leave_time[i] = expected_work_minutes - worked_minutes
+                total_incomplete_minutes += early_leave_time[i]
+
+        if day_status in ('WOP', 'HOP') and punched:
+            comp_off += 1
+
+        if daily_minutes != MISSING_MINUTES:
+            if day_status in ('WOP', 'WOS', 'WOP1/2'):
+                over_time[i] = daily_minutes
+                total_actual_overtime_minutes += daily_minutes
+                total_payable_overtime_minutes += daily_minutes
+            elif daily_minutes > expected_work_minutes:
+                over_time[i] = daily_minutes - expected_work_minutes
+                total_actual_overtime_minutes += over_time[i]
+                if over_time[i] > 60:
+                    total_payable_overtime_minutes += over_time[i]
+
+        status[i] = day_status
+
+    late_count = sum(late_mark)
+
+    # Saturday comp-off
+    saturdays = [i for i in range(num_days) if is_saturday[i]]
+    absent_saturdays = 0
+    working_saturdays = 0
+    for i in saturdays:
+        if status[i] == 'HO':
+            continue  # Skip public holidays
+        working_saturdays += 1
+        if status[i] == 'A':
+            absent_saturdays += 1
+        if status[i] == 'P1/2':
+            absent_saturdays += 0.5
+
+    if absent_saturdays == 0 and working_saturdays > 0:
+        comp_off += 1
+    if absent_saturdays == 0.5 and working_saturdays > 0:
+        comp_off += 0.5
+
+    if absent_saturdays == 1 or absent_saturdays == 2 or absent_saturdays >= 3:
+        # Change the first missed Saturday to "WOS" and keep the rest as "A"
+        for i in saturdays:
+            if status[i] == 'A':
+                status[i] = 'WOS'
+                break
+
+    # Report metric and absentee map from the final statuses
+    holidays = 0
+    total_working_days = 0
+    actual_absentee = 0
+    weekly_offs = 0
+    absentee_map = [0] * num_days
+    for i, day_status in enumerate(status):
+        if day_status == 'HO':
+            holidays += 1
+        elif day_status == 'P' or day_status == 'WOP':
+            total_working_days += 1
+        elif day_status == 'P1/2' or day_status == 'WOP1/2':
+            total_working_days += 0.5
+        elif day_status == 'A':
+            actual_absentee += 1
+            absentee_map[i] = 1
+        elif day_status == 'WOS' or day_status == 'WO':
+            weekly_offs += 1
+
+    working_days = [minutes for minutes in daily_working_hours if minutes != MISSING_MINUTES]
+    total_minutes = sum(working_days)
+    late_mark_absentee = 0.0 + (late_count // 3) * 0.5
+
+    details = {
+        'Status': status,
+        'InTime': in_times,
+        'OutTime': out_times,
+        'EmployeeID': record['employee_id'],
+        'Days': list(days),
+        'dailyWorkingHours': daily_working_hours,
+        'averageWorkingHour': average_working_hour,
+        'averageInTime': average_in_time,
+        'averageOutTime': average_out_time,
+        'halfDayMap': half_day_map,
+        'halfDayTotal': half_day_map.count(1),
+        'lateMarkAbsentee': late_mark_absentee,
+        'lateMark': late_mark,
+        'lateMarkCount': late_count,
+        'earlyLeaveMap': early_leave_map,
+        'earlyLeaveTime': early_leave_time,
+        'totalEarlyLeave': early_leave_map.count(1),
+        'incompleteHours': total_incomplete_minutes,
+        'compOff': comp_off,
+        'overTime': over_time,
+        'actualOverTime': total_actual_overtime_minutes,
+        'payableOverTime': total_payable_overtime_minutes,
+        'reportMetric': {
+            "CalenderDays": len(days),
+            "OfficeWorkingDays": len(days) - holidays - int(calendar.is_sunday.sum()) - 1,
+            "EmployeeTotalWorkingDay": total_working_days,
+            "PublicHolidays": holidays,
+            "EmployeeAverageWorkingHours": total_minutes // len(working_days) if working_days else 0,
+            "EmployeeTotalWorkingHours": total_minutes,
+            "EmployeeActualAbsentee": actual_absentee,
+            "TotalHolidays": holidays + weekly_offs,
+            "EmployeeAbsenteeWithLateMark": actual_absentee + late_mark_absentee,
+        },
+        'absenteeMap': absentee_map,
+    }
+
+    # Scalar-only rules are shared with the reference chain
+    single = {None: details}
+    finalAdjustment(single)
+    calculate_adherence_ratio(single)
+    calculate_work_deficit_ratio(single)
+    calculate_adjusted_absentee_rate(single)
+
+    return details, insights
+
+
+def run_fused_pipeline(employee_dict, holidays=None):
+    """
+    Computes the same outputs as run_reference_pipeline with one pass per employee.
+
+    Args:
+        employee_dict (dict): Parsed attendance dictionary from process_attendance_file
+        holidays (HolidayCalendar): Holidays to apply (default: load_holiday_calendar())
+
+    Returns:
+        tuple: (employee_dict, missing_punch_insights)
+    """
+    if holidays is None:
+        holidays = load_holiday_calendar()
+    calendars = {}
+    processed = {}
+    insights = {}
+
+    for employee, record in employee_dict.items():
+        # Employees of one export share the same day labels, so the calendar is built once
+        days_key = tuple(record['Days'])
+        if days_key not in calendars:
+            calendars[days_key] = build_month_calendar(record['Days'], holidays)
+
+        processed[employee], employee_insights = evaluate_employee(record, calendars[days_key])
+        if employee_insights:
+            insights[employee] = employee_insights
+
+    return processed, insights
+
+
+def run_attendance_pipeline(employee_dict, mode='fused', holidays=None, max_workers=None):
+    """
+    Runs the attendance rules over a parsed month.
+
+    Args:
+        employee_dict (dict): Parsed attendance dictionary from process_attendance_file
+        mode (str): One of ENGINE_MODES
+        holidays (HolidayCalendar): Holidays to apply (default: load_holiday_calendar())
+        max_workers (int): Worker processes of the 'parallel' mode (default: one per CPU);
+                           1 evaluates the month in the calling process
+
+    Returns:
+        tuple: (employee_dict, missing_punch_insights); employee_dict is an AttendanceStore
+               in 'vectorized', 'lazy' and 'parallel' modes, a plain dictionary otherwise
+    """
+    if mode == 'fused':
+        return run_fused_pipeline(employee_dict, holidays)
+    if mode == 'vectorized':
+        from functions.attendance_vectorized import run_vectorized_pipeline
+        return run_vectorized_pipeline(employee_dict, holidays=holidays)
+    if mode == 'lazy':
+        from functions.attendance_vectorized import run_vectorized_pipeline
+        return run_vectorized_pipeline(employee_dict, holidays=holidays, lazy_series=True)
+    if mode == 'parallel':
+        from functions.attendance_parallel import run_parallel_pipeline
+        return run_parallel_pipeline(employee_dict, holidays, max_workers)
+    if mode == 'staged':
+        from functions.stage_graph import StagePipeline
+        return StagePipeline().run(employee_dict, holidays)
+    if mode == 'reference':
+        return run_reference_pipeline(employee_dict, holidays)
+    raise ValueError(f"Unknown engine mode: {mode}")
+
+
+def cross_check_pipelines(employee_dict, mode='fused', holidays=None):
+    """
+    Runs an engine mode and the reference chain on the same parsed month and lists the
+    employees whose results differ, for validating an engine against the reference chain.
+
+    Returns:
+        list: Employee names with mismatching records or insights (empty when identical)
+    """
+    import copy
+
+    result, result_insights = run_attendance_pipeline(copy.deepcopy(employee_dict), mode, holidays)
+    reference, reference_insights = run_reference_pipeline(copy.deepcopy(employee_dict), holidays)
+    if not isinstance(result, dict):
+        result = result.to_employee_dict()
+
+    mismatches = []
+    for employee in reference.keys() | result.keys():
+        if (result.get(employee) != reference.get(employee) or
+                result_insights.get(employee) != reference_insights.get(employee)):
+            mismatches.append(employee)
+    return sorted(mismatches)
@@ -0,0 +1,174 @@
+import datetime
+from bisect import bisect_left, bisect_right
+
+import numpy as np
+
+from functions.time_utils import MISSING_MINUTES
+
+# Aggregates answered for any date range, per employee or for the whole organisation
+#   late_marks       -> days with a late mark
+#   overtime_minutes -> overtime minutes (full hours worked on week offs)
+#   absences         -> days with status 'A'
+#   worked_minutes   -> daily working minutes of the days with hours
+#   days_recorded    -> days the employee appears in an export
+HISTORY_METRICS = ('late_marks', 'overtime_minutes', 'absences', 'worked_minutes', 'days_recorded')
+
+# Per-day store fields each metric is summed from (days_recorded counts the present cells)
+METRIC_FIELDS = {
+    'late_marks': 'lateMark',
+    'overtime_minutes': 'overTime',
+    'absences': 'absenteeMap',
+    'worked_minutes': 'dailyWorkingHours',
+}
+
+
+def _date_key(value):
+    """Normalizes a date (datetime.date or 'YYYY-MM-DD') to its 'YYYY-MM-DD' key."""
+    if isinstance(value, datetime.date):
+        return value.isoformat()
+    try:
+        return datetime.date.fromisoformat(str(value).strip()).isoformat()
+    except ValueError:
+        raise ValueError(f"Invalid date '{value}', expected YYYY-MM-DD")
+
+
+class AttendanceHistory:
+    """
+    Date-range aggregates over the processed attendance history.
+
+    For every metric the per-day values of each employee are kept as prefix sums over
+    the sorted dates (prefix[:, i] = sum of the first i dates), plus one organisation-wide
+    prefix row. A range is located with two bisects on the date list and every aggregate
+    is the difference of two prefix entries, so a query costs O(log dates) whatever the
+    length of the range. Dates without data (e.g. between exports) simply add nothing.
+    """
+
+    def __init__(self, names, dates, metrics):
+        """
+        Args:
+            names (list): Employee names (row order of the matrices)
+            dates (list): Sorted 'YYYY-MM-DD' dates (column order of the matrices)
+            metrics (dict): HISTORY_METRICS name -> employees x dates matrix of per-day values
+        """
+        self.names = list(names)
+        self.index = {name: i for i, name in enumerate(self.names)}
+        self.dates = list(dates)
+
+        self.prefix = {}
+        self.org_prefix = {}
+        for metric in HISTORY_METRICS:
+            values = np.asarray(metrics[metric], dtype=np.int64).reshape(len(self.names), len(self.dates))
+            prefix = np.zeros((len(self.names), len(self.dates) + 1), dtype=np.int64)
+            np.cumsum(values, axis=1, out=prefix[:, 1:])
+            prefix.flags.writeable = False
+            self.prefix[metric] = prefix
+            self.org_prefix[metric] = prefix.sum(axis=0)
+
+    @classmethod
+    def from_multi_month(cls, history):
+        """
+        Builds the index from a MultiMonthStore (e.g. ingest_biometric_folder).
+
+        Args:
+            history (MultiMonthStore): Merged months; needs the per-day fields of METRIC_FIELDS
+
+        Returns:
+            AttendanceHistory: Index over every date of the store
+        """
+        missing = [field for field in METRIC_FIELDS.values() if field not in history.arrays]
+        if missing:
+            raise ValueError(f"Attendance history needs the per-day fields {', '.join(missing)}; "
+                             "process the months with an engine mode that computes them (e.g. 'vectorized')")
+
+        present = history.present
+        working = history.arrays['dailyWorkingHours']
+        metrics = {
+            'late_marks': present & history.arrays['lateMark'],
+            'overtime_minutes': np.where(present, history.arrays['overTime'], 0),
+            'absences': present & history.arrays['absenteeMap'],
+            'worked_minutes': np.where(present & (working != MISSING_MINUTES), working, 0),
+            'days_recorded': present,
+        }
+        return cls(history.names, history.dates, metrics)
+
+    @classmethod
+    def from_warehouse(cls, warehouse):
+        """
+        Builds the index from every month loaded into an AttendanceWarehouse.
+
+        Employees are identified by name, as in the processed months.
+
+        Args:
+            warehouse (AttendanceWarehouse): Warehouse to read
+
+        Returns:
+            AttendanceHistory: Index over every date of the warehouse
+        """
+        connection = warehouse.connect()
+        try:
+            rows = connection.execute(
+                "SELECT employee, date, late, overtime_minutes, absent, working_minutes FROM attendance_day").fetchall()
+        finally:
+            connection.close()
+
+        if not rows:
+            return cls([], [], {metric: np.zeros((0, 0)) for metric in HISTORY_METRICS})
+
+        employees, dates, late, overtime, absent, working = zip(*rows)
+        names, rows_index = np.unique(np.array(employees, dtype=object), return_inverse=True)
+        date_keys, columns = np.unique(np.array(dates, dtype=object), return_inverse=True)
+        worked = np.array([minutes if minutes is not None else 0 for minutes in working], dtype=np.int64)
+
+        shape = (len(names), len(date_keys))
+        metrics = {}
+        for metric, values in (('late_marks', late), ('overtime_minutes', overtime), ('absences', absent),
+                               ('worked_minutes', worked), ('days_recorded', np.ones(len(rows), dtype=np.int64))):
+            matrix = np.zeros(shape, dtype=np.int64)
+            np.add.at(matrix, (rows_index, columns), np.asarray(values, dtype=np.int64))
+            metrics[metric] = matrix
+        return cls(names.tolist(), date_keys.tolist(), metrics)
+
+    def _range(self, start_date, end_date):
+        """Prefix positions (lo, hi) of the dates between start_date and end_date (inclusive)."""
+        start_key, end_key = _date_key(start_date), _date_key(end_date)
+        if start_key > end_key:
+            raise ValueError(f"Start date {start_key} is after end date {end_key}")
+        return bisect_left(self.dates, start_key), bisect_right(self.dates, end_key)
+
+    def employee_totals(self, employee, start_date, end_date):
+        """
+        Aggregates of one employee over a date range (inclusive).
+
+        Args:
+            employee (str): Employee name
+            start_date (str): First date, 'YYYY-MM-DD' (or datetime.date)
+            end_date (str): Last date, 'YYYY-MM-DD' (or datetime.date)
+
+        Returns:
+            dict: HISTORY_METRICS name -> total
+        """
+        if employee not in self.index:
+            raise ValueError(f"Unknown employee '{employee}'")
+        row = self.index[employee]
+        lo, hi = self._range(start_date, end_date)
+        return {metric: int(prefix[row, hi] - prefix[row, lo]) for metric, prefix in self.prefix.items()}
+
+    def org_totals(self, start_date, end_date):
+        """
+        Aggregates of the whole organisation over a date range (inclusive).
+
+        Returns:
+            dict: HISTORY_METRICS name -> total
+        """
+        lo, hi = self._range(start_date, end_date)
+        return {metric: int(prefix[hi] - prefix[lo]) for metric, prefix in self.org_prefix.items()}
+
+    def all_employee_totals(self, start_date, end_date):
+        """
+        Aggregates of every employee over a date range (inclusive), e.g. for a quarterly report.
+
+        Returns:
+            dict: HISTORY_METRICS name -> per-employee numpy array in the order of 'names'
+        """
+        lo, hi = self._range(start_date, end_date)
+        return {metric: prefix[:, hi] - prefix[:, lo] for metric, prefix in self.prefix.items()}
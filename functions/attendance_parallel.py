@@ -0,0 +1,119 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from functions.attendance_engine import run_fused_pipeline
+from functions.attendance_store import AttendanceStore
+from functions.holiday_calendar import load_holiday_calendar
+
+# Months with fewer employees are processed serially (starting a pool costs more than it saves)
+PARALLEL_MIN_EMPLOYEES = 2000
+
+# Smallest employee partition handed to a worker process
+MIN_PARTITION_EMPLOYEES = 500
+
+
+def partition_count(num_employees, max_workers=None):
+    """
+    Number of employee partitions to process in parallel (1 means serial).
+
+    One partition per worker, with at most one worker per MIN_PARTITION_EMPLOYEES employees.
+
+    Args:
+        num_employees (int): Employees in the month
+        max_workers (int): Worker processes available (default: one per CPU)
+
+    Returns:
+        int: Partition count
+    """
+    if num_employees < PARALLEL_MIN_EMPLOYEES:
+        return 1
+    workers = max_workers or os.cpu_count() or 1
+    return max(1, min(workers, num_employees // MIN_PARTITION_EMPLOYEES))
+
+
+def pack_partition(employee_dict):
+    """
+    Packs the parsed records of a partition for a worker process.
+
+    The Status / InTime / OutTime lists become the matrices of an AttendanceStore, which
+    pickle far more compactly than the nested per-employee lists. Partitions whose
+    employees do not share the same days are sent as they are.
+
+    Returns:
+        AttendanceStore or dict: Packed partition, unpacked again by unpack_partition
+    """
+    try:
+        return AttendanceStore.from_employee_dict(employee_dict)
+    except ValueError:
+        return employee_dict
+
+
+def unpack_partition(partition):
+    """Parsed employee dictionary of a partition packed by pack_partition."""
+    if not isinstance(partition, AttendanceStore):
+        return partition
+
+    days = list(partition.days)
+    labels = np.array(partition.status_labels, dtype=object)
+    status_rows = labels[np.asarray(partition.arrays['Status'])].tolist()
+    in_rows = np.asarray(partition.arrays['InTime']).tolist()
+    out_rows = np.asarray(partition.arrays['OutTime']).tolist()
+    return {name: {'employee_id': employee_id, 'Days': days, 'Status': status, 'InTime': in_times, 'OutTime': out_times}
+            for name, employee_id, status, in_times, out_times
+            in zip(partition.names, partition.employee_ids, status_rows, in_rows, out_rows)}
+
+
+def evaluate_partition(partition, holidays):
+    """
+    Runs the per-employee rule chain on one partition (process pool worker).
+
+    The partition arrives packed by pack_partition; the results are returned as an
+    AttendanceStore as well, so neither direction pickles nested per-employee lists.
+
+    Returns:
+        tuple: (AttendanceStore, missing_punch_insights)
+    """
+    processed, insights = run_fused_pipeline(unpack_partition(partition), holidays)
+    return AttendanceStore.from_employee_dict(processed), insights
+
+
+def run_parallel_pipeline(employee_dict, holidays=None, max_workers=None):
+    """
+    Evaluates the attendance rules with the employees sharded across worker processes.
+
+    Every rule works on one employee at a time, so each contiguous partition of
+    employee_dict runs the full rule chain (run_fused_pipeline) in its own process of a
+    ProcessPoolExecutor. Partitions travel to the workers and back as AttendanceStore
+    matrices, and the result stores are joined in employee order. The
+    partition count follows the number of employees and CPUs (partition_count); small
+    months are processed serially in the calling process.
+
+    Args:
+        employee_dict (dict): Parsed attendance dictionary from process_attendance_file
+        holidays (HolidayCalendar): Holidays to apply (default: load_holiday_calendar())
+        max_workers (int): Worker processes (default: one per CPU)
+
+    Returns:
+        tuple: (AttendanceStore, missing_punch_insights)
+    """
+    if holidays is None:
+        holidays = load_holiday_calendar()
+
+    names = list(employee_dict.keys())
+    partitions = partition_count(len(names), max_workers)
+    if partitions == 1:
+        return evaluate_partition(employee_dict, holidays)
+
+    size = -(-len(names) // partitions)
+    shards = [pack_partition({name: employee_dict[name] for name in names[start:start + size]})
+              for start in range(0, len(names), size)]
+
+    with ProcessPoolExecutor(max_workers=len(shards)) as executor:
+        results = list(executor.map(evaluate_partition, shards, [holidays] * len(shards)))
+
+    insights = {}
+    for _, partition_insights in results:
+        insights.update(partition_insights)
+    return AttendanceStore.concat([store for store, _ in results]), insights
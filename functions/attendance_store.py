@@ -0,0 +1,248 @@
+import numpy as np
+from collections.abc import Mapping
+
+from functions.time_utils import MISSING_MINUTES
+
+# Status codes stored in the uint8 status matrix (index == code)
+STATUS_LABELS = ('NaT', 'NYD', 'P', 'A', 'WO', 'WOP', 'WOS', 'HO', 'HOP', 'P1/2', 'WOP1/2', 'HOP1/2')
+
+# Per-day fields of the legacy employee dictionary and how they are stored
+#   status  -> uint8 code into AttendanceStore.status_labels
+#   minutes -> int16 minutes, MISSING_MINUTES for a missing punch
+#   flag    -> bool, shown as 0/1
+DAY_FIELDS = {
+    'Status': 'status',
+    'InTime': 'minutes',
+    'OutTime': 'minutes',
+    'dailyWorkingHours': 'minutes',
+    'overTime': 'minutes',
+    'earlyLeaveTime': 'minutes',
+    'halfDayMap': 'flag',
+    'lateMark': 'flag',
+    'earlyLeaveMap': 'flag',
+    'absenteeMap': 'flag',
+}
+
+DAY_FIELD_DTYPES = {'status': np.uint8, 'minutes': np.int16, 'flag': np.bool_}
+
+
+class AttendanceStore(Mapping):
+    """
+    Columnar attendance store with an employees x days layout.
+
+    Per-day values live in one numpy matrix per field (int16 minutes, uint8 status codes,
+    bool flags) and the day labels (a tuple) are shared by every employee. Per-employee scalars
+    such as 'averageWorkingHour' or 'reportMetric' are kept as small dictionaries.
+
+    The store is a read-only Mapping of employee name -> EmployeeRecord, so code written
+    against the legacy nested employee dictionary (app.py, dashboard functions) keeps working.
+
+    With a 'series' evaluator (e.g. attendance_vectorized.DashboardSeries), the per-day
+    fields it lists are not stored as matrices: they are computed for one employee on
+    first access from that employee's stored rows, and memoized.
+    """
+
+    def __init__(self, names, employee_ids, days, arrays, summaries, status_labels=STATUS_LABELS, series=None):
+        self.names = list(names)
+        self.employee_ids = list(employee_ids)
+        self.days = tuple(days)
+        self.arrays = arrays
+        self.summaries = summaries
+        self.status_labels = list(status_labels)
+        self.series = series
+        self.index = {name: i for i, name in enumerate(self.names)}
+        self._series_rows = {}  # row -> per-day fields computed by series
+
+    @property
+    def day_fields(self):
+        """Names of the per-day fields, stored or computed on access."""
+        return list(self.arrays) + [field for field in (self.series.fields if self.series else ())
+                                    if field not in self.arrays]
+
+    def day_values(self, field, row):
+        """Per-day array of one field for one employee row."""
+        if field in self.arrays:
+            return self.arrays[field][row]
+        values = self._series_rows.get(row)
+        if values is None:
+            values = self.series.evaluate(self, row)
+            self._series_rows[row] = values
+        return values[field]
+
+    def series_matrices(self):
+        """
+        Employees x days matrices of the fields computed on access, for whole-month consumers
+        (e.g. the warehouse or a MultiMonthStore).
+
+        The series is evaluated once over the whole matrices; nothing is memoized in the
+        store (the dashboards only ever need a few employees).
+
+        Returns:
+            dict: Field name -> matrix, for the series fields not stored in arrays
+        """
+        if self.series is None or not self.names:
+            return {}
+        matrices = self.series.evaluate_all(self)
+        return {field: matrices[field] for field in self.series.fields if field not in self.arrays}
+
+    @classmethod
+    def from_employee_dict(cls, employee_dict):
+        """
+        Builds a store from the legacy nested employee dictionary.
+
+        Args:
+            employee_dict (dict): Dictionary of employee name -> attendance record
+
+        Returns:
+            AttendanceStore: Columnar copy of the dictionary
+        """
+        names = list(employee_dict.keys())
+        records = list(employee_dict.values())
+        days = records[0]['Days'] if records else []
+        num_days = len(days)
+
+        status_labels = list(STATUS_LABELS)
+        status_codes = {label: code for code, label in enumerate(status_labels)}
+
+        fields = [field for field in DAY_FIELDS if any(field in record for record in records)]
+        arrays = {}
+        for field in fields:
+            kind = DAY_FIELDS[field]
+            fill = MISSING_MINUTES if kind == 'minutes' else 0
+            arrays[field] = np.full((len(records), num_days), fill, dtype=DAY_FIELD_DTYPES[kind])
+
+        employee_ids = []
+        summaries = []
+        for i, record in enumerate(records):
+            if len(record['Days']) != num_days:
+                raise ValueError("All employees in an AttendanceStore must share the same days")
+
+            employee_ids.append(record.get('EmployeeID', record.get('employee_id', '')))
+
+            for field in fields:
+                values = record.get(field)
+                if values is None:
+                    continue
+                kind = DAY_FIELDS[field]
+                if kind == 'status':
+                    for label in values:
+                        if label not in status_codes:
+                            status_codes[label] = len(status_labels)
+                            status_labels.append(label)
+                    arrays[field][i, :len(values)] = [status_codes[label] for label in values]
+                else:
+                    arrays[field][i, :len(values)] = values
+
+            summaries.append({key: value for key, value in record.items()
+                              if key not in DAY_FIELDS and key not in ('Days', 'EmployeeID', 'employee_id')})
+
+        if len(status_labels) > 256:
+            raise ValueError("Too many distinct status labels for a uint8 status matrix")
+
+        return cls(names, employee_ids, days, arrays, summaries, status_labels)
+
+    @classmethod
+    def concat(cls, stores):
+        """
+        Joins stores of the same days (e.g. employee partitions) into one, in order.
+
+        Status codes of every store are remapped onto one merged list of status labels.
+
+        Args:
+            stores (list): AttendanceStore objects sharing the same days and per-day fields
+
+        Returns:
+            AttendanceStore: Store with the employees of every store
+        """
+        if not stores:
+            return cls([], [], [], {}, [])
+
+        status_labels = []
+        for store in stores:
+            status_labels.extend(label for label in store.status_labels if label not in status_labels)
+        if len(status_labels) > 256:
+            raise ValueError("Too many distinct status labels for a uint8 status matrix")
+        status_codes = {label: code for code, label in enumerate(status_labels)}
+
+        arrays = {}
+        for field in stores[0].arrays:
+            parts = []
+            for store in stores:
+                values = np.asarray(store.arrays[field])
+                if DAY_FIELDS[field] == 'status':
+                    remap = np.array([status_codes[label] for label in store.status_labels], dtype=np.uint8)
+                    values = remap[values]
+                parts.append(values)
+            arrays[field] = np.concatenate(parts)
+
+        return cls([name for store in stores for name in store.names],
+                   [employee_id for store in stores for employee_id in store.employee_ids],
+                   stores[0].days, arrays, [summary for store in stores for summary in store.summaries],
+                   status_labels, stores[0].series)
+
+    def to_employee_dict(self):
+        """Materializes the legacy nested employee dictionary (lists of labels and minutes)."""
+        return {name: dict(self[name]) for name in self.names}
+
+    @property
+    def nbytes(self):
+        """Memory held by the per-day arrays."""
+        return sum(array.nbytes for array in self.arrays.values())
+
+    def __getitem__(self, name):
+        return EmployeeRecord(self, self.index[name])
+
+    def __iter__(self):
+        return iter(self.names)
+
+    def __len__(self):
+        return len(self.names)
+
+    def __contains__(self, name):
+        return name in self.index
+
+
+def as_attendance_store(employee_dict):
+    """Returns employee_dict as an AttendanceStore, converting a legacy nested dictionary if needed."""
+    if isinstance(employee_dict, AttendanceStore):
+        return employee_dict
+    return AttendanceStore.from_employee_dict(employee_dict)
+
+
+class EmployeeRecord(Mapping):
+    """
+    Read-only compatibility view of one employee row of an AttendanceStore.
+
+    Per-day fields are decoded to the legacy list form on access, e.g.
+    record['Status'] -> ['P', 'A', ...], record['InTime'] -> [574, -1, ...] (minutes),
+    record['halfDayMap'] -> [0, 1, ...].
+    """
+
+    def __init__(self, store, row):
+        self.store = store
+        self.row = row
+
+    def __getitem__(self, key):
+        store = self.store
+        if key == 'Days':
+            return list(store.days)
+        if key == 'EmployeeID':
+            return store.employee_ids[self.row]
+        if key in store.arrays or (store.series is not None and key in store.series.fields):
+            values = store.day_values(key, self.row)
+            kind = DAY_FIELDS[key]
+            if kind == 'status':
+                return [store.status_labels[code] for code in values.tolist()]
+            if kind == 'flag':
+                return values.astype(np.uint8).tolist()
+            return values.tolist()
+        return store.summaries[self.row][key]
+
+    def __iter__(self):
+        yield 'EmployeeID'
+        yield 'Days'
+        yield from self.store.day_fields
+        yield from self.store.summaries[self.row]
+
+    def __len__(self):
+        return 2 + len(self.store.day_fields) + len(self.store.summaries[self.row])
@@ -0,0 +1,322 @@
+import numpy as np
+
+from functions.biometric_function_new import (finalAdjustment, calculate_adherence_ratio, calculate_work_deficit_ratio,
+                                              calculate_adjusted_absentee_rate)
+from functions.attendance_engine import build_month_calendar
+from functions.holiday_calendar import load_holiday_calendar
+from functions.attendance_store import AttendanceStore, STATUS_LABELS
+from functions.time_utils import MISSING_MINUTES, MINUTES_PER_DAY
+
+# Status codes (index into STATUS_LABELS)
+NYD, P, A, WO, WOP, WOS, HO, HOP, P_HALF, WOP_HALF, HOP_HALF = (
+    STATUS_LABELS.index(label) for label in ('NYD', 'P', 'A', 'WO', 'WOP', 'WOS', 'HO', 'HOP',
+                                             'P1/2', 'WOP1/2', 'HOP1/2'))
+STATUS_CODES = {label: code for code, label in enumerate(STATUS_LABELS)}
+
+HALF_DAY_MINUTES = 420  # Days with fewer working minutes are half days
+LATE_MARK_AFTER = 10 * 60 + 30  # In times after 10:30 are late
+
+
+def _durations(in_times, out_times):
+    """Working minutes per cell (out time may be on the next day), MISSING_MINUTES where a punch is missing."""
+    punched = (in_times != MISSING_MINUTES) & (out_times != MISSING_MINUTES)
+    return np.where(punched, (out_times - in_times) % MINUTES_PER_DAY, MISSING_MINUTES).astype(np.int16), punched
+
+
+def _half_day_map(daily_working_hours):
+    """Days with working hours below HALF_DAY_MINUTES."""
+    return (daily_working_hours != MISSING_MINUTES) & (daily_working_hours < HALF_DAY_MINUTES)
+
+
+def _day_series(status, in_times, out_times, daily_working_hours, expected_work_minutes, codes=STATUS_CODES):
+    """
+    Per-day dashboard fields from the final Status, InTime, OutTime and dailyWorkingHours.
+
+    Shared by run_vectorized_pipeline (whole organization) and DashboardSeries (one
+    employee row), so every threshold lives here.
+
+    Args:
+        codes (dict): Status label -> code of the status array
+
+    Returns:
+        tuple: (dict of field name -> per-day array, weekend_work mask)
+    """
+    worked_minutes, punched = _durations(in_times, out_times)
+    has_hours = daily_working_hours != MISSING_MINUTES
+
+    # early_leave
+    early_leave_map = (status == codes['P']) & punched & (worked_minutes < expected_work_minutes)
+
+    # overtime
+    weekend_work = has_hours & np.isin(status, [codes[label] for label in ('WOP', 'WOS', 'WOP1/2')])
+    extra_hours = has_hours & ~weekend_work & (daily_working_hours > expected_work_minutes)
+
+    series = {
+        'halfDayMap': _half_day_map(daily_working_hours),
+        'lateMark': (in_times != MISSING_MINUTES) & (in_times > LATE_MARK_AFTER),
+        'earlyLeaveMap': early_leave_map,
+        'earlyLeaveTime': np.where(early_leave_map, expected_work_minutes - worked_minutes, 0).astype(np.int16),
+        'overTime': np.where(weekend_work, daily_working_hours,
+                             np.where(extra_hours, daily_working_hours - expected_work_minutes, 0)).astype(np.int16),
+        'absenteeMap': status == codes['A'],
+    }
+    return series, weekend_work
+
+
+def _row_average(values, mask, counts):
+    """Floor average of values over mask per employee, 0 for employees without any valid cell."""
+    totals = np.where(mask, values, 0).sum(axis=1)
+    return np.where(counts > 0, totals // np.maximum(counts, 1), 0)
+
+
+class DashboardSeries:
+    """
+    Computes the dashboard-only per-day fields of one employee from the stored rows.
+
+    The report tables only need per-employee aggregates; the per-day series below are
+    only drawn by the dashboard charts. They are derived from the final Status, InTime,
+    OutTime and dailyWorkingHours rows by _day_series, as in run_vectorized_pipeline.
+    """
+
+    fields = ('halfDayMap', 'lateMark', 'earlyLeaveMap', 'earlyLeaveTime', 'overTime', 'absenteeMap')
+
+    def __init__(self, expected_work_minutes=9 * 60):
+        self.expected_work_minutes = expected_work_minutes
+
+    def evaluate(self, store, row):
+        """
+        Args:
+            store (AttendanceStore): Store holding the Status, InTime, OutTime and dailyWorkingHours rows
+            row (int): Employee row
+
+        Returns:
+            dict: Field name -> per-day numpy array
+        """
+        codes = {label: code for code, label in enumerate(store.status_labels)}
+        series, _ = _day_series(np.asarray(store.arrays['Status'][row]), np.asarray(store.arrays['InTime'][row]),
+                                np.asarray(store.arrays['OutTime'][row]),
+                                np.asarray(store.arrays['dailyWorkingHours'][row]),
+                                self.expected_work_minutes, codes)
+        return series
+
+    def evaluate_all(self, store):
+        """
+        Args:
+            store (AttendanceStore): Store holding the Status, InTime, OutTime and dailyWorkingHours matrices
+
+        Returns:
+            dict: Field name -> employees x days numpy matrix
+        """
+        codes = {label: code for code, label in enumerate(store.status_labels)}
+        series, _ = _day_series(np.asarray(store.arrays['Status']), np.asarray(store.arrays['InTime']),
+                                np.asarray(store.arrays['OutTime']), np.asarray(store.arrays['dailyWorkingHours']),
+                                self.expected_work_minutes, codes)
+        return series
+
+    def to_dict(self):
+        """Parameters of the evaluator, e.g. for storing it with a snapshot."""
+        return {'expected_work_minutes': self.expected_work_minutes}
+
+
+def run_vectorized_pipeline(employee_dict, expected_work_hours=9, holidays=None, lazy_series=False):
+    """
+    Evaluates the attendance rules as matrix operations over an employees x days array.
+
+    Produces the same results as the reference chain (run_reference_pipeline), but every
+    rule (status transitions, late mark, half day, overtime thresholds, Saturday comp-off)
+    is a masked operation over the whole organization and counts are axis reductions.
+    Only the per-employee scalars of the report (and the few missing punch insights) are
+    assembled in Python.
+
+    Args:
+        employee_dict (dict): Parsed attendance dictionary from process_attendance_file
+        expected_work_hours (int): Expected working hours per day
+        holidays (HolidayCalendar): Holidays to apply (default: load_holiday_calendar())
+        lazy_series (bool): Keep only the aggregates and the Status / InTime / OutTime /
+                            dailyWorkingHours matrices; the dashboard-only per-day fields
+                            are computed per employee on first access (DashboardSeries)
+
+    Returns:
+        tuple: (AttendanceStore, missing_punch_insights)
+    """
+    names = list(employee_dict.keys())
+    records = list(employee_dict.values())
+    if not records:
+        return AttendanceStore([], [], [], {}, []), {}
+
+    days = records[0]['Days']
+    if any(record['Days'] is not days and record['Days'] != days for record in records):
+        raise ValueError("The vectorized engine requires every employee to share the same days")
+
+    calendar = build_month_calendar(days, holidays if holidays is not None else load_holiday_calendar())
+    is_sunday = calendar.is_sunday
+    is_saturday = calendar.is_saturday
+    is_holiday = calendar.is_holiday
+    expected_work_minutes = expected_work_hours * 60
+
+    in_times = np.array([record['InTime'] for record in records], dtype=np.int16)
+    out_times = np.array([record['OutTime'] for record in records], dtype=np.int16)
+    num_employees, num_days = in_times.shape
+
+    # status_reset, sunday_finder
+    status = np.full((num_employees, num_days), NYD, dtype=np.uint8)
+    status[:, is_sunday] = WO
+
+    # daily_working_hours_calculation_bulk, fixed_holidays, absent_days
+    daily_working_hours, punched = _durations(in_times, out_times)
+    status[punched & (status == NYD)] = P
+    status[punched & (status == WO)] = WOP
+    status[is_holiday & (status == NYD)] = HO
+    status[is_holiday & (status == P)] = HOP
+    status[(in_times == MISSING_MINUTES) & (out_times == MISSING_MINUTES) & (status == NYD)] = A
+
+    # calculate_daily_working_hours (averages in minutes)
+    valid_days = punched.sum(axis=1)
+    average_working_hour = _row_average(daily_working_hours, punched, valid_days)
+    average_in_time = _row_average(in_times, punched, valid_days)
+    average_out_time = _row_average(out_times, punched, valid_days)
+
+    # missing_punch
+    has_in = in_times != MISSING_MINUTES
+    forgot_out = has_in & (out_times == MISSING_MINUTES)
+    flagged = ((status == NYD) | forgot_out) & has_in
+    morning = in_times < 11 * 60
+    fill_out = flagged & morning
+    move_in = flagged & ~morning
+
+    insights = {}
+    flagged_rows, flagged_cols = np.nonzero(flagged)
+    flagged_cells = zip(flagged_rows.tolist(), flagged_cols.tolist(), status[flagged].tolist(),
+                        fill_out[flagged].tolist(), forgot_out[flagged].tolist())
+    for row, col, code, is_fill_out, is_forgot_out in flagged_cells:
+        if is_fill_out:
+            issue = {
+                'day': calendar.day_labels[col],
+                'issue': 'Missing punch-out',
+                'current_status': STATUS_LABELS[code],
+                'recommendation': 'Update OutTime' if is_forgot_out else 'Update OutTime, change status to P'
+            }
+        else:
+            issue = {
+                'day': calendar.day_labels[col],
+                'issue': 'Missing punch-in, OutTime recorded as InTime',
+                'current_status': STATUS_LABELS[code],
+                'recommendation': 'Move InTime to OutTime, set InTime to NaT, update status to P'
+            }
+        insights.setdefault(names[row], []).append(issue)
+
+    out_times = np.where(fill_out, average_out_time[:, None], out_times).astype(np.int16)
+    out_times = np.where(move_in, in_times, out_times).astype(np.int16)
+    in_times = np.where(move_in, MISSING_MINUTES, in_times).astype(np.int16)
+    status[(fill_out & ~forgot_out) | move_in] = P
+
+    worked_minutes, punched = _durations(in_times, out_times)
+
+    # recalibrator
+    recalibrate = (status == NYD) & punched
+    daily_working_hours[recalibrate] = worked_minutes[recalibrate]
+    status[recalibrate] = P
+
+    # half_day
+    half_day_map = _half_day_map(daily_working_hours)
+    status[half_day_map & (status == P)] = P_HALF
+    status[half_day_map & (status == WO)] = WOP_HALF
+    status[half_day_map & (status == HO)] = HOP_HALF
+
+    # nonworking_days_compoff
+    comp_off = (((status == WOP) | (status == HOP)) & punched).sum(axis=1)
+
+    # saturday_compoff
+    saturday_status = status[:, is_saturday]
+    working_saturdays = (saturday_status != HO).sum(axis=1)
+    absent_saturdays = (saturday_status == A).sum(axis=1) + 0.5 * (saturday_status == P_HALF).sum(axis=1)
+    attended = working_saturdays > 0
+    saturday_comp_off = np.where(attended & (absent_saturdays == 0), 1, np.where(attended & (absent_saturdays == 0.5), 0.5, 0))
+
+    saturday_absent = np.zeros_like(status, dtype=bool)
+    saturday_absent[:, is_saturday] = saturday_status == A
+    convert = ((absent_saturdays == 1) | (absent_saturdays == 2) | (absent_saturdays >= 3)) & saturday_absent.any(axis=1)
+    rows = np.nonzero(convert)[0]
+    status[rows, saturday_absent[rows].argmax(axis=1)] = WOS
+
+    # calculate_latemark, early_leave, overtime, absentee_map; the Saturday conversion only turns
+    # unpunched 'A' days into 'WOS', so the per-day series are computed from the final rows
+    per_day, weekend_work = _day_series(status, in_times, out_times, daily_working_hours, expected_work_minutes)
+    late_count = per_day['lateMark'].sum(axis=1)
+    early_leave_map = per_day['earlyLeaveMap']
+    over_time = per_day['overTime']
+    actual_over_time = over_time.sum(axis=1)
+    # Weekend work is always payable, weekday overtime once it exceeds an hour
+    payable_over_time = np.where(weekend_work | (over_time > 60), over_time, 0).sum(axis=1)
+
+    # calculate_metric
+    holidays = (status == HO).sum(axis=1)
+    full_days = ((status == P) | (status == WOP)).sum(axis=1)
+    half_days = ((status == P_HALF) | (status == WOP_HALF)).sum(axis=1)
+    actual_absentee = per_day['absenteeMap'].sum(axis=1)
+    total_holidays = holidays + ((status == WOS) | (status == WO)).sum(axis=1)
+    has_hours = daily_working_hours != MISSING_MINUTES
+    total_working_minutes = np.where(has_hours, daily_working_hours, 0).sum(axis=1)
+    working_day_count = has_hours.sum(axis=1)
+    average_daily_minutes = np.where(working_day_count > 0, total_working_minutes // np.maximum(working_day_count, 1), 0)
+    sundays = int(is_sunday.sum())
+
+    # Per-employee scalars, converted to Python numbers in bulk
+    columns = zip(average_working_hour.tolist(), average_in_time.tolist(), average_out_time.tolist(),
+                  half_day_map.sum(axis=1).tolist(), late_count.tolist(), early_leave_map.sum(axis=1).tolist(),
+                  per_day['earlyLeaveTime'].sum(axis=1).tolist(), comp_off.tolist(), saturday_comp_off.tolist(),
+                  actual_over_time.tolist(), payable_over_time.tolist(), holidays.tolist(), full_days.tolist(),
+                  half_days.tolist(), average_daily_minutes.tolist(), total_working_minutes.tolist(),
+                  actual_absentee.tolist(), total_holidays.tolist())
+
+    summaries = []
+    for (avg_working, avg_in, avg_out, half_day_total, late, early_leaves, incomplete, comp_offs, saturday_bonus,
+         actual_ot, payable_ot, holiday_count, full, half, avg_daily, total_minutes, absent, total_holiday) in columns:
+        late_mark_absentee = 0.0 + (late // 3) * 0.5
+        summary = {
+            'averageWorkingHour': avg_working,
+            'averageInTime': avg_in,
+            'averageOutTime': avg_out,
+            'halfDayTotal': half_day_total,
+            'lateMarkAbsentee': late_mark_absentee,
+            'lateMarkCount': late,
+            'totalEarlyLeave': early_leaves,
+            'incompleteHours': incomplete,
+            'compOff': comp_offs + (0.5 if saturday_bonus == 0.5 else int(saturday_bonus)),
+            'actualOverTime': actual_ot,
+            'payableOverTime': payable_ot,
+            'reportMetric': {
+                "CalenderDays": num_days,
+                "OfficeWorkingDays": num_days - holiday_count - sundays - 1,
+                "EmployeeTotalWorkingDay": full + 0.5 * half if half else full,
+                "PublicHolidays": holiday_count,
+                "EmployeeAverageWorkingHours": avg_daily,
+                "EmployeeTotalWorkingHours": total_minutes,
+                "EmployeeActualAbsentee": absent,
+                "TotalHolidays": total_holiday,
+                "EmployeeAbsenteeWithLateMark": absent + late_mark_absentee,
+            },
+        }
+
+        # Scalar-only rules are shared with the reference chain
+        single = {None: summary}
+        finalAdjustment(single)
+        calculate_adherence_ratio(single)
+        calculate_work_deficit_ratio(single)
+        calculate_adjusted_absentee_rate(single)
+        summaries.append(summary)
+
+    arrays = {
+        'Status': status,
+        'InTime': in_times,
+        'OutTime': out_times,
+        'dailyWorkingHours': daily_working_hours,
+    }
+    series = None
+    if lazy_series:
+        series = DashboardSeries(expected_work_minutes)
+    else:
+        arrays.update(per_day)
+    employee_ids = [record['employee_id'] for record in records]
+
+    return AttendanceStore(names, employee_ids, calendar.day_labels, arrays, summaries, series=series), insights
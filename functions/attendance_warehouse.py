@@ -0,0 +1,236 @@
+import os
+import sqlite3
+
+import numpy as np
+
+from functions.biometric_function_new import day_date_key
+from functions.time_utils import MISSING_MINUTES
+
+# One row per employee and day of every processed month
+#   date                          -> 'YYYY-MM-DD'
+#   in_time, out_time             -> minutes after midnight, NULL for a missing punch
+#   working_minutes               -> dailyWorkingHours, NULL when not computed
+#   late, early_leave, half_day,
+#   absent                        -> 0/1 flags
+#   early_leave_minutes, overtime_minutes -> minutes (0 when not applicable)
+# The table is clustered on (employee_id, date, employee), so per-employee date ranges
+# are read from the table itself; attendance_day_date covers the per-date totals.
+# warehouse_meta holds the 'version' counter increased by every load.
+WAREHOUSE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS attendance_day (
+    employee_id TEXT NOT NULL,
+    employee TEXT NOT NULL,
+    date TEXT NOT NULL,
+    status TEXT NOT NULL,
+    in_time INTEGER,
+    out_time INTEGER,
+    working_minutes INTEGER,
+    late INTEGER NOT NULL,
+    early_leave INTEGER NOT NULL,
+    early_leave_minutes INTEGER NOT NULL,
+    overtime_minutes INTEGER NOT NULL,
+    half_day INTEGER NOT NULL,
+    absent INTEGER NOT NULL,
+    PRIMARY KEY (employee_id, date, employee)
+) WITHOUT ROWID;
+
+CREATE INDEX IF NOT EXISTS attendance_day_date ON attendance_day (
+    date, status, working_minutes, late, early_leave, overtime_minutes, half_day, absent
+);
+
+CREATE TABLE IF NOT EXISTS warehouse_meta (
+    key TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+"""
+
+DAY_COLUMNS = ('employee_id', 'employee', 'date', 'status', 'in_time', 'out_time', 'working_minutes', 'late',
+               'early_leave', 'early_leave_minutes', 'overtime_minutes', 'half_day', 'absent')
+
+# Warehouse column -> per-day field of the AttendanceStore
+FIELD_COLUMNS = (
+    ('in_time', 'InTime'),
+    ('out_time', 'OutTime'),
+    ('working_minutes', 'dailyWorkingHours'),
+    ('late', 'lateMark'),
+    ('early_leave', 'earlyLeaveMap'),
+    ('early_leave_minutes', 'earlyLeaveTime'),
+    ('overtime_minutes', 'overTime'),
+    ('half_day', 'halfDayMap'),
+    ('absent', 'absenteeMap'),
+)
+
+# Columns holding minutes; MISSING_MINUTES is stored as NULL
+NULLABLE_MINUTES = ('in_time', 'out_time', 'working_minutes')
+
+
+def _field_matrix(store, field, series_rows):
+    """Employees x days matrix of a per-day field, stored or computed by the store's series."""
+    if field in store.arrays:
+        return np.asarray(store.arrays[field])
+    if field in series_rows:
+        return series_rows[field]
+    return np.zeros((len(store.names), len(store.days)), dtype=np.int16)
+
+
+def warehouse_rows(store):
+    """
+    Flattens a processed month into attendance_day rows.
+
+    Days whose label carries no full date (e.g. a malformed header) are skipped.
+
+    Args:
+        store (AttendanceStore): Processed month
+
+    Returns:
+        tuple: (rows as tuples in DAY_COLUMNS order, first date, last date); the dates are None without dated days
+    """
+    date_keys = [day_date_key(day) if isinstance(day, str) else None for day in store.days]
+    dated = np.array([i for i, date_key in enumerate(date_keys) if date_key], dtype=np.intp)
+    if not len(store.names) or not len(dated):
+        return [], None, None
+    dates = [date_keys[i] for i in dated]
+
+    series_rows = store.series_matrices()
+
+    num_employees, num_days = len(store.names), len(dates)
+    labels = np.array(store.status_labels, dtype=object)
+    columns = {
+        'employee_id': np.repeat(np.array([str(employee_id or '') for employee_id in store.employee_ids],
+                                          dtype=object), num_days).tolist(),
+        'employee': np.repeat(np.array(store.names, dtype=object), num_days).tolist(),
+        'date': dates * num_employees,
+        'status': labels[np.asarray(store.arrays['Status'])[:, dated]].ravel().tolist(),
+    }
+    for column, field in FIELD_COLUMNS:
+        values = _field_matrix(store, field, series_rows)[:, dated].astype(np.int64).ravel()
+        if column in NULLABLE_MINUTES:
+            values = np.where(values == MISSING_MINUTES, None, values.astype(object))
+        columns[column] = values.tolist()
+
+    return list(zip(*(columns[column] for column in DAY_COLUMNS))), dates[0], max(dates)
+
+
+class AttendanceWarehouse:
+    """
+    Local SQLite fact table of per-employee-day attendance results.
+
+    Every processed month is loaded once (load_month), so cross-month questions such as
+    an employee's days over a quarter or the daily totals of a date range are answered
+    by indexed queries instead of re-running the pipeline on each monthly export.
+
+    The database runs in WAL mode, so page loads can read while a processing job
+    loads a month. Each call opens its own connection, so one instance can be shared
+    by request threads and the processing job thread.
+    """
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self._initialized = False
+
+    def connect(self):
+        """Opens a connection to the warehouse, creating the schema on first use."""
+        if not self._initialized:
+            os.makedirs(os.path.dirname(self.db_path) or '.', exist_ok=True)
+        connection = sqlite3.connect(self.db_path, timeout=30)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        if not self._initialized:
+            connection.executescript(WAREHOUSE_SCHEMA)
+            self._initialized = True
+        return connection
+
+    def load_month(self, store):
+        """
+        Replaces the warehouse rows of a processed month.
+
+        The rows of every date the month covers are deleted and the month is inserted with
+        one executemany, in a single transaction: readers see either the previous or the
+        new version of the month, and re-processing a corrected export is idempotent.
+
+        Args:
+            store (AttendanceStore): Processed month (e.g. PublishedMonth.records)
+
+        Returns:
+            int: Number of rows loaded
+        """
+        rows, first_date, last_date = warehouse_rows(store)
+        if not rows:
+            print("Warning: No dated attendance rows to load into the warehouse")
+            return 0
+
+        placeholders = ', '.join('?' * len(DAY_COLUMNS))
+        connection = self.connect()
+        try:
+            with connection:
+                connection.execute("DELETE FROM attendance_day WHERE date BETWEEN ? AND ?", (first_date, last_date))
+                connection.executemany(f"INSERT OR REPLACE INTO attendance_day ({', '.join(DAY_COLUMNS)}) "
+                                       f"VALUES ({placeholders})", rows)
+                connection.execute("INSERT INTO warehouse_meta (key, value) VALUES ('version', 1) "
+                                   "ON CONFLICT (key) DO UPDATE SET value = value + 1")
+        finally:
+            connection.close()
+        return len(rows)
+
+    def version(self):
+        """Counter increased by every load_month, e.g. to refresh indexes built from the warehouse."""
+        connection = self.connect()
+        try:
+            row = connection.execute("SELECT value FROM warehouse_meta WHERE key = 'version'").fetchone()
+            return row[0] if row else 0
+        finally:
+            connection.close()
+
+    def loaded_periods(self):
+        """Set of 'YYYY-MM' months with at least one loaded day, e.g. to find the months still to load."""
+        connection = self.connect()
+        try:
+            return {row[0] for row in connection.execute("SELECT DISTINCT substr(date, 1, 7) FROM attendance_day")}
+        finally:
+            connection.close()
+
+    def employee_days(self, employee_id, start_date, end_date):
+        """
+        Per-day results of one employee over a date range (inclusive).
+
+        Args:
+            employee_id (str): Employee ID
+            start_date (str): First date, 'YYYY-MM-DD'
+            end_date (str): Last date, 'YYYY-MM-DD'
+
+        Returns:
+            list: One dict per day (DAY_COLUMNS keys), in date order
+        """
+        connection = self.connect()
+        try:
+            cursor = connection.execute(
+                f"SELECT {', '.join(DAY_COLUMNS)} FROM attendance_day "
+                "WHERE employee_id = ? AND date BETWEEN ? AND ? ORDER BY date",
+                (str(employee_id), start_date, end_date))
+            return [dict(zip(DAY_COLUMNS, row)) for row in cursor]
+        finally:
+            connection.close()
+
+    def daily_totals(self, start_date, end_date):
+        """
+        Organisation-wide totals per day over a date range (inclusive).
+
+        Args:
+            start_date (str): First date, 'YYYY-MM-DD'
+            end_date (str): Last date, 'YYYY-MM-DD'
+
+        Returns:
+            list: One dict per date with employees, present, absent, late, early_leave,
+                  half_day and overtime_minutes, in date order
+        """
+        connection = self.connect()
+        try:
+            cursor = connection.execute(
+                "SELECT date, COUNT(*), SUM(status IN ('P', 'P1/2', 'WOP', 'WOP1/2', 'HOP', 'HOP1/2')), SUM(absent), "
+                "SUM(late), SUM(early_leave), SUM(half_day), SUM(overtime_minutes) "
+                "FROM attendance_day WHERE date BETWEEN ? AND ? GROUP BY date ORDER BY date",
+                (start_date, end_date))
+            keys = ('date', 'employees', 'present', 'absent', 'late', 'early_leave', 'half_day', 'overtime_minutes')
+            return [dict(zip(keys, row)) for row in cursor]
+        finally:
+            connection.close()
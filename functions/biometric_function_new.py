@@ -1,9 +1,14 @@
 import pandas as pd
+import csv
+import io
 import json
 from datetime import datetime, timedelta
 import os
 import re
 import datetime
+from concurrent.futures import ProcessPoolExecutor
+
+from functions.time_utils import MISSING_MINUTES, parse_minutes, duration_minutes
 
 ## Sub Function (NESTED)
 def update_days_from_filename(employee_dict, file_name):
@@ -38,9 +43,17 @@ def update_days_from_filename(employee_dict, file_name):
         print(f"Warning: Unknown month abbreviation: {month_abbr}")
         return employee_dict
 
+    # Employees of one export share the same day labels, so each distinct list is
+    # formatted once and the result is shared by reference (treat it as read-only)
+    formatted = {}
+
     # Update employee data in-place
     for employee, data in employee_dict.items():
         days_list = data['Days']
+        days_key = tuple(days_list)
+        if days_key in formatted:
+            data['Days'] = formatted[days_key]
+            continue
         updated_days = []
 
         for day_str in days_list:
@@ -67,67 +80,181 @@ def update_days_from_filename(employee_dict, file_name):
                 updated_days.append(day_str)
 
         # Update the 'Days' list in-place
+        formatted[days_key] = updated_days
         data['Days'] = updated_days
 
     return employee_dict
 
 
-def process_attendance_data(input_csv):
+# Cell values that pandas.read_csv treats as missing by default
+NA_CELLS = frozenset([
+    '', '#N/A', '#N/A N/A', '#NA', '-1.#IND', '-1.#QNAN', '-NaN', '-nan', '1.#IND', '1.#QNAN',
+    '<NA>', 'N/A', 'NA', 'NULL', 'NaN', 'None', 'n/a', 'nan', 'null'
+])
+
+# Row labels of the vendor export that carry per-day attendance values
+ATTENDANCE_ROWS = ('Status', 'InTime', 'OutTime')
+
+
+# Files at least this large are parsed in byte-range shards across worker processes
+PARALLEL_PARSE_MIN_BYTES = 16 * 1024 * 1024
+
+# Start of an employee block; shards begin on these line boundaries
+EMPLOYEE_ROW_MARKER = b"\nEmployee:,"
+
+
+def find_shard_offsets(input_csv, shards):
     """
-    Extracts 'Status', 'InTime', and 'OutTime' for each employee,
-    ensuring dates are correctly aligned.
+    Splits a biometric export into byte ranges that each start on an "Employee:" row.
+
+    Args:
+        input_csv (str): Path to the biometric CSV export
+        shards (int): Desired number of shards
+
+    Returns:
+        list: Sorted start offsets, the first one being 0. Fewer offsets than shards are
+              returned when the file has fewer employee blocks.
     """
-    # Read CSV without headers to analyze structure
-    df = pd.read_csv(input_csv, header=None, encoding="utf-8")
+    size = os.path.getsize(input_csv)
+    offsets = [0]
+
+    with open(input_csv, mode='rb') as file:
+        for i in range(1, shards):
+            position = max(size * i // shards, offsets[-1])
+            file.seek(position)
+            # Scan forward to the next line that starts an employee block
+            overlap = b""
+            while True:
+                chunk = file.read(1 << 16)
+                if not chunk:
+                    return offsets
+                found = (overlap + chunk).find(EMPLOYEE_ROW_MARKER)
+                if found >= 0:
+                    offset = position - len(overlap) + found + 1
+                    break
+                position += len(chunk)
+                overlap = chunk[-len(EMPLOYEE_ROW_MARKER):]
+            if offset > offsets[-1]:
+                offsets.append(offset)
+    return offsets
 
-    # Locate the row containing actual dates (assumed to be right above "Employee:")
-    date_row_index = df[df.iloc[:, 0] == "Days"].index[0]  # Locate where dates are stored
-    dates = df.iloc[date_row_index, 2:].tolist()  # Extract dates from columns (ignoring first two columns)
 
-    # Locate where employee data starts
-    emp_rows = df[df.iloc[:, 0] == "Employee:"].index.tolist()
+def parse_attendance_shard(input_csv, start, end):
+    """
+    Parses the rows of one byte range of a biometric export (process pool worker).
 
-    cleaned_data = [["Employee ID", "Employee Name", "Type"] + dates]  # Update header
+    Returns:
+        tuple: (dates, blocks) like parse_attendance_rows; dates is None unless the
+               shard holds the "Days" header
+    """
+    with open(input_csv, mode='rb') as file:
+        file.seek(start)
+        data = file.read(end - start if end is not None else -1)
 
-    for i in range(len(emp_rows)):
-        start_idx = emp_rows[i]
-        end_idx = emp_rows[i + 1] if i + 1 < len(emp_rows) else len(df)
+    text = data.decode('utf-8-sig' if start == 0 else 'utf-8')
+    return parse_attendance_rows(csv.reader(io.StringIO(text, newline='')))
 
-        # Extract Employee Name and ID
-        emp_info = str(df.iloc[start_idx, 3])
-        if ":" in emp_info:
-            parts = emp_info.split(":")
-            employee_id = parts[0].strip()
-            employee_name = parts[-1].strip()
-        else:
-            employee_id = ""
-            employee_name = emp_info.strip()
 
-        # Extract the subset of data belonging to this employee
-        emp_data = df.iloc[start_idx:end_idx]
+def parse_attendance_rows(rows):
+    """
+    Collects the "Days" header and the Status/InTime/OutTime rows of each employee block.
+
+    Returns:
+        tuple: (dates, blocks) with dates None if no "Days" row was seen; columns are not trimmed
+    """
+    dates = None
+    blocks = []
+    current_rows = None
+
+    for row in rows:
+        if not row:
+            continue
+        label = row[0]
+
+        if label in ATTENDANCE_ROWS:
+            # Rows before the first "Employee:" block are not attributed to anyone
+            if current_rows is not None and label not in current_rows:
+                current_rows[label] = [None if cell in NA_CELLS else cell for cell in row[2:]]
+
+        elif label == "Employee:":
+            # Extract Employee Name and ID
+            emp_info = row[3] if len(row) > 3 and row[3] not in NA_CELLS else 'nan'
+            if ":" in emp_info:
+                parts = emp_info.split(":")
+                employee_id = parts[0].strip()
+                employee_name = parts[-1].strip()
+            else:
+                employee_id = ""
+                employee_name = emp_info.strip()
 
-        # Locate 'Status', 'InTime', and 'OutTime' rows
-        status_row = emp_data[emp_data.iloc[:, 0] == "Status"]
-        intime_row = emp_data[emp_data.iloc[:, 0] == "InTime"]
-        outtime_row = emp_data[emp_data.iloc[:, 0] == "OutTime"]
+            current_rows = {}
+            blocks.append((employee_id, employee_name, current_rows))
 
-        if not status_row.empty:
-            status_values = status_row.iloc[:, 2:].values.flatten()
-            cleaned_data.append([employee_id, employee_name, "Status"] + list(status_values))
+        elif label == "Days" and dates is None:
+            # Locate the row containing actual dates (first "Days" row of the export)
+            dates = [None if cell in NA_CELLS else cell for cell in row[2:]]
 
-        if not intime_row.empty:
-            intime_values = intime_row.iloc[:, 2:].values.flatten()
-            cleaned_data.append([employee_id, employee_name, "InTime"] + list(intime_values))
+    return dates, blocks
 
-        if not outtime_row.empty:
-            outtime_values = outtime_row.iloc[:, 2:].values.flatten()
-            cleaned_data.append([employee_id, employee_name, "OutTime"] + list(outtime_values))
 
-    # Convert cleaned data into DataFrame
-    new_df = pd.DataFrame(cleaned_data)
-    new_df = new_df.dropna(axis=1, how='all')
+def process_attendance_data(input_csv, workers=None):
+    """
+    Extracts 'Status', 'InTime', and 'OutTime' for each employee,
+    ensuring dates are correctly aligned.
 
-    return new_df
+    The export is streamed row by row in a single pass. Only the "Days" header, the
+    "Employee:" rows and the Status/InTime/OutTime rows are kept; Duration, Late By,
+    Shift and summary rows are skipped as they are read.
+
+    Large exports are split into byte ranges aligned on "Employee:" rows that are
+    parsed in separate worker processes; the blocks are concatenated in file order.
+
+    Args:
+        input_csv (str): Path to the biometric CSV export
+        workers (int): Worker processes; None picks one per CPU for files of at least
+                       PARALLEL_PARSE_MIN_BYTES and parses smaller files in-process
+
+    Returns:
+        tuple: (dates, blocks) where dates is the list of day headers and blocks is a
+               list of (employee_id, employee_name, {row_type: values}) in file order
+    """
+    if workers is None:
+        large = os.path.getsize(input_csv) >= PARALLEL_PARSE_MIN_BYTES
+        workers = (os.cpu_count() or 1) if large else 1
+
+    offsets = find_shard_offsets(input_csv, workers) if workers > 1 else [0]
+    if len(offsets) == 1:
+        with open(input_csv, mode='r', newline='', encoding='utf-8-sig') as file:
+            dates, blocks = parse_attendance_rows(csv.reader(file))
+    else:
+        ends = offsets[1:] + [None]
+        with ProcessPoolExecutor(max_workers=len(offsets)) as executor:
+            shards = list(executor.map(parse_attendance_shard, [input_csv] * len(offsets), offsets, ends))
+
+        # The first "Days" row of the file wins, as in a single pass
+        dates = next((shard_dates for shard_dates, _ in shards if shard_dates is not None), None)
+        blocks = [block for _, shard_blocks in shards for block in shard_blocks]
+
+    if dates is None:
+        raise ValueError(f"No 'Days' header row found in {input_csv}")
+
+    # Drop columns that are empty for the header and every kept row (separator columns)
+    width = max([len(dates)] + [len(values) for _, _, rows in blocks for values in rows.values()])
+    keep = [False] * width
+    for values in [dates] + [values for _, _, rows in blocks for values in rows.values()]:
+        for j, cell in enumerate(values):
+            if cell is not None:
+                keep[j] = True
+    columns = [j for j in range(width) if keep[j]]
+
+    def select(values):
+        return [values[j] if j < len(values) else None for j in columns]
+
+    dates = select(dates)
+    blocks = [(employee_id, employee_name, {row_type: select(values) for row_type, values in rows.items()})
+              for employee_id, employee_name, rows in blocks]
+
+    return dates, blocks
 
 
 def extract_month_year_from_filename(filename):
@@ -147,50 +274,46 @@ def extract_month_year_from_filename(filename):
     return None
 
 
-def create_employee_dict(df):
-    # Extract header row (dates start from column index 3 onward)
-    dates = df.iloc[0, 3:].tolist()
+def create_employee_dict(dates, blocks):
+    """
+    Builds the employee attendance dictionary from the parsed export blocks.
+    InTime and OutTime are stored as minutes since midnight (MISSING_MINUTES when absent).
 
-    # Initialize the dictionary
+    Args:
+        dates (list): Day headers returned by process_attendance_data
+        blocks (list): Employee blocks returned by process_attendance_data
+
+    Returns:
+        dict: Dictionary keyed by employee name with Days, Status, InTime and OutTime lists
+    """
     employee_data = {}
 
-    # Start processing from row 1
-    i = 1
-    while i < len(df):
-        employee_id = str(df.iloc[i, 0])
-        employee_name = df.iloc[i, 1]
-        row_type = df.iloc[i, 2]
-
-        if pd.notna(employee_name) and row_type == "Status":
-            # Status row
-            status = [str(x) if pd.notna(x) else "NaT" for x in df.iloc[i, 3:].tolist()]
-
-            # InTime and OutTime (assume they exist next)
-            in_time = [str(x) if pd.notna(x) else "NaT" for x in df.iloc[i + 1, 3:].tolist()] if i + 1 < len(df) else []
-            out_time = [str(x) if pd.notna(x) else "NaT" for x in df.iloc[i + 2, 3:].tolist()] if i + 2 < len(df) else []
-
-            # Construct nested dictionary
-            employee_data[employee_name] = {
-                "employee_id": employee_id,
-                "Days": dates,
-                "Status": status,
-                "InTime": in_time,
-                "OutTime": out_time
-            }
-
-            i += 3  # Move to next employee's data
-        else:
-            i += 1  # Skip irrelevant rows
+    for employee_id, employee_name, rows in blocks:
+        if 'Status' not in rows:
+            continue  # Skip blocks without attendance rows
+
+        def to_cells(row_type):
+            return rows.get(row_type, [None] * len(dates))
+
+        # Construct nested dictionary (punches are parsed once into minutes since midnight)
+        employee_data[employee_name] = {
+            "employee_id": employee_id,
+            "Days": dates,
+            "Status": ["NaT" if x is None else x for x in to_cells('Status')],
+            "InTime": [parse_minutes(x) for x in to_cells('InTime')],
+            "OutTime": [parse_minutes(x) for x in to_cells('OutTime')]
+        }
 
     return employee_data
 
 
-def process_attendance_file(csv_file_path):
+def process_attendance_file(csv_file_path, workers=None):
     """
     Processes a single CSV file and returns the employee attendance dictionary.
 
     Args:
         csv_file_path (str): Path to the CSV file
+        workers (int): Parser worker processes passed to process_attendance_data
 
     Returns:
         dict: Dictionary containing employee attendance data with updated days
@@ -208,8 +331,8 @@ def process_attendance_file(csv_file_path):
     month_name, year, month_year_key = file_info
 
     # Process the file and create employee dictionary
-    processed_df = process_attendance_data(csv_file_path)
-    employee_data = create_employee_dict(processed_df)
+    dates, blocks = process_attendance_data(csv_file_path, workers)
+    employee_data = create_employee_dict(dates, blocks)
 
     # Update days based on filename
     employee_data = update_days_from_filename(employee_data, csv_file)
@@ -218,6 +341,20 @@ def process_attendance_file(csv_file_path):
     return employee_data
 
 
+def clean_day_label(day_str):
+    """
+    Extracts the proper date format from strings like '23 F (23 August 2024, Friday)'
+    ('23 August 2024, Friday'). Unexpected values are returned unchanged.
+    """
+    if isinstance(day_str, str) and '(' in day_str and ')' in day_str:
+        # Extract the content between parentheses
+        start_idx = day_str.find('(') + 1
+        end_idx = day_str.find(')')
+        if start_idx < end_idx:
+            return day_str[start_idx:end_idx]
+    return day_str
+
+
 def date_cleaning(employee_dictionary):
     """
     Cleans the date format in employee dictionary by extracting the proper date format
@@ -242,28 +379,8 @@ def date_cleaning(employee_dictionary):
             'EmployeeID': employee_data['employee_id']
         }
 
-        # Clean the date format in the Days list
-        days_list = employee_data['Days']
-        cleaned_days = []
-
-        for day_str in days_list:
-            if isinstance(day_str, str) and '(' in day_str and ')' in day_str:
-                # Extract the content between parentheses
-                start_idx = day_str.find('(') + 1
-                end_idx = day_str.find(')')
-                if start_idx < end_idx:
-                    # Get the clean date format
-                    clean_date = day_str[start_idx:end_idx]
-                    cleaned_days.append(clean_date)
-                else:
-                    # If the format is unexpected, keep the original
-                    cleaned_days.append(day_str)
-            else:
-                # If there are no parentheses, keep the original
-                cleaned_days.append(day_str)
-
         # Update the Days list with cleaned dates
-        cleaned_employee_data['Days'] = cleaned_days
+        cleaned_employee_data['Days'] = [clean_day_label(day_str) for day_str in employee_data['Days']]
 
         # Add the updated employee data to the cleaned dictionary
         cleaned_dictionary[employee_name] = cleaned_employee_data
@@ -320,49 +437,7 @@ def sunday_finder(data_dict):
 
 
 ###################################################################################################################
-def get_day(date_str):
-    from datetime import datetime
-    return datetime.strptime(date_str, '%d %B %Y').strftime('%A')
-
-
-holiday_dictionary = {
-    2024: {
-        "New Year": f"1 January 2024, {get_day('1 January 2024')}",
-        "Republic Day": f"26 January 2024, {get_day('26 January 2024')}",
-        "Holi": f"25 March 2024, {get_day('25 March 2024')}",
-        "Ramzan Eid": f"9 April 2024, {get_day('9 April 2024')}",
-        "Gudi Padwa": f"9 April 2024, {get_day('9 April 2024')}",
-        "Labour Day": f"1 May 2024, {get_day('1 May 2024')}",
-        "Independence Day": f"15 August 2024, {get_day('15 August 2024')}",
-        "Raksha Bandhan": f"19 August 2024, {get_day('19 August 2024')}",
-        "Ganesh Chaturthi": f"7 September 2024, {get_day('7 September 2024')}",
-        "Gandhi Jayanti": f"2 October 2024, {get_day('2 October 2024')}",
-        "Dusshera": f"12 October 2024, {get_day('12 October 2024')}",
-        "Diwali": f"1 November 2024, {get_day('1 November 2024')}",
-        "Diwali (Second Day)": f"2 November 2024, {get_day('2 November 2024')}",
-        "Christmas": f"25 December 2024, {get_day('25 December 2024')}"
-    },
-    2025: {
-        "New Year": f"1 January 2025, {get_day('1 January 2025')}",
-        "Republic Day": f"26 January 2025, {get_day('26 January 2025')}",
-        "office Picnic": f"1 February 2025, {get_day('1 February 2025')}",
-        "Holi": f"14 March 2025, {get_day('14 March 2025')}",
-        "Ramzan": f"31 March 2025, {get_day('31 March 2025')}",
-        "Labour Day / Maharashtra Diwas": f"1 May 2025, {get_day('1 May 2025')}",
-        "Raksha Bandhan": f"9 August 2025, {get_day('9 August 2025')}",
-        "Independence Day": f"15 August 2025, {get_day('15 August 2025')}",
-        "Ganesh Chaturthi": f"27 August 2025, {get_day('27 August 2025')}",
-        "Gandhi Jayanti / Dussehra": f"2 October 2025, {get_day('2 October 2025')}",
-        "Diwali": f"21 October 2025, {get_day('21 October 2025')}",
-        "Bhai Duj": f"23 October 2025, {get_day('23 October 2025')}",
-        "Christmas": f"25 December 2025, {get_day('25 December 2025')}"
-    }
-}
-
-
 def daily_working_hours_calculation_bulk(employee_dict):
-    from datetime import datetime, timedelta
-
     for employee, employee_data in employee_dict.items():
         in_times = employee_data['InTime']
         out_times = employee_data['OutTime']
@@ -370,43 +445,19 @@ def daily_working_hours_calculation_bulk(employee_dict):
         daily_working_hours = []
 
         for i, (in_time, out_time) in enumerate(zip(in_times, out_times)):
-            if in_time != 'NaT' and out_time != 'NaT':
-                # Function to parse time strings
-                def parse_time(time_str):
-                    if ' ' in time_str:  # Check if it's a full datetime string
-                        time_str = time_str.split(' ')[1]  # Get the time part
-                    return datetime.strptime(time_str, '%H:%M') if len(time_str) == 5 else datetime.strptime(time_str,
-                                                                                                             '%H:%M:%S')
-
-                try:
-                    in_time_dt = parse_time(in_time)
-                    out_time_dt = parse_time(out_time)
-
-                    # Calculate the difference in time
-                    working_duration = out_time_dt - in_time_dt
-
-                    # Handle cases where the out time is on the next day
-                    if working_duration < timedelta(0):
-                        working_duration += timedelta(days=1)
-
-                    # Convert duration to HH:MM format
-                    hours, remainder = divmod(working_duration.total_seconds(), 3600)
-                    minutes = remainder // 60
-                    working_hours = f"{int(hours):02}:{int(minutes):02}"
-                    daily_working_hours.append(working_hours)
+            if in_time != MISSING_MINUTES and out_time != MISSING_MINUTES:
+                # Working minutes, handling cases where the out time is on the next day
+                daily_working_hours.append(duration_minutes(in_time, out_time))
 
-                    # Condition 1: If status is "NYD", update it to "P"
-                    if status_list[i] == "NYD":
-                        status_list[i] = "P"
+                # Condition 1: If status is "NYD", update it to "P"
+                if status_list[i] == "NYD":
+                    status_list[i] = "P"
 
-                    # Condition 2: If status is "WO", update it to "WOP"
-                    elif status_list[i] == "WO":
-                        status_list[i] = "WOP"
-
-                except ValueError:
-                    daily_working_hours.append("NaT")  # Append "NaT" if parsing fails
+                # Condition 2: If status is "WO", update it to "WOP"
+                elif status_list[i] == "WO":
+                    status_list[i] = "WOP"
             else:
-                daily_working_hours.append("NaT")  # Append "NaT" if in_time or out_time is 'NaT'
+                daily_working_hours.append(MISSING_MINUTES)  # in_time or out_time is missing
 
         # Update the employee's dailyWorkingHours and Status in the JSON
         employee_dict[employee]['dailyWorkingHours'] = daily_working_hours
@@ -415,7 +466,30 @@ def daily_working_hours_calculation_bulk(employee_dict):
     return employee_dict
 
 
-def fixed_holidays(data_dict, holiday_dictionary):
+# Convert month name to number
+MONTH_MAPPING = {
+    'January': 1, 'February': 2, 'March': 3, 'April': 4,
+    'May': 5, 'June': 6, 'July': 7, 'August': 8,
+    'September': 9, 'October': 10, 'November': 11, 'December': 12
+}
+
+
+def day_date_key(day_str):
+    """
+    Parses a cleaned day string (e.g., '15 August 2024, Thursday') into a 'YYYY-MM-DD' key.
+    Returns None when the string does not carry a full date.
+    """
+    if ',' in day_str:
+        date_parts = day_str.split(',')[0].strip().split()
+        if len(date_parts) >= 3:
+            day = int(date_parts[0])
+            month = MONTH_MAPPING[date_parts[1]]
+            year = int(date_parts[2])
+            return f"{year}-{month:02d}-{day:02d}"
+    return None
+
+
+def fixed_holidays(data_dict, holidays):
     """
     Update attendance records based on fixed holidays for the new data structure.
 
@@ -426,34 +500,13 @@ def fixed_holidays(data_dict, holiday_dictionary):
 
     Args:
         data_dict: Dictionary containing attendance data by employee
-        holiday_dictionary: Dictionary with holiday dates by year
+        holidays: HolidayCalendar of the site (see load_holiday_calendar)
 
     Returns:
         Updated attendance dictionary
     """
-    # Create a lookup dictionary for easy holiday checking
-    holiday_lookup = {}
-
-    # Convert holiday dates to lookup format (YYYY-MM-DD)
-    for year, holidays in holiday_dictionary.items():
-        for holiday_name, date_str in holidays.items():
-            # Parse the date string (e.g., '1 January 2024, Monday')
-            date_parts = date_str.split(',')[0].strip().split()
-            day = int(date_parts[0])
-            month_name = date_parts[1]
-            year = int(date_parts[2])
-
-            # Convert month name to number
-            month_mapping = {
-                'January': 1, 'February': 2, 'March': 3, 'April': 4,
-                'May': 5, 'June': 6, 'July': 7, 'August': 8,
-                'September': 9, 'October': 10, 'November': 11, 'December': 12
-            }
-            month = month_mapping[month_name]
-
-            # Create date key in format YYYY-MM-DD
-            date_key = f"{year}-{month:02d}-{day:02d}"
-            holiday_lookup[date_key] = holiday_name
+    # 'YYYY-MM-DD' -> holiday name lookup for easy holiday checking
+    holiday_lookup = holidays.lookup
 
     # Process each employee in the attendance dictionary
     for employee_name, emp_data in data_dict.items():
@@ -464,32 +517,14 @@ def fixed_holidays(data_dict, holiday_dictionary):
 
             # Process each day's status
             for i, (status, day_str) in enumerate(zip(status_list, days_list)):
-                # Parse the date from the day string (e.g., '15 August 2024, Thursday')
-                if ',' in day_str:
-                    date_parts = day_str.split(',')[0].strip().split()
-                    if len(date_parts) >= 3:
-                        day = int(date_parts[0])
-                        month_name = date_parts[1]
-                        year = int(date_parts[2])
-
-                        # Convert month name to number
-                        month_mapping = {
-                            'January': 1, 'February': 2, 'March': 3, 'April': 4,
-                            'May': 5, 'June': 6, 'July': 7, 'August': 8,
-                            'September': 9, 'October': 10, 'November': 11, 'December': 12
-                        }
-                        month = month_mapping[month_name]
-
-                        date_key = f"{year}-{month:02d}-{day:02d}"
-
-                        # Check if this date is a holiday
-                        if date_key in holiday_lookup:
-                            # Apply rules based on current status
-                            if status == "NYD":
-                                data_dict[employee_name]['Status'][i] = "HO"
-                            elif status == "P":
-                                data_dict[employee_name]['Status'][i] = "HOP"
-                            # If status is "WO", keep it as is (already weekend)
+                # Check if this date is a holiday
+                if day_date_key(day_str) in holiday_lookup:
+                    # Apply rules based on current status
+                    if status == "NYD":
+                        data_dict[employee_name]['Status'][i] = "HO"
+                    elif status == "P":
+                        data_dict[employee_name]['Status'][i] = "HOP"
+                    # If status is "WO", keep it as is (already weekend)
 
     return data_dict
 
@@ -498,8 +533,8 @@ def absent_days(employee_dict):
     for employee, records in employee_dict.items():
         for i in range(len(records['Status'])):
             if (
-                    records['InTime'][i] == 'NaT' and
-                    records['OutTime'][i] == 'NaT' and
+                    records['InTime'][i] == MISSING_MINUTES and
+                    records['OutTime'][i] == MISSING_MINUTES and
                     records['Status'][i] == 'NYD'
             ):
                 records['Status'][i] = 'A'  # Mark as Absent
@@ -531,13 +566,11 @@ def missing_punch(attendance_data):
             out_time = data['OutTime'][i]
 
             # Check if the day has NYD status or potential missing punches
-            if status == 'NYD' or (in_time != 'NaT' and out_time == 'NaT'):
+            if status == 'NYD' or (in_time != MISSING_MINUTES and out_time == MISSING_MINUTES):
                 # Handle case where employee forgot to punch out
-                if in_time != 'NaT' and out_time == 'NaT':
-                    in_time_hour = int(in_time.split(':')[0])
-
+                if in_time != MISSING_MINUTES and out_time == MISSING_MINUTES:
                     # If punch time is before 11:00, it's likely a proper in-time with missing out-time
-                    if in_time_hour < 11:
+                    if in_time < 11 * 60:
                         employee_insights.append({
                             'day': day,
                             'issue': 'Missing punch-out',
@@ -556,16 +589,14 @@ def missing_punch(attendance_data):
                         })
                         # Move InTime to OutTime, set InTime to NaT
                         data['OutTime'][i] = in_time
-                        data['InTime'][i] = 'NaT'
+                        data['InTime'][i] = MISSING_MINUTES
                         data['Status'][i] = 'P'
 
                 # Handle NYD status with any punch recorded
                 elif status == 'NYD':
-                    if in_time != 'NaT':
-                        in_time_hour = int(in_time.split(':')[0])
-
+                    if in_time != MISSING_MINUTES:
                         # If punch time is before 11:00, it's likely a proper in-time with missing out-time
-                        if in_time_hour < 11:
+                        if in_time < 11 * 60:
                             employee_insights.append({
                                 'day': day,
                                 'issue': 'Missing punch-out',
@@ -585,7 +616,7 @@ def missing_punch(attendance_data):
                             })
                             # Move InTime to OutTime, set InTime to NaT
                             data['OutTime'][i] = in_time
-                            data['InTime'][i] = 'NaT'
+                            data['InTime'][i] = MISSING_MINUTES
                             data['Status'][i] = 'P'
 
         # Only add employee to insights if there are issues to report
@@ -596,64 +627,37 @@ def missing_punch(attendance_data):
 
 
 def calculate_daily_working_hours(employee_dict):
-    from datetime import datetime, timedelta
-    # Function to parse time in HH:MM format
-    def parse_time(time_str):
-        return datetime.strptime(time_str, "%H:%M") if time_str != 'NaT' else None
-
-    # Function to format timedelta to HH:MM
-    def format_timedelta(td):
-        total_seconds = int(td.total_seconds())
-        hours, remainder = divmod(total_seconds, 3600)
-        minutes, _ = divmod(remainder, 60)
-        return f"{hours:02}:{minutes:02}"
-
-    # Function to calculate average time from a list of datetime objects
-    def calculate_average_time(time_list):
-        total_seconds = sum([(t.hour * 3600 + t.minute * 60) for t in time_list])
-        average_seconds = total_seconds // len(time_list)
-        hours, remainder = divmod(average_seconds, 3600)
-        minutes, _ = divmod(remainder, 60)
-        return f"{hours:02}:{minutes:02}"
-
     for employee, details in employee_dict.items():
         in_times = details['InTime']
         out_times = details['OutTime']
         working_hours = []
-        total_working_time = timedelta()
+        total_working_minutes = 0
         valid_in_times = []
         valid_out_times = []
 
         for in_time, out_time in zip(in_times, out_times):
-            if in_time != 'NaT' and out_time != 'NaT':
-                in_time_parsed = parse_time(in_time)
-                out_time_parsed = parse_time(out_time)
-
+            if in_time != MISSING_MINUTES and out_time != MISSING_MINUTES:
                 # Handle the case where the employee worked past midnight
-                if out_time_parsed < in_time_parsed:
-                    out_time_parsed += timedelta(days=1)
-
-                duration = out_time_parsed - in_time_parsed
-                working_hours.append(format_timedelta(duration))
-                total_working_time += duration
-                valid_in_times.append(in_time_parsed)
-                valid_out_times.append(out_time_parsed)
+                duration = duration_minutes(in_time, out_time)
+                working_hours.append(duration)
+                total_working_minutes += duration
+                valid_in_times.append(in_time)
+                valid_out_times.append(out_time)
             else:
-                working_hours.append('NaT')
+                working_hours.append(MISSING_MINUTES)
 
         details['dailyWorkingHours'] = working_hours
 
-        # Calculate average working time
-        total_days = len([time for time in working_hours if time != 'NaT'])
+        # Calculate average working time (in minutes)
+        total_days = len(valid_in_times)
         if total_days > 0:
-            average_working_time = total_working_time / total_days
-            details['averageWorkingHour'] = format_timedelta(average_working_time)
-            details['averageInTime'] = calculate_average_time(valid_in_times)
-            details['averageOutTime'] = calculate_average_time(valid_out_times)
+            details['averageWorkingHour'] = total_working_minutes // total_days
+            details['averageInTime'] = sum(valid_in_times) // total_days
+            details['averageOutTime'] = sum(valid_out_times) // total_days
         else:
-            details['averageWorkingHour'] = '00:00'
-            details['averageInTime'] = '00:00'
-            details['averageOutTime'] = '00:00'
+            details['averageWorkingHour'] = 0
+            details['averageInTime'] = 0
+            details['averageOutTime'] = 0
 
     return employee_dict
 
@@ -666,11 +670,8 @@ def half_day(employee_dict):
             daily_hours = details['dailyWorkingHours'][i]
             status = details['Status'][i]
 
-            if daily_hours != 'NaT':
-                hours, minutes = map(int, daily_hours.split(':'))
-                total_minutes = hours * 60 + minutes
-
-                if total_minutes < 420:  # less than 7 hours
+            if daily_hours != MISSING_MINUTES:
+                if daily_hours < 420:  # less than 7 hours
                     half_day_map[i] = 1
                     if status == 'P':
                         details['Status'][i] = 'P1/2'
@@ -686,33 +687,15 @@ def half_day(employee_dict):
 
 
 def recalibrator(employee_dict):
-    from datetime import datetime, timedelta
-
-    def parse_time(time_str):
-        return datetime.strptime(time_str, "%H:%M") if time_str != 'NaT' else None
-
-    def format_timedelta(td):
-        total_seconds = int(td.total_seconds())
-        hours, remainder = divmod(total_seconds, 3600)
-        minutes, _ = divmod(remainder, 60)
-        return f"{hours:02}:{minutes:02}"
-
     for employee, details in employee_dict.items():
         for i in range(len(details['Days'])):
             status = details['Status'][i]
             in_time = details['InTime'][i]
             out_time = details['OutTime'][i]
 
-            if status == 'NYD' and in_time != 'NaT' and out_time != 'NaT':
-                in_time_parsed = parse_time(in_time)
-                out_time_parsed = parse_time(out_time)
-
+            if status == 'NYD' and in_time != MISSING_MINUTES and out_time != MISSING_MINUTES:
                 # Handle the case where the employee worked past midnight
-                if out_time_parsed < in_time_parsed:
-                    out_time_parsed += timedelta(days=1)
-
-                duration = out_time_parsed - in_time_parsed
-                details['dailyWorkingHours'][i] = format_timedelta(duration)
+                details['dailyWorkingHours'][i] = duration_minutes(in_time, out_time)
                 details['Status'][i] = 'P'
 
     return employee_dict
@@ -729,16 +712,12 @@ def calculate_latemark(employee_dict):
             data['lateMarkAbsentee'] = 0.0
 
         for in_time in in_time_list:
-            if in_time and in_time != 'NaT':  # Check if the InTime is valid
-                try:
-                    hours, minutes = map(int, in_time.split(':'))
-                    if (hours == 10 and minutes > 30) or (hours > 10):
-                        late_mark.append(1)  # Mark as late
-                        late_count += 1
-                    else:
-                        late_mark.append(0)  # Not late
-                except ValueError:
-                    late_mark.append(0)  # Handle unexpected formats
+            if in_time != MISSING_MINUTES:  # Check if the InTime is valid
+                if in_time > 10 * 60 + 30:  # After 10:30
+                    late_mark.append(1)  # Mark as late
+                    late_count += 1
+                else:
+                    late_mark.append(0)  # Not late
             else:
                 late_mark.append(0)  # Handle NaT cases
 
@@ -759,24 +738,15 @@ def early_leave(employee_dict, expected_work_hours=9):
         out_time = data.get('OutTime', [])
 
         early_leave_map = []  # List to store early leave mappings
-        early_leave_time = []  # List to store early leave times in HH:MM format
+        early_leave_time = []  # List to store early leave times in minutes
         total_early_leave = 0  # Counter for total early leaves
         total_incomplete_minutes = 0  # Counter for total early leave time in minutes
 
         for i in range(len(status)):
             if status[i] == 'P':  # Check if status is P
-                if in_time[i] != 'NaT' and out_time[i] != 'NaT':
-                    # Parse InTime and OutTime
-                    in_h, in_m = map(int, in_time[i].split(':'))
-                    out_h, out_m = map(int, out_time[i].split(':'))
-
-                    # Adjust for midnight crossing
-                    if out_h < in_h or (out_h == in_h and out_m < in_m):
-                        out_h += 24
-
-                    # Calculate total working hours
-                    total_working_minutes = (out_h * 60 + out_m) - (in_h * 60 + in_m)
-                    total_working_hours = total_working_minutes / 60  # Convert to hours
+                if in_time[i] != MISSING_MINUTES and out_time[i] != MISSING_MINUTES:
+                    # Calculate total working minutes, adjusting for midnight crossing
+                    total_working_minutes = duration_minutes(in_time[i], out_time[i])
 
                     # Calculate early leave time
                     expected_working_minutes = expected_work_hours * 60
@@ -787,41 +757,27 @@ def early_leave(employee_dict, expected_work_hours=9):
                         # Calculate early leave time in minutes
                         early_minutes = expected_working_minutes - total_working_minutes
                         total_incomplete_minutes += early_minutes
-
-                        # Convert early leave time to HH:MM format
-                        early_h = early_minutes // 60
-                        early_m = early_minutes % 60
-                        early_leave_time.append(f"{early_h:02}:{early_m:02}")
+                        early_leave_time.append(early_minutes)
                     else:
                         early_leave_map.append(0)  # Did not leave early
-                        early_leave_time.append("00:00")
+                        early_leave_time.append(0)
                 else:
                     early_leave_map.append(0)  # Handle NaT cases as not early leave
-                    early_leave_time.append("00:00")
+                    early_leave_time.append(0)
             else:
                 early_leave_map.append(0)  # Ignore other statuses
-                early_leave_time.append("00:00")
-
-        # Convert total incomplete minutes to HH:MM format
-        incomplete_h = total_incomplete_minutes // 60
-        incomplete_m = total_incomplete_minutes % 60
-        incomplete_hours = f"{incomplete_h:02}:{incomplete_m:02}"
+                early_leave_time.append(0)
 
         # Update the employee's dictionary with new data
         employee_dict[employee]['earlyLeaveMap'] = early_leave_map
         employee_dict[employee]['earlyLeaveTime'] = early_leave_time
         employee_dict[employee]['totalEarlyLeave'] = total_early_leave
-        employee_dict[employee]['incompleteHours'] = incomplete_hours
+        employee_dict[employee]['incompleteHours'] = total_incomplete_minutes
 
     return employee_dict
 
 
 def nonworking_days_compoff(employee_dict):
-    from datetime import datetime, timedelta
-
-    def parse_time(time_str):
-        return datetime.strptime(time_str, "%H:%M") if time_str != 'NaT' else None
-
     for employee, details in employee_dict.items():
         comp_off = 0  # Initialize the compOff counter
 
@@ -829,13 +785,14 @@ def nonworking_days_compoff(employee_dict):
             status = details['Status'][i]
             in_time = details['InTime'][i]
             out_time = details['OutTime'][i]
+            punched = in_time != MISSING_MINUTES and out_time != MISSING_MINUTES
 
             # Check for working on weekends (WO)
-            if status == 'WOP' and in_time != 'NaT' and out_time != 'NaT':
+            if status == 'WOP' and punched:
                 comp_off += 1  # Increment compOff for each working weekend
 
             # Check for working on holidays (HO)
-            if status == 'HOP' and in_time != 'NaT' and out_time != 'NaT':
+            if status == 'HOP' and punched:
                 comp_off += 1  # Increment compOff for each working holiday
 
         # Update the employee's dictionary with the compOff value
@@ -846,13 +803,6 @@ def nonworking_days_compoff(employee_dict):
 
 def overtime(employee_dict, expected_work_hours=9):
     expected_work_minutes = expected_work_hours * 60  # Convert expected work hours to minutes
-    from datetime import datetime, timedelta
-
-    def format_timedelta(td):
-        total_seconds = int(td.total_seconds())
-        hours, remainder = divmod(total_seconds, 3600)
-        minutes, _ = divmod(remainder, 60)
-        return f"{hours:02}:{minutes:02}"
 
     for employee, details in employee_dict.items():
         over_time = []
@@ -863,34 +813,29 @@ def overtime(employee_dict, expected_work_hours=9):
         statuses = details.get('Status', [])
 
         for i in range(len(working_hours)):
-            daily_hours = working_hours[i]
+            total_minutes = working_hours[i]
             status = statuses[i] if i < len(statuses) else None
 
-            if daily_hours != 'NaT':
-                hours, minutes = map(int, daily_hours.split(':'))
-                total_minutes = hours * 60 + minutes
-
+            if total_minutes != MISSING_MINUTES:
                 # Check for WOP/WOS special case
                 if status in ['WOP', 'WOS', 'WOP1/2']:
-                    overtime_td = timedelta(minutes=total_minutes)
-                    over_time.append(format_timedelta(overtime_td))
+                    over_time.append(total_minutes)
                     total_actual_overtime_minutes += total_minutes
                     total_payable_overtime_minutes += total_minutes
                 elif total_minutes > expected_work_minutes:
                     overtime_minutes = total_minutes - expected_work_minutes
-                    overtime_td = timedelta(minutes=overtime_minutes)
-                    over_time.append(format_timedelta(overtime_td))
+                    over_time.append(overtime_minutes)
                     total_actual_overtime_minutes += overtime_minutes
                     if overtime_minutes > 60:
                         total_payable_overtime_minutes += overtime_minutes
                 else:
-                    over_time.append("00:00")
+                    over_time.append(0)
             else:
-                over_time.append("00:00")
+                over_time.append(0)
 
         details['overTime'] = over_time
-        details['actualOverTime'] = format_timedelta(timedelta(minutes=total_actual_overtime_minutes))
-        details['payableOverTime'] = format_timedelta(timedelta(minutes=total_payable_overtime_minutes))
+        details['actualOverTime'] = total_actual_overtime_minutes
+        details['payableOverTime'] = total_payable_overtime_minutes
 
     return employee_dict
 
@@ -975,8 +920,8 @@ def calculate_metric(employee_dict):
             "OfficeWorkingDays": 0,
             "EmployeeTotalWorkingDay": 0,
             "PublicHolidays": 0,
-            "EmployeeAverageWorkingHours": "00:00",
-            "EmployeeTotalWorkingHours": "00:00",
+            "EmployeeAverageWorkingHours": 0,
+            "EmployeeTotalWorkingHours": 0,
             "EmployeeActualAbsentee": 0,
             "TotalHolidays": 0
         }
@@ -1006,25 +951,19 @@ def calculate_metric(employee_dict):
         # Calculation 3: PublicHolidays
         report_metric["PublicHolidays"] = holidays
 
-        # Calculation 4: EmployeeAverageWorkingHours
-        total_working_hours = timedelta()
+        # Calculation 4: EmployeeAverageWorkingHours (minutes)
+        total_working_minutes = 0
         valid_days = 0
-        for hours in data['dailyWorkingHours']:
-            if hours != 'NaT':
-                h, m = map(int, hours.split(':'))
-                total_working_hours += timedelta(hours=h, minutes=m)
+        for minutes in data['dailyWorkingHours']:
+            if minutes != MISSING_MINUTES:
+                total_working_minutes += minutes
                 valid_days += 1
 
         if valid_days > 0:
-            avg_working_hours = total_working_hours / valid_days
-            avg_hours, rem = divmod(avg_working_hours.total_seconds(), 3600)
-            avg_minutes = rem // 60
-            report_metric["EmployeeAverageWorkingHours"] = f"{int(avg_hours):02}:{int(avg_minutes):02}"
+            report_metric["EmployeeAverageWorkingHours"] = total_working_minutes // valid_days
 
-        # Calculation 5: EmployeeTotalWorkingHours
-        total_hours, rem = divmod(total_working_hours.total_seconds(), 3600)
-        total_minutes = rem // 60
-        report_metric["EmployeeTotalWorkingHours"] = f"{int(total_hours):02}:{int(total_minutes):02}"
+        # Calculation 5: EmployeeTotalWorkingHours (minutes)
+        report_metric["EmployeeTotalWorkingHours"] = total_working_minutes
 
         # Calculation 6: EmployeeTotalAbsentee
         report_metric["EmployeeActualAbsentee"] = data['Status'].count('A')
@@ -1116,13 +1055,6 @@ def calculate_adherence_ratio(employee_dict):
 
 
 def calculate_work_deficit_ratio(employee_dict):
-    def time_to_minutes(time_str):
-        """Convert a time string in HH:MM format to total minutes."""
-        if time_str == 'NaT' or time_str == '00:00' or time_str == '0':
-            return 0
-        hours, minutes = map(int, time_str.split(':'))
-        return hours * 60 + minutes
-
     """
     Calculate the Work Deficit Ratio for each employee based on their working hours,
     and add it to their respective dictionaries.
@@ -1134,11 +1066,10 @@ def calculate_work_deficit_ratio(employee_dict):
     dict: Updated employee dictionary with workDeficitRatio and workDeficitRatioStar keys added inside each employee's dictionary.
     """
     for employee_name, employee_data in employee_dict.items():
-        # Extracting the required values and converting them to minutes
-        incomplete_working_hours = time_to_minutes(employee_data.get('incompleteHours', '00:00'))
-        overtime_hours = time_to_minutes(employee_data.get('payableOverTime', '00:00'))
-        total_working_hours = time_to_minutes(
-            employee_data['reportMetric'].get('EmployeeTotalWorkingHours', '00:00'))  # Default to '00:00'
+        # Extracting the required values (all in minutes)
+        incomplete_working_hours = employee_data.get('incompleteHours', 0)
+        overtime_hours = employee_data.get('payableOverTime', 0)
+        total_working_hours = employee_data['reportMetric'].get('EmployeeTotalWorkingHours', 0)
 
         # Calculate Work Deficit Ratio
         if total_working_hours > 0:  # Avoid division by zero
@@ -1218,6 +1149,12 @@ def process_missing_data(insights_dict):
     Returns:
     pandas.DataFrame: DataFrame containing all missing data with recommendations
     """
+    columns = ['Employee Name', 'Date', 'Day', 'Issue', 'Current Status', 'Recommendation']
+
+    # A month without missing punches has nothing to report
+    if not insights_dict:
+        return pd.DataFrame(columns=columns)
+
     # List to store all records
     records = []
 
@@ -1261,7 +1198,7 @@ def process_missing_data(insights_dict):
                 records.append(record)
 
     # Create DataFrame from records
-    df = pd.DataFrame(records)
+    df = pd.DataFrame(records, columns=columns)
 
     # Sort by employee name and date
     if not df.empty:
@@ -1,16 +1,20 @@
+import uuid
 import plotly.io
 import plotly.express as px
 from datetime import timedelta, datetime
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 
+from functions.time_utils import MISSING_MINUTES, format_minutes, minutes_to_hours
+
 
 def generate_employee_card(selected_employee):
     # Create the header for the employee name
     header_html = f"<h2 class='text-center font-weight-bold mb-4'>{selected_employee}</h2>"
 
 def total_working_hours(employee_dict_dashboard):
-    total_working_hour = employee_dict_dashboard.get('reportMetric', {}).get('EmployeeTotalWorkingHours', 'N/A')
+    total_working_hour = employee_dict_dashboard.get('reportMetric', {}).get('EmployeeTotalWorkingHours')
+    total_working_hour = format_minutes(total_working_hour) if total_working_hour is not None else 'N/A'
 
     card =  f"""
         <div class="card m-2 card-total-working-hours">
@@ -23,7 +27,8 @@ def total_working_hours(employee_dict_dashboard):
     return card
 
 def average_working_hours(employee_dict_dashboard):
-    average_working_hour = employee_dict_dashboard.get('averageWorkingHour', 'N/A')
+    average_working_hour = employee_dict_dashboard.get('averageWorkingHour')
+    average_working_hour = format_minutes(average_working_hour) if average_working_hour is not None else 'N/A'
 
     card =  f"""
         <div class="card m-2 card-average-working-hours">
@@ -76,14 +81,13 @@ def total_deduction(employee_dict_dashboard):
 
 def create_gauge_chart(employee_dict_dashboard):
     office_working_days = employee_dict_dashboard['reportMetric']['OfficeWorkingDays']
-    total_working_hours_str = employee_dict_dashboard['reportMetric']['EmployeeTotalWorkingHours']
+    total_working_minutes = employee_dict_dashboard['reportMetric']['EmployeeTotalWorkingHours']
 
     # Calculate expected working hours
     expected_working_hours = office_working_days * 9
 
-    # Convert total working hours string to hours
-    total_working_hours_parts = total_working_hours_str.split(':')
-    total_working_hours = int(total_working_hours_parts[0]) + int(total_working_hours_parts[1]) / 60
+    # Convert total working minutes to hours
+    total_working_hours = minutes_to_hours(total_working_minutes)
 
     # Determine the color based on whether total working hours exceed expected working hours
     if total_working_hours >= expected_working_hours:
@@ -141,9 +145,8 @@ def create_line_chart(employee_dict_dashboard):
             filtered_dates.append(day)
             filtered_hours.append(hours)
 
-    # Convert 'NaT' to 0 and other time strings to hours
-    filtered_hours = [0 if hours == 'NaT' else int(hours.split(':')[0]) + int(hours.split(':')[1]) / 60 for hours in
-                      filtered_hours]
+    # Convert missing days to 0 and working minutes to hours
+    filtered_hours = [0 if minutes == MISSING_MINUTES else minutes_to_hours(minutes) for minutes in filtered_hours]
 
     # Convert string dates to datetime objects
     dates = [datetime.strptime(day.split(',')[0], '%d %B %Y') for day in filtered_dates]
@@ -458,9 +461,7 @@ def create_overtime_barchart(employee_dict_dashboard):
         day_number = datetime.strptime(day, '%d %B %Y, %A').day
         all_days.append(f'{day_number:02d}')
 
-        hours, minutes = map(int, overtime.split(':'))
-        total_minutes = hours * 60 + minutes
-        overtime_hours = total_minutes / 60  # Convert to hours
+        overtime_hours = overtime / 60  # Convert minutes to hours
         all_overtimes.append(overtime_hours)
 
         # Determine bar color based on overtime
@@ -602,3 +603,54 @@ def generate_star_rating_html(employee_dict):
     """
 
     return html_output
+
+
+def figure_json_html(fig):
+    """
+    Renders a figure as an empty div plus its JSON spec, drawn by the dashboard page with Plotly.newPlot.
+
+    Unlike plotly.io.to_html(fig, full_html=False), the plotly.js bundle is not inlined;
+    the page loads it once from /static/js/plotly.min.js.
+
+    Args:
+        fig (go.Figure): Figure to render
+
+    Returns:
+        str: HTML placeholder div followed by an application/json script tag
+    """
+    div_id = str(uuid.uuid4())
+
+    # Same div size rules as to_html: layout width/height in px, otherwise fill the container
+    width = f"{fig.layout.width}px" if fig.layout.width is not None else "100%"
+    height = f"{fig.layout.height}px" if fig.layout.height is not None else "100%"
+
+    # Escape '</' so the JSON can't close the script tag early
+    figure_json = plotly.io.to_json(fig, validate=False).replace('</', '<\\/')
+
+    return (f'<div id="{div_id}" class="plotly-graph-div" style="height:{height}; width:{width};"></div>'
+            f'<script type="application/json" data-plotly-figure="{div_id}">{figure_json}</script>')
+
+
+def render_dashboard_fragments(employee_dict_dashboard):
+    """
+    Renders every card and figure of the employee dashboard.
+
+    Args:
+        employee_dict_dashboard (dict): Processed attendance record of one employee
+
+    Returns:
+        dict: Template variable name -> rendered HTML fragment
+    """
+    return {
+        'total_work_hour_card': total_working_hours(employee_dict_dashboard),
+        'average_work_hour_card': average_working_hours(employee_dict_dashboard),
+        'actual_absantee_card': acutal_absantees(employee_dict_dashboard),
+        'late_mark_card': late_marks_total(employee_dict_dashboard),
+        'total_deduction_card': total_deduction(employee_dict_dashboard),
+        'target_gauge_html': figure_json_html(create_gauge_chart(employee_dict_dashboard)),
+        'daily_working_trend_line_html': figure_json_html(create_line_chart(employee_dict_dashboard)),
+        'status_donutChart_html': figure_json_html(create_donut_chart(employee_dict_dashboard)),
+        'heatmap_metric_html': figure_json_html(create_combined_barchart(employee_dict_dashboard)),
+        'overtime_barchart_html': figure_json_html(create_overtime_barchart(employee_dict_dashboard)),
+        'star_fig': generate_star_rating_html(employee_dict_dashboard),
+    }
@@ -0,0 +1,83 @@
+import threading
+from collections import OrderedDict
+
+
+def fragments_size(fragments):
+    """Approximate memory of a dict of rendered HTML fragments (characters of all strings)."""
+    return sum(len(fragment) for fragment in fragments.values())
+
+
+class FragmentCache:
+    """
+    Bounded LRU cache of rendered dashboard fragments.
+
+    Entries are keyed by (dataset version, employee) and evicted least recently used
+    first once the total size of the cached fragments exceeds max_size characters.
+    Hit, miss and eviction counters are kept for monitoring.
+    """
+
+    def __init__(self, max_size=32 * 1024 * 1024):
+        self.max_size = max_size
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()  # key -> (fragments, size)
+        self._lock = threading.Lock()
+
+    def get_or_render(self, key, render):
+        """
+        Returns the cached fragments for key, calling render() and caching its result on a miss.
+
+        Args:
+            key (tuple): (dataset version, employee name)
+            render (callable): Builds the fragments dict when the key is not cached
+
+        Returns:
+            dict: Rendered fragments
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            self.misses += 1
+
+        # Render outside the lock so other employees are not blocked meanwhile
+        fragments = render()
+        size = fragments_size(fragments)
+        if size > self.max_size:
+            return fragments
+
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.size -= previous[1]
+            self._entries[key] = (fragments, size)
+            self.size += size
+            while self.size > self.max_size:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self.size -= evicted_size
+                self.evictions += 1
+        return fragments
+
+    def stats(self):
+        """Counters and current occupancy of the cache."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'size': self.size,
+                'max_size': self.max_size,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+            }
+
+    def clear(self):
+        """Drops every cached fragment; counters are kept."""
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
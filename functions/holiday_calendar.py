@@ -0,0 +1,114 @@
+import csv
+import datetime
+import hashlib
+import os
+import threading
+
+import numpy as np
+
+# Holiday data file: one 'site,date,name' row per holiday, dates as YYYY-MM-DD
+HOLIDAY_CALENDAR_FILE = os.path.join('static', 'resources', 'holidays', 'holiday_calendar.csv')
+DEFAULT_SITE = 'default'
+
+
+class HolidayCalendar:
+    """
+    Compiled holiday list of one site.
+
+    Holidays are kept as a sorted array of date ordinals (datetime.date.toordinal())
+    for vectorized lookups and as one bitset per year (bit n = day n + 1 of the year)
+    for O(1) membership tests of single dates. 'fingerprint' identifies the holiday
+    list, e.g. for cache keys of results computed with it.
+    """
+
+    def __init__(self, site, holidays):
+        """
+        Args:
+            site (str): Site name
+            holidays (list): (datetime.date, holiday name) tuples; a date listed twice keeps its last name
+        """
+        self.site = site
+        self.lookup = {date.isoformat(): name for date, name in holidays}  # 'YYYY-MM-DD' -> holiday name
+        dates = sorted(datetime.date.fromisoformat(date_key) for date_key in self.lookup)
+
+        self.ordinals = np.array([date.toordinal() for date in dates], dtype=np.int32)
+        self.ordinals.flags.writeable = False
+
+        self._year_bits = {}
+        for date in dates:
+            self._year_bits[date.year] = self._year_bits.get(date.year, 0) | 1 << (date.timetuple().tm_yday - 1)
+
+        listing = repr((site, sorted(self.lookup.items())))
+        self.fingerprint = hashlib.sha256(listing.encode('utf-8')).hexdigest()[:16]
+
+    def __contains__(self, date):
+        """True if date (datetime.date) is a holiday."""
+        return bool(self._year_bits.get(date.year, 0) >> (date.timetuple().tm_yday - 1) & 1)
+
+    def __len__(self):
+        return len(self.ordinals)
+
+    def mask(self, ordinals):
+        """Boolean array marking which of the given date ordinals are holidays."""
+        ordinals = np.asarray(ordinals)
+        if not len(self.ordinals):
+            return np.zeros(ordinals.shape, dtype=bool)
+        positions = np.minimum(np.searchsorted(self.ordinals, ordinals), len(self.ordinals) - 1)
+        return self.ordinals[positions] == ordinals
+
+
+def read_holiday_file(file_path):
+    """
+    Reads a holiday data file into one HolidayCalendar per site.
+
+    Args:
+        file_path (str): CSV file with 'site', 'date' (YYYY-MM-DD) and 'name' columns
+
+    Returns:
+        dict: Site name -> HolidayCalendar
+    """
+    sites = {}
+    with open(file_path, 'r', newline='', encoding='utf-8') as f:
+        for line, row in enumerate(csv.DictReader(f), start=2):
+            try:
+                date = datetime.date.fromisoformat(row['date'].strip())
+            except (AttributeError, KeyError, ValueError):
+                raise ValueError(f"Invalid holiday date on line {line} of {file_path}: {row.get('date')}")
+            site = (row.get('site') or DEFAULT_SITE).strip()
+            sites.setdefault(site, []).append((date, (row.get('name') or '').strip()))
+
+    return {site: HolidayCalendar(site, holidays) for site, holidays in sites.items()}
+
+
+# file path -> ((mtime_ns, size), site -> HolidayCalendar)
+_loaded = {}
+_lock = threading.Lock()
+
+
+def load_holiday_calendar(site=DEFAULT_SITE, file_path=HOLIDAY_CALENDAR_FILE):
+    """
+    Returns the compiled holiday calendar of a site.
+
+    The data file is parsed and compiled once and cached; it is only read again
+    after its modification time or size changes, so edits to the file take effect
+    without restarting the application.
+
+    Args:
+        site (str): Site whose holidays to return
+        file_path (str): Holiday data file
+
+    Returns:
+        HolidayCalendar: Compiled holidays of the site
+    """
+    stat = os.stat(file_path)
+    signature = (stat.st_mtime_ns, stat.st_size)
+    with _lock:
+        cached = _loaded.get(file_path)
+        if cached is None or cached[0] != signature:
+            cached = (signature, read_holiday_file(file_path))
+            _loaded[file_path] = cached
+
+    sites = cached[1]
+    if site not in sites:
+        raise ValueError(f"Unknown holiday site '{site}' (available: {', '.join(sorted(sites))})")
+    return sites[site]
@@ -1,45 +1,186 @@
+import numpy as np
+import openpyxl
 import pandas as pd
 from datetime import datetime, timedelta
 
-def process_employee_hroneData(file_path):
-    # Read the Excel file
-    df = pd.read_excel(file_path)
-
-    # Extract the columns with date data (adjust month filtering as needed)
-    date_columns = [col for col in df.columns if 'Aug' in col or 'Jul' in col or 'Sep' in col or 'Jan' in col
-                    or 'Feb' in col or 'Mar' in col or 'Apr' in col or 'May' in col or 'Jun' in col or 'Oct' in col
-                    or 'Nov' in col or 'Dec' in col]
+from functions.time_utils import MISSING_MINUTES, parse_minutes, duration_minutes
+from functions.biometric_function_new import clean_day_label, day_date_key
+
+# Month abbreviations that identify the date columns of an HROne register header
+HRONE_MONTHS = ('Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec')
+
+# Rows of shift cells parsed together by read_hrone_register
+HRONE_ROW_BATCH = 1024
+
+
+def hrone_date_columns(header):
+    """
+    Resolves the date columns of an HROne register from its header row.
+
+    Returns:
+        list: (column index, day label) for every column whose name contains a month abbreviation
+    """
+    date_columns = []
+    for column, name in enumerate(header):
+        if isinstance(name, datetime):
+            name = name.strftime("%d %b %Y")
+        if isinstance(name, str) and any(month in name for month in HRONE_MONTHS):
+            date_columns.append((column, name))
+    return date_columns
+
+
+def parse_hhmm(times):
+    """
+    Converts an array of time strings to minutes since midnight.
+
+    'HH:MM' cells are decoded from their character codes without per-cell Python
+    objects; '--:--' and blank cells are missing punches and anything else goes
+    through parse_minutes.
+
+    Args:
+        times (np.ndarray): Unicode string array
+
+    Returns:
+        np.ndarray: int16 minutes, MISSING_MINUTES for missing punches
+    """
+    times = np.char.strip(times)
+    minutes = np.full(times.shape, MISSING_MINUTES, dtype=np.int16)
+    if times.size == 0:
+        return minutes
+
+    codes = times.astype('U5').view(np.uint32).reshape(times.shape + (5,)).astype(np.int32)
+    digits = codes - ord('0')
+    hours = digits[..., 0] * 10 + digits[..., 1]
+    mins = digits[..., 3] * 10 + digits[..., 4]
+    simple = ((np.char.str_len(times) == 5) & (codes[..., 2] == ord(':'))
+              & np.all((digits[..., [0, 1, 3, 4]] >= 0) & (digits[..., [0, 1, 3, 4]] <= 9), axis=-1)
+              & (hours < 24) & (mins < 60))
+    minutes[simple] = (hours * 60 + mins)[simple]
+
+    # Rare formats ('9:30', '09:30:00', ...) keep the exact parse_minutes rules
+    unusual = ~simple & (times != '--:--') & (times != '')
+    for index in zip(*np.nonzero(unusual)):
+        minutes[index] = parse_minutes(str(times[index]))
+    return minutes
+
+
+def split_shift_cells(cells):
+    """
+    Extracts InTime and OutTime from 'Shift Start | Shift End | In Time | Out Time | ...' cells.
+
+    The cells are split with np.char.partition on fixed-width string arrays rather
+    than str.split on each cell.
+
+    Args:
+        cells (np.ndarray): Unicode string array of shift cells ('' for empty cells)
+
+    Returns:
+        tuple: (in_minutes, out_minutes) int16 arrays shaped like cells
+    """
+    first = np.char.partition(cells, '|')
+    second = np.char.partition(first[..., 2], '|')
+    third = np.char.partition(second[..., 2], '|')
+    fourth = np.char.partition(third[..., 2], '|')
+
+    # In Time is the third field (at least two separators), Out Time the fourth (three)
+    has_in = second[..., 1] == '|'
+    has_out = third[..., 1] == '|'
+    in_minutes = np.where(has_in, parse_hhmm(third[..., 0]), MISSING_MINUTES).astype(np.int16)
+    out_minutes = np.where(has_out, parse_hhmm(fourth[..., 0]), MISSING_MINUTES).astype(np.int16)
+    return in_minutes, out_minutes
+
+
+def read_hrone_register(file_path):
+    """
+    Streams an HROne attendance register into columnar arrays.
+
+    The workbook is opened with openpyxl in read-only mode and read row by row as
+    plain values; date columns are resolved once from the header and shift cells
+    are split in batches of HRONE_ROW_BATCH rows.
+
+    Args:
+        file_path (str): Path of the HROne .xlsx register
+
+    Returns:
+        dict: {'names': [...], 'employee_codes': [...], 'Days': [...],
+               'InTime': int16 array (employees x days), 'OutTime': int16 array (employees x days)}
+
+    Raises:
+        ValueError: If the first sheet has no 'Full name' column (not an HROne register)
+    """
+    workbook = openpyxl.load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        rows = workbook.worksheets[0].iter_rows(values_only=True)
+        header = next(rows, None) or ()
+        if 'Full name' not in header:
+            raise ValueError(f"No 'Full name' column found in {file_path}; expected an HROne attendance register")
+        name_column = header.index('Full name')
+        code_column = header.index('Employee Code') if 'Employee Code' in header else None
+        date_columns = hrone_date_columns(header)
+        columns = [column for column, _ in date_columns]
+
+        names = []
+        employee_codes = []
+        in_batches = []
+        out_batches = []
+        batch = []
+
+        def flush():
+            in_minutes, out_minutes = split_shift_cells(np.array(batch, dtype=str).reshape(len(batch), len(columns)))
+            in_batches.append(in_minutes)
+            out_batches.append(out_minutes)
+            batch.clear()
+
+        for row in rows:
+            if not any(value is not None for value in row):
+                continue  # Blank rows are skipped, as pandas does
+            names.append(row[name_column] if name_column < len(row) else None)
+            employee_codes.append(row[code_column] if code_column is not None and code_column < len(row) else None)
+            batch.append([row[column] if column < len(row) and isinstance(row[column], str) else ''
+                          for column in columns])
+            if len(batch) == HRONE_ROW_BATCH:
+                flush()
+        if batch:
+            flush()
+    finally:
+        workbook.close()
+
+    empty = np.full((0, len(columns)), MISSING_MINUTES, dtype=np.int16)
+    return {
+        'names': names,
+        'employee_codes': employee_codes,
+        'Days': [label for _, label in date_columns],
+        'InTime': np.concatenate(in_batches) if in_batches else empty,
+        'OutTime': np.concatenate(out_batches) if out_batches else empty,
+    }
 
-    # Initialize the employee dictionary
-    employee_dict = {}
 
-    # Loop through each employee
-    for idx, row in df.iterrows():
-        employee_name = row['Full name']  # Assuming 'Full name' is the column for employee names
-        employee_dict[employee_name] = {"Days": [], "Status": [], "InTime": [], "OutTime": []}
+def process_employee_hroneData(file_path):
+    """
+    Reads an HROne register into the employee dictionary used by the HROne stages.
 
-        # Process each date column
-        for date in date_columns:
-            shift_data = str(row[date])  # Get the shift data for that day
+    Args:
+        file_path (str): Path of the HROne .xlsx register
 
-            if '|' in shift_data:
-                # Split the shift data by '|' and extract InTime and OutTime
-                shift_parts = shift_data.split('|')
+    Returns:
+        dict: Employee name -> {'Days', 'Status', 'InTime', 'OutTime'} with times in minutes
+    """
+    register = read_hrone_register(file_path)
+    days = register['Days']
+    in_times = register['InTime'].tolist()
+    out_times = register['OutTime'].tolist()
 
-                # Handle InTime and OutTime: if '--:--', return NaT
-                in_time = shift_parts[2].strip() if len(shift_parts) > 2 and shift_parts[
-                    2].strip() != '--:--' else 'NaT'
-                out_time = shift_parts[3].strip() if len(shift_parts) > 3 and shift_parts[
-                    3].strip() != '--:--' else 'NaT'
-            else:
-                # If the data is missing or not properly formatted
-                in_time, out_time = 'NaT', 'NaT'
+    # Initialize the employee dictionary
+    employee_dict = {}
 
-            # Append the date, InTime, and OutTime to the employee's dictionary
-            employee_dict[employee_name]["Days"].append(date)
-            employee_dict[employee_name]["InTime"].append(in_time)
-            employee_dict[employee_name]["OutTime"].append(out_time)
-            employee_dict[employee_name]["Status"].append('')  # Status remains empty for now
+    # Loop through each employee (a repeated name keeps its last row)
+    for row, employee_name in enumerate(register['names']):
+        employee_dict[employee_name] = {
+            "Days": list(days),
+            "Status": [''] * len(days),  # Status remains empty for now
+            "InTime": in_times[row],
+            "OutTime": out_times[row],
+        }
 
     return employee_dict
 
@@ -111,36 +252,9 @@ def daily_working_hours_calculation_hrone(employee_dict):
     for employee, data in employee_dict.items():
         in_times = data['InTime']
         out_times = data['OutTime']
-        daily_working_hours = []
-
-        for in_time, out_time in zip(in_times, out_times):
-            if in_time != 'NaT' and out_time != 'NaT':
-                # Function to parse time strings
-                def parse_time(time_str):
-                    if ' ' in time_str:  # Check if it's a full datetime string
-                        time_str = time_str.split(' ')[1]  # Get the time part
-                    return datetime.strptime(time_str, '%H:%M') if len(time_str) == 5 else datetime.strptime(time_str,
-                                                                                                             '%H:%M:%S')
-
-                try:
-                    in_time_dt = parse_time(in_time)
-                    out_time_dt = parse_time(out_time)
-
-                    # Calculate the difference in time
-                    working_duration = out_time_dt - in_time_dt
-
-                    # Handle cases where the out time is on the next day
-                    if working_duration < timedelta(0):
-                        working_duration += timedelta(days=1)
-
-                    # Convert duration to HH:MM format
-                    hours, remainder = divmod(working_duration.total_seconds(), 3600)
-                    minutes = remainder // 60
-                    daily_working_hours.append(f"{int(hours):02}:{int(minutes):02}")
-                except ValueError:
-                    daily_working_hours.append("NaT")  # Append "NaT" if parsing fails
-            else:
-                daily_working_hours.append("NaT")  # Append "NaT" if in_time or out_time is 'NaT'
+
+        # Working minutes per day, handling cases where the out time is on the next day
+        daily_working_hours = [duration_minutes(in_time, out_time) for in_time, out_time in zip(in_times, out_times)]
 
         # Update the employee's dailyWorkingHours in the dictionary
         employee_dict[employee]['dailyWorkingHours'] = daily_working_hours
@@ -168,36 +282,142 @@ def holiday_calculation_hrone(employee_dict, holiday_dates):
     return employee_dict
 
 
-def matching_mechanism(employee_dict, employee_dict_hrone):
-    for employee, biometric_data in employee_dict.items():
-        in_time = biometric_data['InTime']
-        out_time = biometric_data['OutTime']
-
-        # Check if InTime or OutTime is 'NaT'
-        if 'NaT' in in_time or 'NaT' in out_time:
-            if employee in employee_dict_hrone:
-                hr_data = employee_dict_hrone[employee]
+def calendar_date_key(day_label):
+    """
+    Returns the 'YYYY-MM-DD' date of a biometric or HROne day label, or None.
+
+    Accepts raw biometric labels ('1 T (01 April 2025, Tuesday)'), cleaned labels
+    ('1 January 2025, Wednesday') and raw HROne headers ('01 Jan 2025').
+    """
+    if not isinstance(day_label, str):
+        return None
+    try:
+        date_key = day_date_key(clean_day_label(day_label))
+    except (KeyError, ValueError):
+        date_key = None
+    if date_key is None:
+        try:
+            date_key = datetime.strptime(day_label.strip(), "%d %b %Y").strftime("%Y-%m-%d")
+        except ValueError:
+            return None
+    return date_key
+
+
+def group_by_days(employee_dict, names):
+    """Groups employee names by their Days list, so each group shares one date layout."""
+    groups = {}
+    for name in names:
+        groups.setdefault(tuple(employee_dict[name]['Days']), []).append(name)
+    return groups
+
+
+def merge_hrone_records(employee_dict, employee_dict_hrone, layout_days=None):
+    """
+    Fills missing biometric punches from HROne by joining on (employee, calendar date).
+
+    Both sources are indexed by employee name and by the calendar date of each day
+    label, so HROne may cover a different day range, list days in another order or
+    list employees in another order than the biometric export. For every group of
+    employees sharing a date layout, the punches are stacked into employees x days
+    arrays and missing biometric InTime/OutTime cells are filled with one masked
+    assignment. HROne employees missing from the biometric export are appended,
+    re-laid onto layout_days when given so the attendance engines can process them.
+
+    The HROne dictionary is not modified.
+
+    Args:
+        employee_dict (dict): Biometric attendance dictionary (times in minutes)
+        employee_dict_hrone (dict): HROne dictionary from process_employee_hroneData
+        layout_days (list): Biometric day labels for appended HROne employees; None appends them as they are
+
+    Returns:
+        tuple: (employee_dict, merge statistics dict)
+    """
+    matched = [name for name in employee_dict if name in employee_dict_hrone]
+    hrone_only = [name for name in employee_dict_hrone if name not in employee_dict]
+
+    biometric_dates = set()
+    hrone_dates = set()
+    date_keys = {}  # Days tuple -> list of date keys
+
+    def keys_for(days):
+        if days not in date_keys:
+            date_keys[days] = [calendar_date_key(day) for day in days]
+        return date_keys[days]
+
+    for name in employee_dict:
+        biometric_dates.update(keys_for(tuple(employee_dict[name]['Days'])))
+    for name in employee_dict_hrone:
+        hrone_dates.update(keys_for(tuple(employee_dict_hrone[name]['Days'])))
+    biometric_dates.discard(None)
+    hrone_dates.discard(None)
+
+    stats = {
+        'biometric_employees': len(employee_dict),
+        'hrone_employees': len(employee_dict_hrone),
+        'matched_employees': len(matched),
+        'biometric_only_employees': len(employee_dict) - len(matched),
+        'hrone_only_employees': len(hrone_only),
+        'shared_dates': len(biometric_dates & hrone_dates),
+        'biometric_only_dates': len(biometric_dates - hrone_dates),
+        'hrone_only_dates': len(hrone_dates - biometric_dates),
+        'filled_in_times': 0,
+        'filled_out_times': 0,
+        # Missing InTime/OutTime cells of the matched employees
+        'missing_punches_before': 0,
+        'missing_punches_after': 0,
+    }
 
-                # Update InTime if it's 'NaT' and HR has a valid InTime
-                for i in range(len(in_time)):
-                    if in_time[i] == 'NaT' and hr_data['InTime'][i] != 'NaT':
-                        biometric_data['InTime'][i] = hr_data['InTime'][i]
+    for biometric_days, names in group_by_days(employee_dict, matched).items():
+        biometric_keys = keys_for(biometric_days)
 
-                # Update OutTime if it's 'NaT' and HR has a valid OutTime
-                for i in range(len(out_time)):
-                    if out_time[i] == 'NaT' and hr_data['OutTime'][i] != 'NaT':
-                        biometric_data['OutTime'][i] = hr_data['OutTime'][i]
+        for hrone_days, group in group_by_days(employee_dict_hrone, names).items():
+            # Hash index of HROne dates -> column, then the (biometric, HROne) column pairs
+            hrone_columns = {key: column for column, key in enumerate(keys_for(hrone_days)) if key is not None}
+            pairs = [(column, hrone_columns[key]) for column, key in enumerate(biometric_keys) if key in hrone_columns]
 
+            for field, counter in (('InTime', 'filled_in_times'), ('OutTime', 'filled_out_times')):
+                biometric = np.array([employee_dict[name][field] for name in group], dtype=np.int16)
+                stats['missing_punches_before'] += int((biometric == MISSING_MINUTES).sum())
 
+                if pairs:
+                    biometric_columns, source_columns = (np.array(columns) for columns in zip(*pairs))
+                    hrone = np.array([employee_dict_hrone[name][field] for name in group], dtype=np.int16)[:, source_columns]
+                    target = biometric[:, biometric_columns]
+                    fill = (target == MISSING_MINUTES) & (hrone != MISSING_MINUTES)
+                    target[fill] = hrone[fill]
+                    biometric[:, biometric_columns] = target
+                    stats[counter] += int(fill.sum())
 
-    # Remove employees from HR data who have been matched
-    for employee in list(employee_dict_hrone.keys()):
-        if employee in employee_dict:
-            del employee_dict_hrone[employee]
+                stats['missing_punches_after'] += int((biometric == MISSING_MINUTES).sum())
+                for name, values in zip(group, biometric.tolist()):
+                    employee_dict[name][field] = values
 
     # Append remaining employees from HR data to biometric dictionary
-    for employee, hr_data in employee_dict_hrone.items():
-        if employee not in employee_dict:
-            employee_dict[employee] = hr_data
+    for name in hrone_only:
+        hr_data = employee_dict_hrone[name]
+        if layout_days is None:
+            employee_dict[name] = hr_data
+            continue
+
+        hrone_columns = {key: column for column, key in enumerate(keys_for(tuple(hr_data['Days']))) if key is not None}
+        columns = [hrone_columns.get(key) for key in keys_for(tuple(layout_days))]
+        employee_dict[name] = {
+            "employee_id": "",
+            "Days": list(layout_days),
+            "Status": ["NaT"] * len(layout_days),
+            "InTime": [hr_data['InTime'][column] if column is not None else MISSING_MINUTES for column in columns],
+            "OutTime": [hr_data['OutTime'][column] if column is not None else MISSING_MINUTES for column in columns],
+        }
 
-    return employee_dict
\ No newline at end of file
+    return employee_dict, stats
+
+
+def matching_mechanism(employee_dict, employee_dict_hrone):
+    """
+    Fills missing biometric punches from HROne and appends HROne-only employees.
+
+    Kept for existing callers; see merge_hrone_records for the join and its statistics.
+    """
+    employee_dict, _ = merge_hrone_records(employee_dict, employee_dict_hrone)
+    return employee_dict
@@ -0,0 +1,38 @@
+from concurrent.futures import ProcessPoolExecutor
+
+from functions.biometric_function_new import process_attendance_file
+from functions.hrone_functions import process_employee_hroneData, dict_cleaning_hrone, merge_hrone_records
+
+
+def load_hrone_source(hrone_path):
+    """Reads and cleans an HROne register (runs in a worker process)."""
+    return dict_cleaning_hrone(process_employee_hroneData(hrone_path))
+
+
+def ingest_month(biometric_path, hrone_path=None):
+    """
+    Loads one month of attendance from the biometric export and, optionally, the HROne register.
+
+    The HROne register is read and cleaned in a worker process while the biometric
+    export is parsed in the calling process; the two sources only meet at the
+    date-keyed merge, so reconciliation costs about the slower of the two loads
+    rather than their sum.
+
+    Args:
+        biometric_path (str): Path of the biometric CSV export
+        hrone_path (str): Path of the HROne .xlsx register, or None for biometric data only
+
+    Returns:
+        tuple: (employee_dict, merge statistics dict or None)
+    """
+    if not hrone_path:
+        return process_attendance_file(biometric_path), None
+
+    with ProcessPoolExecutor(max_workers=1) as executor:
+        hrone_future = executor.submit(load_hrone_source, hrone_path)
+        employee_dict = process_attendance_file(biometric_path)
+        employee_dict_hrone = hrone_future.result()
+
+    # HROne-only employees take the biometric day layout so every engine mode can process them
+    layout_days = next(iter(employee_dict.values()))['Days'] if employee_dict else None
+    return merge_hrone_records(employee_dict, employee_dict_hrone, layout_days)
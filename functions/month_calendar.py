@@ -0,0 +1,71 @@
+import datetime
+from functools import lru_cache
+
+import numpy as np
+
+from functions.biometric_function_new import clean_day_label, day_date_key
+
+# Weekday codes (datetime.date.weekday); labels without a full date get NO_WEEKDAY
+SATURDAY = 5
+SUNDAY = 6
+NO_WEEKDAY = -1
+
+
+class MonthCalendar:
+    """
+    Immutable per-day facts of one month, shared by every employee of the month.
+
+    Built once per distinct list of day labels: day_labels holds the cleaned display
+    labels ('01 April 2025, Tuesday') as a tuple, ordinals the date of each day as
+    datetime.date.toordinal() (0 for labels without a full date), weekdays the weekday
+    codes (Monday=0 .. Sunday=6, NO_WEEKDAY without a date) and is_holiday the holiday
+    mask of the site's HolidayCalendar. Weekend and holiday tests are array lookups
+    instead of substring tests on the labels. The arrays are read-only.
+    """
+
+    def __init__(self, days, holidays=None):
+        self.day_labels = tuple(clean_day_label(day_str) for day_str in days)
+
+        ordinals = []
+        for day in self.day_labels:
+            date_key = day_date_key(day) if isinstance(day, str) else None
+            ordinals.append(datetime.date.fromisoformat(date_key).toordinal() if date_key else 0)
+        self.ordinals = np.array(ordinals, dtype=np.int32)
+
+        dated = self.ordinals > 0
+        # Ordinal 1 (0001-01-01) is a Monday
+        self.weekdays = np.where(dated, (self.ordinals.astype(np.int64) - 1) % 7, NO_WEEKDAY).astype(np.int8)
+        self.is_sunday = self.weekdays == SUNDAY
+        self.is_saturday = self.weekdays == SATURDAY
+        if holidays is not None:
+            self.is_holiday = dated & holidays.mask(self.ordinals)
+        else:
+            self.is_holiday = np.zeros(len(dated), dtype=bool)
+
+        for array in (self.ordinals, self.weekdays, self.is_sunday, self.is_saturday, self.is_holiday):
+            array.flags.writeable = False
+
+    def __len__(self):
+        return len(self.day_labels)
+
+
+@lru_cache(maxsize=64)
+def _cached_calendar(days, holidays):
+    return MonthCalendar(days, holidays)
+
+
+def month_calendar(days, holidays):
+    """
+    Returns the shared MonthCalendar of a list of day labels.
+
+    Calendars are cached per (day labels, holiday calendar), so every employee and
+    every engine run over the same month reuses one instance.
+
+    Args:
+        days (list): Day labels from process_attendance_file (e.g. '1 T (01 April 2025, Tuesday)')
+        holidays (HolidayCalendar): Holidays of the site, from load_holiday_calendar
+
+    Returns:
+        MonthCalendar: Calendar of the month (treat as read-only)
+    """
+    return _cached_calendar(tuple(days), holidays)
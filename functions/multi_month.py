@@ -0,0 +1,205 @@
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from functions.biometric_function_new import process_attendance_file, day_date_key
+from functions.attendance_engine import run_attendance_pipeline
+from functions.attendance_store import as_attendance_store, DAY_FIELDS, DAY_FIELD_DTYPES
+from functions.time_utils import MISSING_MINUTES
+
+BIOMETRIC_FILE_PATTERN = re.compile(r'^([a-zA-Z]{3})_(\d{4})_biometric\.csv$')
+
+MONTH_NUMBERS = {
+    "jan": 1, "feb": 2, "mar": 3, "apr": 4, "may": 5, "jun": 6,
+    "jul": 7, "aug": 8, "sep": 9, "oct": 10, "nov": 11, "dec": 12
+}
+
+
+def discover_biometric_files(folder):
+    """
+    Finds every '<mon>_<yyyy>_biometric.csv' export in a folder.
+
+    Args:
+        folder (str): Folder to scan (e.g. static/resources/uploads/BIOMETRIC_DATA)
+
+    Returns:
+        list: (month_key, file_path) tuples in chronological order, e.g. ('sep_2024', '.../sep_2024_biometric.csv')
+    """
+    files = []
+    for file_name in os.listdir(folder):
+        match = BIOMETRIC_FILE_PATTERN.match(file_name)
+        if not match or match.group(1).lower() not in MONTH_NUMBERS:
+            continue
+        month, year = match.group(1).lower(), int(match.group(2))
+        files.append(((year, MONTH_NUMBERS[month]), f"{month}_{year}", os.path.join(folder, file_name)))
+
+    return [(month_key, file_path) for _, month_key, file_path in sorted(files)]
+
+
+def month_period(month_key):
+    """'YYYY-MM' prefix of the dates of a month key, e.g. 'sep_2024' -> '2024-09'."""
+    month, year = month_key.split('_')
+    return f"{year}-{MONTH_NUMBERS[month]:02d}"
+
+
+def process_month_file(file_path, engine_mode):
+    """
+    Parses one monthly export and runs the attendance pipeline on it (process pool worker).
+
+    The month is parsed and evaluated in this worker process only: the months already
+    run in parallel, so sharded parsing or a 'parallel' engine would start a nested pool
+    in every worker.
+
+    Returns:
+        tuple: (AttendanceStore, insights), or None if the file could not be processed
+    """
+    try:
+        employee_dict = process_attendance_file(file_path, workers=1)
+    except (OSError, ValueError) as e:
+        print(f"Warning: Skipping {os.path.basename(file_path)}: {e}")
+        return None
+
+    employee_dict, insights = run_attendance_pipeline(employee_dict, engine_mode, max_workers=1)
+    return as_attendance_store(employee_dict), insights
+
+
+class MultiMonthStore:
+    """
+    Several processed months merged into one employees x dates store.
+
+    Per-day fields use the AttendanceStore layout (one matrix per field, int16 minutes,
+    uint8 status codes, bool flags) over the union of employees and the sorted
+    'YYYY-MM-DD' dates of every month. 'present' marks the cells an employee actually
+    has in an export; other cells hold the empty value (MISSING_MINUTES, 'NaT', 0).
+    Fields a month only computes on access (e.g. the 'lazy' engine) are evaluated for
+    the whole month and stored like the others.
+
+    store[employee, date] returns the per-day values of one cell. The per-month stores
+    (with each month's report metrics) and insights stay available in months/insights.
+    """
+
+    def __init__(self, months, insights):
+        self.months = months  # month_key -> AttendanceStore
+        self.insights = insights  # month_key -> missing punch insights
+
+        self.names = []
+        self.index = {}
+        for store in months.values():
+            for name in store.names:
+                if name not in self.index:
+                    self.index[name] = len(self.names)
+                    self.names.append(name)
+
+        # Date columns of every month, skipping day labels without a full date.
+        # A date found in two exports is taken from the later month.
+        sources = {}
+        for month_key, store in months.items():
+            for day_index, day in enumerate(store.days):
+                date = day_date_key(day) if isinstance(day, str) else None
+                if date is not None:
+                    sources[date] = (month_key, day_index)
+        columns = sorted((date, month_key, day_index) for date, (month_key, day_index) in sources.items())
+        self.dates = [date for date, _, _ in columns]
+        self.date_index = {date: i for i, date in enumerate(self.dates)}
+
+        self.status_labels = []
+        for store in months.values():
+            for label in store.status_labels:
+                if label not in self.status_labels:
+                    self.status_labels.append(label)
+        status_codes = {label: code for code, label in enumerate(self.status_labels)}
+
+        month_arrays = {month_key: {**store.arrays, **store.series_matrices()} for month_key, store in months.items()}
+
+        shape = (len(self.names), len(self.dates))
+        fields = [field for field in DAY_FIELDS if any(field in arrays for arrays in month_arrays.values())]
+        self.arrays = {}
+        for field in fields:
+            kind = DAY_FIELDS[field]
+            fill = MISSING_MINUTES if kind == 'minutes' else 0
+            self.arrays[field] = np.full(shape, fill, dtype=DAY_FIELD_DTYPES[kind])
+        self.present = np.zeros(shape, dtype=bool)
+
+        # Copy each month into its date columns, one block per month
+        for month_key, store in months.items():
+            month_columns = [(self.date_index[date], day_index)
+                             for date, key, day_index in columns if key == month_key]
+            if not month_columns or not store.names:
+                continue
+            target_columns, source_columns = (np.array(c) for c in zip(*month_columns))
+            rows = np.array([self.index[name] for name in store.names])
+            block = np.ix_(rows, target_columns)
+
+            self.present[block] = True
+            for field, array in month_arrays[month_key].items():
+                values = np.asarray(array)[:, source_columns]
+                if DAY_FIELDS[field] == 'status':
+                    # Month status codes -> merged status codes
+                    remap = np.array([status_codes[label] for label in store.status_labels], dtype=np.uint8)
+                    values = remap[values]
+                self.arrays[field][block] = values
+
+    def __getitem__(self, key):
+        employee, date = key
+        row, column = self.index[employee], self.date_index[date]
+        if not self.present[row, column]:
+            raise KeyError(key)
+
+        values = {}
+        for field, array in self.arrays.items():
+            value = array[row, column].item()
+            kind = DAY_FIELDS[field]
+            if kind == 'status':
+                value = self.status_labels[value]
+            elif kind == 'flag':
+                value = int(value)
+            values[field] = value
+        return values
+
+    def __contains__(self, key):
+        employee, date = key
+        return (employee in self.index and date in self.date_index
+                and bool(self.present[self.index[employee], self.date_index[date]]))
+
+    @property
+    def nbytes(self):
+        """Memory held by the per-day arrays."""
+        return sum(array.nbytes for array in self.arrays.values()) + self.present.nbytes
+
+
+def ingest_biometric_folder(folder, engine_mode='vectorized', max_workers=None, month_keys=None):
+    """
+    Processes every monthly biometric export of a folder in parallel and merges the results.
+
+    Each month is parsed and run through the attendance pipeline in its own worker
+    process; the finished months are merged into a MultiMonthStore in chronological order.
+    Files that cannot be processed (e.g. empty exports) are skipped with a warning.
+
+    Args:
+        folder (str): Folder with '<mon>_<yyyy>_biometric.csv' exports
+        engine_mode (str): Engine mode passed to run_attendance_pipeline
+        max_workers (int): Worker processes (default: one per CPU, at most one per file)
+        month_keys (set): Only process these months, e.g. {'sep_2024'} (default: every export)
+
+    Returns:
+        MultiMonthStore: Employees x dates store of every processed month
+    """
+    files = discover_biometric_files(folder)
+    if month_keys is not None:
+        files = [(month_key, file_path) for month_key, file_path in files if month_key in month_keys]
+    months = {}
+    insights = {}
+    if not files:
+        return MultiMonthStore(months, insights)
+
+    max_workers = min(max_workers or os.cpu_count() or 1, len(files))
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        results = executor.map(process_month_file, [file_path for _, file_path in files],
+                               [engine_mode] * len(files))
+        for (month_key, _), result in zip(files, results):
+            if result is not None:
+                months[month_key], insights[month_key] = result
+
+    return MultiMonthStore(months, insights)
@@ -0,0 +1,155 @@
+import json
+import os
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from functions.shared_store import write_atomic
+
+# Stages reported for an upload processing job, in order
+#   parse           -> ingest_month (biometric export and optional HROne register)
+#   rules           -> run_attendance_pipeline
+#   report_tables   -> report and missing punch tables for both roles
+#   publish         -> shared snapshot for every worker process
+#   warehouse       -> per-employee-day rows loaded into the attendance warehouse
+#   dashboard_cache -> dashboard fragments of the first employees
+JOB_STAGES = ('parse', 'rules', 'report_tables', 'publish', 'warehouse', 'dashboard_cache')
+
+JOB_STATUS_MAX_AGE = 24 * 60 * 60  # Seconds a finished job's status stays available
+
+
+class ProcessingJob:
+    """
+    Progress of one background processing job.
+
+    Every change is written to <status_folder>/<job_id>.json, so a status request
+    served by any worker process sees the same progress.
+    """
+
+    def __init__(self, job_id, status_folder, stages=JOB_STAGES):
+        self.job_id = job_id
+        self.status_folder = status_folder
+        self.state = 'queued'
+        self.error = None
+        self.current_stage = None
+        self.stages = {stage: {'state': 'pending', 'done': None, 'total': None, 'seconds': None}
+                       for stage in stages}
+        self._stage_started = None
+        self.save()
+
+    def start_stage(self, stage, total=None):
+        """Marks stage as running (closing the previous one); total enables done/total progress."""
+        self._close_stage()
+        self.current_stage = stage
+        self._stage_started = time.perf_counter()
+        self.stages[stage].update({'state': 'running', 'done': 0 if total is not None else None, 'total': total})
+        self.save()
+
+    def advance(self, done):
+        """Updates the done count of the running stage."""
+        self.stages[self.current_stage]['done'] = done
+        self.save()
+
+    def start(self):
+        self.state = 'running'
+        self.save()
+
+    def finish(self):
+        self._close_stage()
+        self.state = 'done'
+        self._skip_pending()
+        self.save()
+
+    def fail(self, error):
+        if self.current_stage is not None:
+            self.stages[self.current_stage]['state'] = 'failed'
+        self.state = 'failed'
+        self.error = str(error)
+        self.save()
+
+    def _close_stage(self):
+        if self.current_stage is not None:
+            self.stages[self.current_stage]['state'] = 'done'
+            self.stages[self.current_stage]['seconds'] = round(time.perf_counter() - self._stage_started, 3)
+            self.current_stage = None
+
+    def _skip_pending(self):
+        # Stages not needed because the results were already published, e.g. a re-upload
+        for details in self.stages.values():
+            if details['state'] == 'pending':
+                details['state'] = 'skipped'
+
+    def to_dict(self):
+        return {
+            'job_id': self.job_id,
+            'state': self.state,
+            'current_stage': self.current_stage,
+            'stages': self.stages,
+            'error': self.error,
+        }
+
+    def save(self):
+        write_atomic(os.path.join(self.status_folder, f"{self.job_id}.json"), json.dumps(self.to_dict()))
+
+
+class JobRunner:
+    """
+    Runs processing jobs on a small local thread pool.
+
+    Jobs are queued and executed in submission order (one worker by default), so
+    an upload request returns as soon as its job is queued. Status files not updated
+    for JOB_STATUS_MAX_AGE seconds are removed when the next job is submitted.
+    """
+
+    def __init__(self, status_folder, max_workers=1):
+        self.status_folder = status_folder
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='processing-job')
+
+    def submit(self, task, *args):
+        """
+        Queues task(job, *args) and returns its ProcessingJob.
+
+        Args:
+            task (callable): Work to run; reports progress through the job it receives
+            *args: Extra arguments passed to task
+
+        Returns:
+            ProcessingJob: Job whose progress task updates
+        """
+        os.makedirs(self.status_folder, exist_ok=True)
+        self.remove_old_status()
+        job = ProcessingJob(uuid.uuid4().hex, self.status_folder)
+        self._executor.submit(self._run, job, task, args)
+        return job
+
+    def _run(self, job, task, args):
+        job.start()
+        try:
+            task(job, *args)
+        except Exception as e:
+            print(f"Processing job {job.job_id} failed: {e}")
+            job.fail(e)
+        else:
+            job.finish()
+
+    def remove_old_status(self, max_age=JOB_STATUS_MAX_AGE):
+        """Removes the status files of jobs that have not been updated for max_age seconds."""
+        cutoff = time.time() - max_age
+        for file_name in os.listdir(self.status_folder):
+            path = os.path.join(self.status_folder, file_name)
+            try:
+                if os.path.getmtime(path) < cutoff:
+                    os.remove(path)
+            except OSError:
+                # Removed by another worker process
+                continue
+
+    def status(self, job_id):
+        """Returns the saved progress of a job as a dict, or None for an unknown job."""
+        if not all(c in '0123456789abcdef' for c in job_id):
+            return None
+        try:
+            with open(os.path.join(self.status_folder, f"{job_id}.json"), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
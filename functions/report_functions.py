@@ -0,0 +1,233 @@
+import math
+
+import numpy as np
+import pandas as pd
+
+from functions.attendance_store import AttendanceStore
+from functions.time_utils import format_minutes
+
+# Column headers of the report table shown to each role
+USER_REPORT_HEADERS = {
+    'employeeId' : 'Biometric Id',
+    'OfficeWorkingDays': 'Office Working',
+    'EmployeeTotalWorkingDay': 'Employee Total Present',
+    'PublicHolidays': 'Public Holiday',
+    'EmployeeTotalWorkingHours': 'Employee Total Working Hours',
+    'EmployeeActualAbsentee': 'Physical Absentee',
+    'lateMarkAbsentee': 'Late Mark Absentee',
+    'lateMarkCount': 'Total Late Mark',
+    'EmployeeAbsenteeWithLateMark': 'Employee Total Absentee',
+    'compOff': 'Compensatory Off',
+    'actualOverTime': 'Over Time',
+    'payableOverTime': 'Payable Over Time',
+    'incompleteHours': 'Incomplete Hours',
+    'halfDayTotal': 'Total Half Days',
+    'totalEarlyLeave': 'Total Early Leaves',
+    'averageWorkingHour': 'Average Working Hours',
+    'averageInTime': 'Average In Time',
+    'averageOutTime': 'Average Out Time',
+}
+
+ADMIN_REPORT_HEADERS = {
+    'employeeId': 'Biometric Id',
+    'CalenderDays': 'Calender Days',
+    'TotalHolidays': 'Total Holidays',
+    # 'OfficeWorkingDays': 'Office Working',
+    'EmployeeTotalWorkingDay': 'Employee Present',
+    'EmployeeActualAbsentee': 'Physical Absentee',
+    'EmployeeAbsenteeWithLateMark': 'Employee Total Absentee',
+    # 'PublicHolidays': 'Public Holiday',
+    'EmployeeTotalWorkingHours': 'Employee Total Working Hours',
+    'lateMarkAbsentee': 'Late Mark Absentee',
+    'lateMarkCount': 'Total Late Mark',
+    'compOff': 'Compensatory Off',
+    'actualOverTime': 'Over Time',
+    'payableOverTime': 'Payable Over Time',
+    'incompleteHours': 'Incomplete Hours',
+    'totalEarlyLeave': 'Total Early Leaves',
+    'averageWorkingHour': 'Average Working Hours',
+    'averageInTime': 'Average In Time',
+    'averageOutTime': 'Average Out Time',
+}
+
+
+# Columns of each role's report table, in table order: (column key, record path, format)
+#   'value'   -> the number or text as stored
+#   'minutes' -> a minute count shown as HH:MM
+USER_REPORT_COLUMNS = (
+    ('employeeId', ('EmployeeID',), 'value'),
+    ('OfficeWorkingDays', ('reportMetric', 'OfficeWorkingDays'), 'value'),
+    ('PublicHolidays', ('reportMetric', 'PublicHolidays'), 'value'),
+    ('EmployeeTotalWorkingDay', ('reportMetric', 'EmployeeTotalWorkingDay'), 'value'),
+    ('EmployeeTotalWorkingHours', ('reportMetric', 'EmployeeTotalWorkingHours'), 'minutes'),
+    ('averageWorkingHour', ('averageWorkingHour',), 'minutes'),
+    ('incompleteHours', ('incompleteHours',), 'minutes'),
+    ('actualOverTime', ('actualOverTime',), 'minutes'),
+    ('payableOverTime', ('payableOverTime',), 'minutes'),
+    ('halfDayTotal', ('halfDayTotal',), 'value'),
+    ('lateMarkCount', ('lateMarkCount',), 'value'),
+    ('totalEarlyLeave', ('totalEarlyLeave',), 'value'),
+    ('compOff', ('compOff',), 'value'),
+    ('EmployeeActualAbsentee', ('reportMetric', 'EmployeeActualAbsentee'), 'value'),
+    ('EmployeeAbsenteeWithLateMark', ('reportMetric', 'EmployeeAbsenteeWithLateMark'), 'value'),
+    ('averageInTime', ('averageInTime',), 'minutes'),
+    ('averageOutTime', ('averageOutTime',), 'minutes'),
+)
+
+ADMIN_REPORT_COLUMNS = (
+    ('employeeId', ('EmployeeID',), 'value'),
+    ('CalenderDays', ('reportMetric', 'CalenderDays'), 'value'),
+    ('TotalHolidays', ('reportMetric', 'TotalHolidays'), 'value'),
+    ('EmployeeTotalWorkingDay', ('reportMetric', 'EmployeeTotalWorkingDay'), 'value'),
+    ('EmployeeActualAbsentee', ('reportMetric', 'EmployeeActualAbsentee'), 'value'),
+    ('EmployeeAbsenteeWithLateMark', ('reportMetric', 'EmployeeAbsenteeWithLateMark'), 'value'),
+    ('EmployeeTotalWorkingHours', ('reportMetric', 'EmployeeTotalWorkingHours'), 'minutes'),
+    ('averageWorkingHour', ('averageWorkingHour',), 'minutes'),
+    ('incompleteHours', ('incompleteHours',), 'minutes'),
+    ('actualOverTime', ('actualOverTime',), 'minutes'),
+    ('payableOverTime', ('payableOverTime',), 'minutes'),
+    ('lateMarkCount', ('lateMarkCount',), 'value'),
+    ('totalEarlyLeave', ('totalEarlyLeave',), 'value'),
+    ('compOff', ('compOff',), 'value'),
+    ('averageInTime', ('averageInTime',), 'minutes'),
+    ('averageOutTime', ('averageOutTime',), 'minutes'),
+)
+
+REPORT_ROLES = {
+    'user': (USER_REPORT_COLUMNS, USER_REPORT_HEADERS),
+    'admin': (ADMIN_REPORT_COLUMNS, ADMIN_REPORT_HEADERS),
+}
+
+
+def report_columns(employee_dict, columns):
+    """
+    Collects the report columns of every employee, one list per column.
+
+    The values are read straight from the per-employee aggregates (the summaries of an
+    AttendanceStore); per-day data is never touched.
+
+    Args:
+        employee_dict (dict): Processed attendance records (or an AttendanceStore)
+        columns (tuple): USER_REPORT_COLUMNS or ADMIN_REPORT_COLUMNS
+
+    Returns:
+        dict: 'Employee' and every column key -> list of cell values, in employee order
+    """
+    if isinstance(employee_dict, AttendanceStore):
+        names = employee_dict.names
+        employee_ids = employee_dict.employee_ids
+        summaries = employee_dict.summaries
+    else:
+        names = list(employee_dict.keys())
+        summaries = list(employee_dict.values())
+        employee_ids = [data['EmployeeID'] for data in summaries]
+
+    table = {'Employee': names}
+    for key, path, kind in columns:
+        if path == ('EmployeeID',):
+            values = employee_ids
+        elif len(path) == 1:
+            values = [summary[path[0]] for summary in summaries]
+        else:
+            group, field = path
+            values = [summary[group][field] for summary in summaries]
+        table[key] = [format_minutes(value) for value in values] if kind == 'minutes' else values
+    return table
+
+
+# pandas release whose DataFrame.to_html markup and float formatting write_html_table
+# reproduces; with any other pandas version the report tables are rendered by pandas
+PANDAS_HTML_VERSION = '2.3'
+
+
+def mirrors_installed_pandas():
+    """True if the installed pandas is the release write_html_table reproduces."""
+    return pd.__version__.split('.')[:2] == PANDAS_HTML_VERSION.split('.')
+
+
+def _escape_cell(value):
+    # Cell text as written by DataFrame.to_html
+    text = value.replace('\t', '\\t').replace('\r', '\\r').replace('\n', '\\n')
+    return text.replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;').strip()
+
+
+def _format_float_column(values):
+    # Fixed notation with the zeros trailing in every cell trimmed, as DataFrame.to_html does;
+    # None where to_html would switch to scientific notation or show missing values
+    magnitudes = [abs(value) for value in values]
+    if any(not math.isfinite(value) or value >= 1e6 or 0 < value < 1e-6 for value in magnitudes):
+        return None
+    cells = [f"{value:.6f}" for value in values]
+    trim = 0
+    while trim < 5 and all(cell[-1 - trim] == '0' for cell in cells):
+        trim += 1
+    return [cell[:-trim] for cell in cells] if trim else cells
+
+
+def _format_column(values):
+    """Cell text of one column, or None if it needs the general DataFrame formatting."""
+    kinds = set(map(type, values))
+    if kinds <= {str}:
+        return [_escape_cell(value) for value in values]
+    if kinds <= {int}:
+        return [str(value) for value in values]
+    if kinds <= {int, float}:
+        return _format_float_column([float(value) for value in values])
+    return None
+
+
+def write_html_table(table, headers):
+    """
+    Writes the columns as the HTML of DataFrame(table).rename(columns=headers).to_html(index=False)
+    of pandas PANDAS_HTML_VERSION.
+
+    Every column is formatted in one pass into a preallocated employees x columns table
+    of cell strings, which is then joined into the document.
+
+    Returns:
+        str: HTML table, or None if a column holds values this writer does not format
+    """
+    num_rows = len(table['Employee'])
+    cells = np.empty((num_rows, len(table)), dtype=object)
+    for column, values in enumerate(table.values()):
+        formatted = _format_column(values) if num_rows else []
+        if formatted is None:
+            return None
+        cells[:, column] = formatted
+
+    lines = ['<table border="1" class="dataframe">', '  <thead>', '    <tr style="text-align: right;">']
+    lines += [f"      <th>{_escape_cell(headers.get(key, key))}</th>" for key in table]
+    lines += ['    </tr>', '  </thead>', '  <tbody>']
+    for row in cells.tolist():
+        lines.append('    <tr>')
+        lines += [f"      <td>{cell}</td>" for cell in row]
+        lines.append('    </tr>')
+    lines += ['  </tbody>', '</table>']
+    return '\n'.join(lines)
+
+
+def render_report_table(employee_dict, role):
+    """
+    Renders the monthly report table of a role as HTML.
+
+    The report columns are collected from the per-employee aggregates and written
+    directly as HTML. Tables with values outside the plain number / text formats, or any
+    pandas release other than PANDAS_HTML_VERSION, fall back to pandas' DataFrame.to_html.
+
+    Args:
+        employee_dict (dict): Processed attendance records (or an AttendanceStore)
+        role (str): 'user' or 'admin'
+
+    Returns:
+        str: HTML table without the index column
+    """
+    columns, headers = REPORT_ROLES[role]
+    table = report_columns(employee_dict, columns)
+
+    html = write_html_table(table, headers) if mirrors_installed_pandas() else None
+    if html is not None:
+        return html
+
+    reportDataframe = pd.DataFrame(table)
+    reportDataframe.rename(columns=headers, inplace=True)
+    return reportDataframe.to_html(index=False)
@@ -0,0 +1,369 @@
+import hashlib
+import json
+import os
+import threading
+
+from functions.biometric_function_new import process_missing_data, extract_month_year_from_filename
+from functions.holiday_calendar import load_holiday_calendar
+from functions.ingestion import ingest_month
+from functions.attendance_engine import run_attendance_pipeline, RULES_REVISION
+from functions.attendance_store import as_attendance_store
+from functions.stage_graph import StagePipeline
+from functions.report_functions import render_report_table, REPORT_ROLES
+from functions.shared_store import snapshot_version, publish_snapshot, read_snapshot, write_atomic
+
+# Content hashes of source files, kept in the snapshot folder so a restarted process
+# can find the published snapshot of an unchanged upload without reading it again
+HASH_INDEX = 'hashes.json'
+
+
+def dataset_hash(file_path, chunk_size=1 << 20):
+    """SHA-256 of the file contents, read in chunks."""
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def ruleset_version(engine_mode, holidays=None):
+    """
+    Identifies the attendance policy the results were computed with.
+
+    Changes when the rules (RULES_REVISION), the holiday calendar or the engine mode change;
+    an edit of the holiday data file therefore yields a new version.
+    """
+    if holidays is None:
+        holidays = load_holiday_calendar()
+    policy = repr((RULES_REVISION, engine_mode, holidays.site, holidays.fingerprint))
+    return hashlib.sha256(policy.encode('utf-8')).hexdigest()[:16]
+
+
+class ProcessedMonth:
+    """
+    Everything the pages need from one processed biometric file.
+
+    Attributes:
+        key (tuple): (dataset hash, ruleset version)
+        records (AttendanceStore): Processed employee records
+        insights (dict): Missing punch insights per employee
+        report_tables (dict): Rendered report table HTML per role ('user', 'admin')
+        missing_data_html (str): Rendered missing punch table HTML
+    """
+
+    def __init__(self, key, records, insights, report_tables, missing_data_html):
+        self.key = key
+        self.records = records
+        self.insights = insights
+        self.report_tables = report_tables
+        self.missing_data_html = missing_data_html
+
+
+def no_progress(stage, total=None):
+    """Default progress callback of the processing functions."""
+
+
+def process_month(file_path, engine_mode, key=None, progress=no_progress, hrone_path=None, pipeline=None,
+                  max_workers=None):
+    """
+    Runs the attendance pipeline on a biometric file and renders the report tables.
+
+    Args:
+        file_path (str): Path of the biometric CSV export
+        engine_mode (str): Engine mode passed to run_attendance_pipeline
+        key (tuple): Cache key stored on the result
+        progress (callable): Called with the name of each stage as it starts (see JOB_STAGES)
+        hrone_path (str): Optional HROne register whose punches fill biometric gaps
+        pipeline (StagePipeline): Runs the rules instead of run_attendance_pipeline ('staged'
+                                  mode). If it already ran on the same file, the file is not
+                                  parsed again and only the stages affected by the current
+                                  holiday calendar are rerun.
+        max_workers (int): Worker processes passed to run_attendance_pipeline
+
+    Returns:
+        ProcessedMonth: Processed records, insights and rendered tables
+
+    Raises:
+        ValueError: If the month and year cannot be read from the file name
+    """
+    if pipeline is not None and pipeline.params is not None:
+        # Same file, new holiday calendar: reuse the parsed input and the unaffected stages
+        progress('rules')
+        employee_dict, insights = pipeline.rerun(load_holiday_calendar())
+    else:
+        # The day labels are dated from the file name, so a file that does not follow the pattern has no month
+        file_name = os.path.basename(file_path)
+        if extract_month_year_from_filename(file_name) is None:
+            raise ValueError(f"Cannot read the month and year from '{file_name}'; "
+                             f"biometric exports must be named like 'jan_2025_biometric.csv'")
+
+        progress('parse')
+        employee_dict, _ = ingest_month(file_path, hrone_path)
+
+        progress('rules')
+        if pipeline is not None:
+            employee_dict, insights = pipeline.run(employee_dict, load_holiday_calendar())
+        else:
+            employee_dict, insights = run_attendance_pipeline(employee_dict, engine_mode, max_workers=max_workers)
+
+    # Keep the processed month in the columnar store (records[name] is a read-only view)
+    records = as_attendance_store(employee_dict)
+
+    progress('report_tables')
+    report_tables = {role: render_report_table(records, role) for role in REPORT_ROLES}
+    missing_data_html = process_missing_data(insights).to_html(index=False)
+
+    return ProcessedMonth(key, records, insights, report_tables, missing_data_html)
+
+
+def month_from_snapshot(key, snapshot):
+    """ProcessedMonth of a snapshot returned by read_snapshot."""
+    records, meta = snapshot
+    return ProcessedMonth(key, records, meta['insights'], meta['report_tables'], meta['missing_data_html'])
+
+
+class ResultCache:
+    """
+    Processed results keyed by (dataset content hash, ruleset version).
+
+    A file is processed once and every later lookup with the same contents and policy
+    returns the cached ProcessedMonth. The content hash is only recomputed when the
+    file's size or modification time changes. Results of a previous upload at the
+    same path are dropped when a new version is cached. Lookups of cached results
+    never wait for another file being hashed or processed.
+
+    In 'staged' mode the StagePipeline of each cached dataset is kept: when only the
+    holiday calendar changed, the new results rerun just the stages that depend on it.
+
+    With a snapshot_folder, results are also published as shared snapshots
+    (functions.shared_store): a worker process that misses maps the snapshot another
+    worker published instead of processing the file again. The snapshots and the
+    file hashes persist across restarts, so a new process maps the results of an
+    unchanged upload (load_published) without parsing or hashing it.
+    """
+
+    def __init__(self, snapshot_folder=None, max_workers=None):
+        self.snapshot_folder = snapshot_folder
+        self.max_workers = max_workers  # Worker processes of the 'parallel' engine mode
+        self._entries = {}  # key -> ProcessedMonth
+        self._paths = {}  # file path -> key of its cached result
+        self._hashes = self._load_hash_index()  # file path -> (mtime_ns, size, dataset hash)
+        self._key_locks = {}  # key -> lock held while that key is being processed
+        self._pipelines = {}  # dataset hash -> (lock, StagePipeline) of its latest 'staged' run
+        self._lock = threading.Lock()  # Guards _entries, _paths, _key_locks and _pipelines
+        self._hash_lock = threading.Lock()  # Guards _hashes and the hash index file
+
+    def _load_hash_index(self):
+        if self.snapshot_folder is None:
+            return {}
+        try:
+            with open(os.path.join(self.snapshot_folder, HASH_INDEX), 'r', encoding='utf-8') as f:
+                return {path: tuple(entry) for path, entry in json.load(f).items()}
+        except (OSError, ValueError):
+            return {}
+
+    def _save_hash_index(self, removed=()):
+        # Caller holds self._hash_lock. Merges with the entries other worker processes saved, keeps
+        # per file the entry that matches its current size and modification time, and drops files
+        # that changed or no longer exist (and the removed paths)
+        if self.snapshot_folder is None:
+            return
+        saved = self._load_hash_index()
+        merged = {}
+        for path in saved.keys() | self._hashes.keys():
+            if path in removed:
+                continue
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            for entry in (self._hashes.get(path), saved.get(path)):
+                if entry is not None and entry[:2] == (stat.st_mtime_ns, stat.st_size):
+                    merged[path] = entry
+                    break
+        self._hashes = merged
+
+        os.makedirs(self.snapshot_folder, exist_ok=True)
+        write_atomic(os.path.join(self.snapshot_folder, HASH_INDEX), json.dumps(merged))
+
+    def file_hash(self, file_path):
+        """Content hash of a file, recomputed only when its size or modification time changed."""
+        path = os.path.abspath(file_path)
+        stat = os.stat(path)
+        with self._hash_lock:
+            cached = self._hashes.get(path)
+        if cached is None or cached[:2] != (stat.st_mtime_ns, stat.st_size):
+            # Another process may have hashed the file already, e.g. an upload it moved into place
+            cached = self._load_hash_index().get(path)
+        if cached is not None and cached[:2] == (stat.st_mtime_ns, stat.st_size):
+            with self._hash_lock:
+                self._hashes[path] = cached
+            return cached[2]
+
+        # Hash without holding a lock; lookups of other files and cache hits never wait for it
+        content_hash = dataset_hash(path)
+        with self._hash_lock:
+            self._hashes[path] = (stat.st_mtime_ns, stat.st_size, content_hash)
+            self._save_hash_index()
+        return content_hash
+
+    def key_for(self, file_path, engine_mode, hrone_path=None):
+        """Cache key of a biometric file (and HROne register, if any) under the current rules."""
+        content_hash = self.file_hash(file_path)
+        if hrone_path:
+            content_hash = hashlib.sha256((content_hash + self.file_hash(hrone_path)).encode('ascii')).hexdigest()
+        return content_hash, ruleset_version(engine_mode)
+
+    def get(self, file_path, engine_mode, progress=no_progress, hrone_path=None):
+        """
+        Returns the processed results of a biometric file, processing it on a miss.
+
+        Args:
+            file_path (str): Path of the biometric CSV export
+            engine_mode (str): Engine mode passed to run_attendance_pipeline
+            progress (callable): Stage callback passed to process_month
+            hrone_path (str): Optional HROne register merged into the biometric records
+
+        Returns:
+            ProcessedMonth: Cached or freshly processed results
+        """
+        key = self.key_for(file_path, engine_mode, hrone_path)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                return entry
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+
+        # Only requests for the same key wait while it is processed
+        with key_lock:
+            with self._lock:
+                entry = self._entries.get(key)
+            if entry is not None:
+                return entry
+
+            entry = self._load_or_process(file_path, engine_mode, key, progress, hrone_path)
+
+            with self._lock:
+                self._store(file_path, key, entry)
+                self._key_locks.pop(key, None)
+            return entry
+
+    def load_published(self, file_path, engine_mode, hrone_path=None):
+        """
+        Maps the published results of a file without ever processing it, e.g. at startup.
+
+        Args:
+            file_path (str): Path of the biometric CSV export
+            engine_mode (str): Engine mode the results were computed with
+            hrone_path (str): Optional HROne register merged into the biometric records
+
+        Returns:
+            ProcessedMonth: Cached results, or None if no snapshot of the file was published
+        """
+        if self.snapshot_folder is None:
+            return None
+
+        key = self.key_for(file_path, engine_mode, hrone_path)
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is not None:
+            return entry
+
+        snapshot = read_snapshot(self.snapshot_folder, snapshot_version(key))
+        if snapshot is None:
+            return None
+        entry = month_from_snapshot(key, snapshot)
+        with self._lock:
+            self._store(file_path, key, entry)
+        return entry
+
+    def move_file(self, file_path, new_path):
+        """
+        Moves a processed file (e.g. a staged upload) to new_path, replacing any file there.
+
+        The content hash and cached results move with the file, so the next lookup of
+        new_path, in this or any other worker process, neither hashes nor processes it.
+
+        Args:
+            file_path (str): Current path of the file
+            new_path (str): Path to move it to
+        """
+        source, target = os.path.abspath(file_path), os.path.abspath(new_path)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        os.replace(source, target)  # Keeps the modification time and size the hash was recorded with
+
+        with self._hash_lock:
+            content_hash = self._hashes.pop(source, None)
+            if content_hash is not None:
+                self._hashes[target] = content_hash
+                self._save_hash_index(removed={source})
+        with self._lock:
+            key = self._paths.pop(source, None)
+            if key is not None and key in self._entries:
+                self._store(target, key, self._entries[key])
+
+    def forget_file(self, file_path):
+        """Drops the content hash and cached-result entry of a file, e.g. a discarded staged upload."""
+        path = os.path.abspath(file_path)
+        with self._hash_lock:
+            self._hashes.pop(path, None)
+            self._save_hash_index(removed={path})
+        with self._lock:
+            key = self._paths.pop(path, None)
+            if key is not None and key not in self._paths.values():
+                self._entries.pop(key, None)
+
+    def _store(self, file_path, key, entry):
+        # Caller holds self._lock. Drops the previous version of this file unless another path still uses it
+        path = os.path.abspath(file_path)
+        stale_key = self._paths.get(path)
+        self._entries[key] = entry
+        self._paths[path] = key
+        if stale_key is not None and stale_key not in self._paths.values():
+            self._entries.pop(stale_key, None)
+            if not any(cached[0] == stale_key[0] for cached in self._entries):
+                self._pipelines.pop(stale_key[0], None)
+
+    def _process(self, file_path, engine_mode, key, progress=no_progress, hrone_path=None):
+        """process_month, rerunning the cached StagePipeline of the dataset in 'staged' mode."""
+        if engine_mode != 'staged':
+            return process_month(file_path, engine_mode, key, progress, hrone_path, max_workers=self.max_workers)
+
+        with self._lock:
+            pipeline_lock, pipeline = self._pipelines.setdefault(
+                key[0], (threading.Lock(), StagePipeline()))
+        with pipeline_lock:
+            try:
+                return process_month(file_path, engine_mode, key, progress, hrone_path, pipeline)
+            except Exception:
+                # A failed run leaves the stage outputs incomplete
+                with self._lock:
+                    self._pipelines.pop(key[0], None)
+                raise
+
+    def _load_or_process(self, file_path, engine_mode, key, progress=no_progress, hrone_path=None):
+        """Maps the published snapshot of key, processing and publishing the file if there is none."""
+        if self.snapshot_folder is None:
+            return self._process(file_path, engine_mode, key, progress, hrone_path)
+
+        version = snapshot_version(key)
+        snapshot = read_snapshot(self.snapshot_folder, version)
+        if snapshot is None:
+            month = self._process(file_path, engine_mode, key, progress, hrone_path)
+            progress('publish')
+            publish_snapshot(self.snapshot_folder, version, month)
+            snapshot = read_snapshot(self.snapshot_folder, version)
+            if snapshot is None:
+                # The snapshot could not be published or was already removed again; serve the results in memory
+                return month
+
+        return month_from_snapshot(key, snapshot)
+
+    def invalidate(self):
+        """Drops every cached result."""
+        with self._lock:
+            self._entries.clear()
+            self._paths.clear()
+            self._pipelines.clear()
+        with self._hash_lock:
+            self._hashes.clear()
@@ -0,0 +1,158 @@
+import json
+import os
+import shutil
+import uuid
+
+import numpy as np
+
+from functions.attendance_store import AttendanceStore
+from functions.attendance_vectorized import DashboardSeries
+
+# Layout of a snapshot folder:
+#   <folder>/<version>/meta.json  -> names, days, summaries, insights, rendered tables and the
+#                                    parameters of lazily computed per-day series
+#   <folder>/<version>/<field>.npy -> one employees x days array per per-day field
+# A version is published while its meta.json exists; it is written last and removed first.
+SNAPSHOT_META = 'meta.json'
+KEEP_VERSIONS = 2  # Most recently published versions kept for workers still reading them
+
+
+def snapshot_version(key):
+    """Folder name of a result-cache key (dataset hash, ruleset version)."""
+    content_hash, rules = key
+    return f"{content_hash[:32]}-{rules}"
+
+
+def write_atomic(file_path, text):
+    """Writes a small text file so readers see either the old or the new contents."""
+    staging = f"{file_path}.{uuid.uuid4().hex}.tmp"
+    with open(staging, 'w', encoding='utf-8') as f:
+        f.write(text)
+    os.replace(staging, file_path)
+
+
+def publish_snapshot(folder, version, month):
+    """
+    Writes a processed month as a read-only snapshot shared by every worker process.
+
+    The snapshot is written into a staging folder and renamed into place, so readers
+    never observe a partially written version. Versions are content addressed: if
+    another worker already published the same version, its snapshot is kept.
+    Versions older than the KEEP_VERSIONS most recently published ones are removed.
+
+    Args:
+        folder (str): Snapshot root folder
+        version (str): Version name from snapshot_version
+        month (ProcessedMonth): Processed records, insights and rendered tables
+    """
+    os.makedirs(folder, exist_ok=True)
+    target = os.path.join(folder, version)
+    target_meta = os.path.join(target, SNAPSHOT_META)
+
+    if is_complete(target):
+        # Already published; mark it as recently used so it is not removed
+        os.utime(target_meta)
+    else:
+        if os.path.isdir(target):
+            # Left over from a removal that could not finish, e.g. arrays still mapped on Windows
+            try:
+                os.remove(target_meta)
+            except OSError:
+                pass
+            shutil.rmtree(target, ignore_errors=True)
+
+        records = month.records
+        staging = os.path.join(folder, f".staging-{uuid.uuid4().hex}")
+        os.makedirs(staging)
+
+        for field, array in records.arrays.items():
+            np.save(os.path.join(staging, f"{field}.npy"), np.ascontiguousarray(array))
+
+        meta = {
+            'names': records.names,
+            'employee_ids': records.employee_ids,
+            'days': records.days,
+            'status_labels': records.status_labels,
+            'fields': list(records.arrays),
+            'series': records.series.to_dict() if records.series is not None else None,
+            'summaries': records.summaries,
+            'insights': month.insights,
+            'report_tables': month.report_tables,
+            'missing_data_html': month.missing_data_html,
+        }
+        with open(os.path.join(staging, SNAPSHOT_META), 'w', encoding='utf-8') as f:
+            json.dump(meta, f)
+
+        try:
+            os.rename(staging, target)
+        except OSError:
+            # Another worker published this version first (or the leftover is still in use)
+            shutil.rmtree(staging, ignore_errors=True)
+
+    remove_old_versions(folder)
+
+
+def is_complete(target):
+    """Whether a version folder holds meta.json and every array it lists."""
+    try:
+        with open(os.path.join(target, SNAPSHOT_META), 'r', encoding='utf-8') as f:
+            fields = json.load(f)['fields']
+    except (OSError, ValueError, KeyError):
+        return False
+    return all(os.path.exists(os.path.join(target, f"{field}.npy")) for field in fields)
+
+
+def remove_old_versions(folder, keep=KEEP_VERSIONS):
+    """
+    Removes every version but the keep most recently published ones.
+
+    meta.json is removed first, so a version is unpublished at once even when some of
+    its arrays cannot be deleted yet (a mapped file on Windows); the remaining files
+    are retried on the next publish.
+    """
+    published = []
+    for name in os.listdir(folder):
+        path = os.path.join(folder, name)
+        if not os.path.isdir(path) or name.startswith('.staging-'):
+            continue
+        try:
+            published.append((os.path.getmtime(os.path.join(path, SNAPSHOT_META)), path))
+        except OSError:
+            shutil.rmtree(path, ignore_errors=True)
+
+    published.sort(reverse=True)
+    for _, path in published[keep:]:
+        try:
+            os.remove(os.path.join(path, SNAPSHOT_META))
+        except OSError:
+            continue
+        shutil.rmtree(path, ignore_errors=True)
+
+
+def read_snapshot(folder, version):
+    """
+    Maps a published snapshot without copying its arrays.
+
+    The per-day arrays are opened with np.load(mmap_mode='r'), so every worker
+    reading the same version shares one copy in the OS page cache.
+
+    Args:
+        folder (str): Snapshot root folder
+        version (str): Version name from snapshot_version
+
+    Returns:
+        tuple: (AttendanceStore, meta dict), or None if the version was not published
+        (or was removed while it was being read)
+    """
+    target = os.path.join(folder, version)
+    try:
+        with open(os.path.join(target, SNAPSHOT_META), 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+        arrays = {field: np.load(os.path.join(target, f"{field}.npy"), mmap_mode='r') for field in meta['fields']}
+    except (OSError, ValueError):
+        return None
+
+    series = DashboardSeries(**meta['series']) if meta.get('series') else None
+    records = AttendanceStore(meta['names'], meta['employee_ids'], meta['days'], arrays,
+                              meta['summaries'], meta['status_labels'], series)
+    return records, meta
@@ -0,0 +1,225 @@
+from functions.biometric_function_new import (date_cleaning, status_reset, sunday_finder,
+                                              daily_working_hours_calculation_bulk, fixed_holidays, absent_days,
+                                              calculate_daily_working_hours, missing_punch, recalibrator, half_day,
+                                              calculate_latemark, early_leave, nonworking_days_compoff, overtime,
+                                              saturday_compoff, calculate_metric, finalAdjustment, absentee_map,
+                                              calculate_adherence_ratio, calculate_work_deficit_ratio,
+                                              calculate_adjusted_absentee_rate)
+from functions.holiday_calendar import load_holiday_calendar
+
+
+class Stage:
+    """
+    One stage of the attendance chain with the record fields it reads and writes.
+
+    Args:
+        name (str): Stage name
+        func (callable): Stage function taking the employee dictionary (plus params) and
+                         returning it, or (dictionary, insights) for missing_punch
+        reads (tuple): Record fields the stage reads
+        writes (tuple): Record fields the stage writes, in the order it adds them
+        params (tuple): Pipeline parameters passed to func as keyword arguments
+    """
+
+    def __init__(self, name, func, reads, writes, params=()):
+        self.name = name
+        self.func = func
+        self.reads = reads
+        self.writes = writes
+        self.params = params
+
+    def run(self, employee_dict, params):
+        """Runs the stage; returns (employee_dict, insights or None)."""
+        result = self.func(employee_dict, **{name: params[name] for name in self.params})
+        return result if isinstance(result, tuple) else (result, None)
+
+
+# The reference chain (run_reference_pipeline) with the fields each stage reads and writes
+REFERENCE_STAGES = (
+    Stage('date_cleaning', date_cleaning, ('Days', 'Status', 'InTime', 'OutTime', 'employee_id'),
+          ('Status', 'InTime', 'OutTime', 'EmployeeID', 'Days')),
+    Stage('status_reset', status_reset, ('Status',), ('Status',)),
+    Stage('sunday_finder', sunday_finder, ('Days', 'Status'), ('Status',)),
+    Stage('daily_working_hours_calculation_bulk', daily_working_hours_calculation_bulk,
+          ('InTime', 'OutTime', 'Status'), ('Status', 'dailyWorkingHours')),
+    Stage('fixed_holidays', fixed_holidays, ('Days', 'Status'), ('Status',), params=('holidays',)),
+    Stage('absent_days', absent_days, ('Status', 'InTime', 'OutTime'), ('Status',)),
+    Stage('calculate_daily_working_hours', calculate_daily_working_hours, ('InTime', 'OutTime'),
+          ('dailyWorkingHours', 'averageWorkingHour', 'averageInTime', 'averageOutTime')),
+    Stage('missing_punch', missing_punch, ('Days', 'Status', 'InTime', 'OutTime', 'averageInTime', 'averageOutTime'),
+          ('Status', 'InTime', 'OutTime')),
+    Stage('recalibrator', recalibrator, ('Days', 'Status', 'InTime', 'OutTime', 'dailyWorkingHours'),
+          ('Status', 'dailyWorkingHours')),
+    Stage('half_day', half_day, ('Days', 'Status', 'dailyWorkingHours'), ('Status', 'halfDayMap', 'halfDayTotal')),
+    Stage('calculate_latemark', calculate_latemark, ('InTime',), ('lateMarkAbsentee', 'lateMark', 'lateMarkCount')),
+    Stage('early_leave', early_leave, ('Status', 'InTime', 'OutTime'),
+          ('earlyLeaveMap', 'earlyLeaveTime', 'totalEarlyLeave', 'incompleteHours'), params=('expected_work_hours',)),
+    Stage('nonworking_days_compoff', nonworking_days_compoff, ('Days', 'Status', 'InTime', 'OutTime'), ('compOff',)),
+    Stage('overtime', overtime, ('Status', 'dailyWorkingHours'), ('overTime', 'actualOverTime', 'payableOverTime'),
+          params=('expected_work_hours',)),
+    Stage('saturday_compoff', saturday_compoff, ('Days', 'Status', 'compOff'), ('Status', 'compOff')),
+    Stage('calculate_metric', calculate_metric, ('Days', 'Status', 'dailyWorkingHours', 'lateMarkAbsentee'),
+          ('reportMetric',)),
+    Stage('finalAdjustment', finalAdjustment, ('reportMetric', 'compOff'), ('compOff', 'reportMetric')),
+    Stage('absentee_map', absentee_map, ('Status',), ('absenteeMap',)),
+    Stage('calculate_adherence_ratio', calculate_adherence_ratio, ('lateMarkCount', 'reportMetric'),
+          ('reportMetric',)),
+    Stage('calculate_work_deficit_ratio', calculate_work_deficit_ratio,
+          ('incompleteHours', 'payableOverTime', 'reportMetric'), ('reportMetric',)),
+    Stage('calculate_adjusted_absentee_rate', calculate_adjusted_absentee_rate, ('reportMetric',), ('reportMetric',)),
+)
+
+
+def _copy_value(value):
+    # Stage functions update lists and the reportMetric dict in place; their elements are scalars
+    if isinstance(value, (list, dict)):
+        return value.copy()
+    return value
+
+
+class StagePipeline:
+    """
+    Runs a chain of stages as a dependency graph and keeps every stage's output.
+
+    A stage depends on the stage that last wrote each field it reads (or on the parsed
+    input) and on its parameters. After run(), rerun() with changed parameters (e.g. a
+    new holiday calendar or expected_work_hours) executes only the stages that depend
+    on a changed parameter, directly or through the fields of another rerun stage; all
+    other stages keep their cached output.
+
+    The stages run level by level (levels()) in the calling thread. Every stage receives
+    its own copies of the fields it reads, so the cached outputs of earlier stages are
+    never modified by a later one.
+    """
+
+    def __init__(self, stages=REFERENCE_STAGES):
+        self.stages = stages
+
+        # producers[i][field] -> index of the stage whose output stage i reads (-1: parsed input)
+        self.producers = []
+        last_writer = {}
+        for stage in stages:
+            self.producers.append({field: last_writer.get(field, -1) for field in stage.reads})
+            for field in stage.writes:
+                last_writer[field] = len(self.producers) - 1
+        self.last_writer = last_writer
+
+        self.params = None
+        self.employees = []
+        self.source = None  # parsed field -> {employee: value}
+        self.outputs = []  # per stage: field -> {employee: value}
+        self.insights = {}  # per stage name: insights returned by the stage
+        self.last_run = []  # names of the stages executed by the latest run / rerun
+
+    def run(self, employee_dict, holidays=None, expected_work_hours=9):
+        """
+        Runs every stage on a parsed month.
+
+        Args:
+            employee_dict (dict): Parsed attendance dictionary from process_attendance_file
+            holidays (HolidayCalendar): Holidays to apply (default: load_holiday_calendar())
+            expected_work_hours (int): Expected working hours per day
+
+        Returns:
+            tuple: (employee_dict, missing_punch_insights), as run_reference_pipeline
+        """
+        self.source = {}
+        for employee, record in employee_dict.items():
+            for field, value in record.items():
+                self.source.setdefault(field, {})[employee] = value
+        self.employees = list(employee_dict.keys())
+        self.outputs = [None] * len(self.stages)
+        self.insights = {}
+        self.params = self._resolve(holidays, expected_work_hours)
+        self._execute(set(range(len(self.stages))))
+        return self.result()
+
+    def rerun(self, holidays=None, expected_work_hours=9):
+        """
+        Recomputes the last month for new parameters, running only the affected stages.
+
+        Returns:
+            tuple: (employee_dict, missing_punch_insights)
+        """
+        if self.params is None:
+            raise ValueError("rerun() needs a previous run()")
+
+        params = self._resolve(holidays, expected_work_hours)
+        changed = {name for name in params if params[name] != self.params[name]}
+        self.params = params
+
+        dirty = set()
+        for i, stage in enumerate(self.stages):
+            if changed.intersection(stage.params) or any(j in dirty for j in self.producers[i].values()):
+                dirty.add(i)
+        self._execute(dirty)
+        return self.result()
+
+    def _resolve(self, holidays, expected_work_hours):
+        return {
+            'holidays': holidays if holidays is not None else load_holiday_calendar(),
+            'expected_work_hours': expected_work_hours,
+        }
+
+    def _inputs(self, i):
+        """Employee dictionary holding copies of the fields stage i reads."""
+        stage_input = {employee: {} for employee in self.employees}
+        for field, producer in self.producers[i].items():
+            values = self.source.get(field) if producer == -1 else self.outputs[producer][field]
+            if values is None:
+                continue
+            for employee, value in values.items():
+                stage_input[employee][field] = _copy_value(value)
+        return stage_input
+
+    def levels(self, stage_indexes):
+        """
+        Groups stages into dependency levels; the stages of a level only read the parsed
+        input or the outputs of earlier levels (or of stages not being run).
+
+        Returns:
+            list: Lists of stage indexes, in execution order
+        """
+        level_of = {}
+        for i in sorted(stage_indexes):
+            level_of[i] = 1 + max((level_of[j] for j in self.producers[i].values() if j in level_of), default=-1)
+
+        levels = [[] for _ in range(max(level_of.values(), default=-1) + 1)]
+        for i, level in level_of.items():
+            levels[level].append(i)
+        return levels
+
+    def _execute(self, stage_indexes):
+        self.last_run = []
+        for level in self.levels(stage_indexes):
+            for i in level:
+                stage = self.stages[i]
+                result, insights = stage.run(self._inputs(i), self.params)
+                self.outputs[i] = {field: {employee: record[field] for employee, record in result.items()
+                                           if field in record}
+                                   for field in stage.writes}
+                if insights is not None:
+                    self.insights[stage.name] = insights
+                else:
+                    self.insights.pop(stage.name, None)
+                self.last_run.append(stage.name)
+
+    def result(self):
+        """
+        Assembles the processed records from the latest output of every field.
+
+        Returns:
+            tuple: (employee_dict, missing_punch_insights)
+        """
+        employee_dict = {employee: {} for employee in self.employees}
+        fields = []
+        for stage in self.stages:
+            fields.extend(field for field in stage.writes if field not in fields)
+        for field in fields:
+            for employee, value in self.outputs[self.last_writer[field]][field].items():
+                employee_dict[employee][field] = _copy_value(value)
+
+        insights = {}
+        for stage_insights in self.insights.values():
+            insights.update(stage_insights)
+        return employee_dict, insights
@@ -0,0 +1,66 @@
+import datetime
+
+# Sentinel for a missing punch / duration in minute lists and int16 minute arrays
+MISSING_MINUTES = -1
+
+MINUTES_PER_DAY = 24 * 60
+
+
+def parse_minutes(value):
+    """
+    Parses a raw punch cell into minutes since midnight.
+
+    Accepts 'HH:MM', 'HH:MM:SS' and 'YYYY-mm-dd HH:MM[:SS]' strings as well as
+    datetime.time / datetime.datetime values; seconds are dropped. Anything else
+    ('NaT', '--:--', blank cells, NaN) is treated as a missing punch.
+
+    Args:
+        value: Raw cell value from a biometric or HROne export
+
+    Returns:
+        int: Minutes since midnight, or MISSING_MINUTES
+    """
+    if isinstance(value, (datetime.datetime, datetime.time)):
+        return value.hour * 60 + value.minute
+    if not isinstance(value, str):
+        return MISSING_MINUTES
+
+    value = value.strip()
+    if ' ' in value:  # Full datetime string, keep the time part
+        value = value.split(' ')[1]
+
+    parts = value.split(':')
+    if len(parts) not in (2, 3):
+        return MISSING_MINUTES
+    try:
+        hours, minutes = int(parts[0]), int(parts[1])
+    except ValueError:
+        return MISSING_MINUTES
+    if not (0 <= hours < 24 and 0 <= minutes < 60):
+        return MISSING_MINUTES
+    return hours * 60 + minutes
+
+
+def duration_minutes(in_minutes, out_minutes):
+    """
+    Minutes worked between two punches, handling an out time on the next day.
+
+    Returns:
+        int: Duration in minutes, or MISSING_MINUTES if either punch is missing
+    """
+    if in_minutes == MISSING_MINUTES or out_minutes == MISSING_MINUTES:
+        return MISSING_MINUTES
+    return (out_minutes - in_minutes) % MINUTES_PER_DAY
+
+
+def format_minutes(minutes):
+    """Formats a minute count as 'HH:MM' ('NaT' for MISSING_MINUTES). Hours may exceed 24."""
+    if minutes == MISSING_MINUTES:
+        return 'NaT'
+    hours, minutes = divmod(int(minutes), 60)
+    return f"{hours:02}:{minutes:02}"
+
+
+def minutes_to_hours(minutes):
+    """Converts a minute count to decimal hours for the charts."""
+    return minutes // 60 + minutes % 60 / 60
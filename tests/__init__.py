@@ -0,0 +1,13 @@
+import os
+
+BIOMETRIC_FOLDER = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                'static', 'resources', 'uploads', 'BIOMETRIC_DATA')
+
+# Bundled monthly exports (empty placeholder files are left out)
+EXPORTS = sorted(os.path.join(BIOMETRIC_FOLDER, file_name) for file_name in os.listdir(BIOMETRIC_FOLDER)
+                 if file_name.endswith('_biometric.csv') and os.path.getsize(os.path.join(BIOMETRIC_FOLDER, file_name)))
+
+
+def export_id(file_path):
+    """Test id of an export, e.g. 'jan_2025'."""
+    return os.path.basename(file_path)[:-len('_biometric.csv')]
@@ -0,0 +1,12 @@
+import pytest
+
+from functions.attendance_engine import ENGINE_MODES, cross_check_pipelines
+from functions.biometric_function_new import process_attendance_file
+from tests import EXPORTS, export_id
+
+
+@pytest.mark.parametrize('mode', ENGINE_MODES)
+@pytest.mark.parametrize('file_path', EXPORTS, ids=export_id)
+def test_engine_mode_matches_reference(file_path, mode):
+    employee_dict = process_attendance_file(file_path, workers=1)
+    assert cross_check_pipelines(employee_dict, mode) == []
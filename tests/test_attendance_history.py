@@ -0,0 +1,87 @@
+import datetime
+
+import numpy as np
+import pytest
+
+from functions.attendance_history import HISTORY_METRICS, AttendanceHistory
+from functions.attendance_warehouse import AttendanceWarehouse
+from functions.multi_month import ingest_biometric_folder
+from tests import BIOMETRIC_FOLDER
+
+DATES = ['2025-01-30', '2025-01-31', '2025-02-03', '2025-02-04', '2025-02-05']
+
+
+@pytest.fixture
+def history():
+    rng = np.random.default_rng(7)
+    metrics = {metric: rng.integers(0, 5, size=(3, len(DATES))) for metric in HISTORY_METRICS}
+    return AttendanceHistory(['A', 'B', 'C'], DATES, metrics), metrics
+
+
+@pytest.mark.parametrize('start, end, columns', [
+    ('2025-01-30', '2025-02-05', slice(0, 5)),
+    ('2025-01-31', '2025-02-04', slice(1, 4)),
+    ('2025-02-01', '2025-02-02', slice(0, 0)),  # between exports
+    ('2025-02-01', '2025-02-03', slice(2, 3)),
+    ('2024-01-01', '2030-01-01', slice(0, 5)),
+    ('2026-01-01', '2026-12-31', slice(0, 0)),
+])
+def test_range_totals_match_direct_sums(history, start, end, columns):
+    index, metrics = history
+    assert index.org_totals(start, end) == {metric: int(values[:, columns].sum()) for metric, values in metrics.items()}
+    assert index.employee_totals('B', start, end) == {metric: int(values[1, columns].sum())
+                                                      for metric, values in metrics.items()}
+    totals = index.all_employee_totals(start, end)
+    for metric, values in metrics.items():
+        assert totals[metric].tolist() == values[:, columns].sum(axis=1).tolist()
+
+
+def test_dates_are_accepted_as_date_objects(history):
+    index, _ = history
+    assert index.org_totals(datetime.date(2025, 1, 31), datetime.date(2025, 2, 4)) == index.org_totals(
+        '2025-01-31', '2025-02-04')
+
+
+@pytest.mark.parametrize('start, end', [('2025-02-05', '2025-01-30'), ('2025-02-30', '2025-03-01'), ('soon', 'later')])
+def test_invalid_ranges_are_rejected(history, start, end):
+    index, _ = history
+    with pytest.raises(ValueError):
+        index.org_totals(start, end)
+
+
+def test_unknown_employee_is_rejected(history):
+    index, _ = history
+    with pytest.raises(ValueError, match='Unknown employee'):
+        index.employee_totals('Z', '2025-01-30', '2025-02-05')
+
+
+def test_empty_warehouse_has_no_totals(tmp_path):
+    index = AttendanceHistory.from_warehouse(AttendanceWarehouse(str(tmp_path / 'attendance.sqlite3')))
+    assert index.org_totals('2025-01-01', '2025-12-31') == {metric: 0 for metric in HISTORY_METRICS}
+
+
+def test_lazy_months_and_the_warehouse_give_the_same_totals(tmp_path):
+    months = ingest_biometric_folder(BIOMETRIC_FOLDER, 'lazy', max_workers=2)
+    warehouse = AttendanceWarehouse(str(tmp_path / 'attendance.sqlite3'))
+    for store in months.months.values():
+        warehouse.load_month(store)
+
+    from_months = AttendanceHistory.from_multi_month(months)
+    from_warehouse = AttendanceHistory.from_warehouse(warehouse)
+    for start, end in (('2024-09-01', '2025-05-31'), ('2024-10-15', '2025-01-15'), ('2025-04-01', '2025-04-30')):
+        assert from_months.org_totals(start, end) == from_warehouse.org_totals(start, end)
+    name = from_months.names[0]
+    assert from_months.employee_totals(name, '2024-09-01', '2025-05-31') == from_warehouse.employee_totals(
+        name, '2024-09-01', '2025-05-31')
+
+
+def test_backfill_loads_the_missing_months_once(tmp_path, monkeypatch):
+    import app as app_module
+
+    warehouse = AttendanceWarehouse(str(tmp_path / 'attendance.sqlite3'))
+    monkeypatch.setattr(app_module, 'attendance_warehouse', warehouse)
+    monkeypatch.setattr(app_module, 'load_saved_paths', lambda: {})
+
+    loaded = app_module.backfill_warehouse()
+    assert loaded == len(warehouse.loaded_periods()) > 0
+    assert app_module.backfill_warehouse() == 0
@@ -0,0 +1,43 @@
+import pytest
+
+from functions import attendance_parallel
+from functions.attendance_engine import run_reference_pipeline
+from functions.attendance_parallel import pack_partition, run_parallel_pipeline, unpack_partition
+from functions.attendance_store import AttendanceStore
+from functions.biometric_function_new import process_attendance_file
+from functions.holiday_calendar import load_holiday_calendar
+from tests import EXPORTS, export_id
+
+
+@pytest.mark.parametrize('file_path', EXPORTS, ids=export_id)
+def test_packed_partition_round_trips(file_path):
+    employee_dict = process_attendance_file(file_path, workers=1)
+    packed = pack_partition(employee_dict)
+    assert isinstance(packed, AttendanceStore)
+    assert unpack_partition(packed) == employee_dict
+
+
+def test_partition_with_mixed_days_is_sent_as_is():
+    employee_dict = {
+        'A': {'employee_id': '1', 'Days': ['1 W'], 'Status': ['P'], 'InTime': [540], 'OutTime': [1080]},
+        'B': {'employee_id': '2', 'Days': ['1 W', '2 T'], 'Status': ['P', 'A'], 'InTime': [540, -1], 'OutTime': [1080, -1]},
+    }
+    assert pack_partition(employee_dict) is employee_dict
+    assert unpack_partition(employee_dict) is employee_dict
+
+
+@pytest.mark.parametrize('file_path', EXPORTS, ids=export_id)
+def test_process_pool_matches_reference(file_path, monkeypatch):
+    # Force the pool path on the small bundled months
+    monkeypatch.setattr(attendance_parallel, 'PARALLEL_MIN_EMPLOYEES', 0)
+    monkeypatch.setattr(attendance_parallel, 'MIN_PARTITION_EMPLOYEES', 1)
+    employee_dict = process_attendance_file(file_path, workers=1)
+    holidays = load_holiday_calendar()
+    if len(employee_dict) < 2:
+        pytest.skip("needs at least two employees to partition")
+
+    assert attendance_parallel.partition_count(len(employee_dict), 3) > 1
+    store, insights = run_parallel_pipeline(employee_dict, holidays, max_workers=3)
+    reference, reference_insights = run_reference_pipeline(employee_dict, holidays)
+    assert store.to_employee_dict() == reference
+    assert insights == reference_insights
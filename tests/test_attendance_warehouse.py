@@ -0,0 +1,86 @@
+import numpy as np
+import pytest
+
+from functions.attendance_engine import run_attendance_pipeline
+from functions.attendance_store import AttendanceStore
+from functions.attendance_warehouse import AttendanceWarehouse, warehouse_rows
+from functions.biometric_function_new import day_date_key, process_attendance_file
+from functions.time_utils import MISSING_MINUTES
+from tests import EXPORTS, export_id
+
+EXPORT_PATHS = {export_id(path): path for path in EXPORTS}
+
+
+def processed(month_key, mode='vectorized'):
+    store, _ = run_attendance_pipeline(process_attendance_file(EXPORT_PATHS[month_key], workers=1), mode)
+    return store
+
+
+def row_count(warehouse):
+    connection = warehouse.connect()
+    try:
+        return connection.execute("SELECT COUNT(*) FROM attendance_day").fetchone()[0]
+    finally:
+        connection.close()
+
+
+@pytest.fixture
+def warehouse(tmp_path):
+    return AttendanceWarehouse(str(tmp_path / 'warehouse' / 'attendance.sqlite3'))
+
+
+def test_load_month_stores_one_row_per_employee_and_dated_day(warehouse):
+    store = processed('jan_2025')
+    dated_days = sum(1 for day in store.days if day_date_key(day))
+    assert warehouse.version() == 0
+    assert warehouse.load_month(store) == len(store.names) * dated_days
+    assert row_count(warehouse) == len(store.names) * dated_days
+    assert warehouse.version() == 1
+    assert warehouse.loaded_periods() == {'2025-01'}
+
+
+def test_rows_hold_the_per_day_results(warehouse):
+    store = processed('jan_2025')
+    warehouse.load_month(store)
+    row = next(i for i, employee_id in enumerate(store.employee_ids) if employee_id)
+    days = warehouse.employee_days(store.employee_ids[row], '2025-01-01', '2025-01-31')
+
+    dated = [column for column, day in enumerate(store.days) if day_date_key(day)]
+    assert [day['date'] for day in days] == [day_date_key(store.days[column]) for column in dated]
+    for day, column in zip(days, dated):
+        in_time = int(store.arrays['InTime'][row, column])
+        assert day['in_time'] == (None if in_time == MISSING_MINUTES else in_time)
+        assert day['late'] == int(store.arrays['lateMark'][row, column])
+        assert day['overtime_minutes'] == int(store.arrays['overTime'][row, column])
+        assert day['status'] == store.status_labels[store.arrays['Status'][row, column]]
+
+
+def test_reloading_a_month_replaces_its_rows(warehouse):
+    january, september = processed('jan_2025'), processed('sep_2024')
+    warehouse.load_month(january)
+    warehouse.load_month(september)
+    total = row_count(warehouse)
+    september_totals = warehouse.daily_totals('2024-09-01', '2024-09-30')
+
+    warehouse.load_month(january)
+    assert row_count(warehouse) == total
+    assert warehouse.version() == 3
+
+    # A corrected export with fewer employees drops the others' rows of that month only
+    corrected = AttendanceStore(january.names[:1], january.employee_ids[:1], january.days,
+                                {field: np.asarray(array)[:1] for field, array in january.arrays.items()},
+                                january.summaries[:1], january.status_labels)
+    warehouse.load_month(corrected)
+    january_rows = warehouse.daily_totals('2025-01-01', '2025-01-31')
+    assert {day['employees'] for day in january_rows} == {1}
+    assert warehouse.daily_totals('2024-09-01', '2024-09-30') == september_totals
+
+
+def test_lazy_and_vectorized_months_load_the_same_rows():
+    assert warehouse_rows(processed('jan_2025', 'lazy')) == warehouse_rows(processed('jan_2025', 'vectorized'))
+
+
+def test_month_without_dated_days_loads_nothing(warehouse):
+    empty = AttendanceStore([], [], [], {}, [])
+    assert warehouse.load_month(empty) == 0
+    assert warehouse.version() == 0
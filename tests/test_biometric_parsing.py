@@ -0,0 +1,23 @@
+import pytest
+
+from functions.biometric_function_new import find_shard_offsets, process_attendance_data
+from tests import EXPORTS, export_id
+
+
+@pytest.mark.parametrize('file_path', EXPORTS, ids=export_id)
+def test_shards_start_on_employee_rows(file_path):
+    offsets = find_shard_offsets(file_path, 4)
+    assert offsets[0] == 0
+    assert offsets == sorted(set(offsets))
+    with open(file_path, 'rb') as file:
+        data = file.read()
+    for offset in offsets[1:]:
+        assert data[offset - 1:offset] == b'\n'
+        assert data[offset:].startswith(b'Employee:,')
+
+
+@pytest.mark.parametrize('file_path', EXPORTS, ids=export_id)
+def test_sharded_parse_matches_single_worker(file_path):
+    expected = process_attendance_data(file_path, workers=1)
+    for workers in (2, 3):
+        assert process_attendance_data(file_path, workers=workers) == expected
@@ -0,0 +1,65 @@
+from functions.fragment_cache import FragmentCache
+
+
+def renderer(size, calls):
+    def render():
+        calls.append(size)
+        return {'cards': 'x' * size}
+    return render
+
+
+def test_hit_returns_cached_fragments_without_rendering():
+    cache, calls = FragmentCache(100), []
+    first = cache.get_or_render(('v1', 'Asha'), renderer(10, calls))
+    assert cache.get_or_render(('v1', 'Asha'), renderer(10, calls)) is first
+    assert calls == [10]
+    assert cache.stats()['hits'] == 1
+    assert cache.stats()['misses'] == 1
+
+
+def test_least_recently_used_entry_is_evicted_first():
+    cache, calls = FragmentCache(100), []
+    cache.get_or_render(('v1', 'A'), renderer(40, calls))
+    cache.get_or_render(('v1', 'B'), renderer(40, calls))
+    cache.get_or_render(('v1', 'A'), renderer(40, calls))  # A is now the most recently used
+    cache.get_or_render(('v1', 'C'), renderer(40, calls))  # evicts B
+
+    assert cache.stats()['evictions'] == 1
+    assert cache.size == 80
+    cache.get_or_render(('v1', 'A'), renderer(40, calls))
+    cache.get_or_render(('v1', 'B'), renderer(40, calls))
+    assert calls == [40, 40, 40, 40]  # only B was rendered again
+
+
+def test_size_never_exceeds_the_bound():
+    cache, calls = FragmentCache(100), []
+    for i in range(20):
+        cache.get_or_render(('v1', i), renderer(30, calls))
+        assert cache.size <= 100
+    assert cache.stats()['entries'] == 3
+    assert cache.stats()['evictions'] == 17
+
+
+def test_fragments_larger_than_the_cache_are_not_kept():
+    cache, calls = FragmentCache(100), []
+    fragments = cache.get_or_render(('v1', 'A'), renderer(150, calls))
+    assert len(fragments['cards']) == 150
+    assert cache.size == 0
+    assert cache.stats()['entries'] == 0
+
+
+def test_dataset_versions_are_cached_separately():
+    cache, calls = FragmentCache(100), []
+    cache.get_or_render(('v1', 'A'), renderer(10, calls))
+    cache.get_or_render(('v2', 'A'), renderer(10, calls))
+    assert calls == [10, 10]
+
+
+def test_clear_drops_entries_and_keeps_counters():
+    cache, calls = FragmentCache(100), []
+    cache.get_or_render(('v1', 'A'), renderer(10, calls))
+    cache.clear()
+    assert cache.size == 0
+    assert cache.stats()['misses'] == 1
+    cache.get_or_render(('v1', 'A'), renderer(10, calls))
+    assert calls == [10, 10]
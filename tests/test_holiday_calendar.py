@@ -0,0 +1,77 @@
+import datetime
+import os
+
+import numpy as np
+import pytest
+
+from functions.holiday_calendar import HolidayCalendar, load_holiday_calendar, read_holiday_file
+
+HOLIDAYS = "site,date,name\ndefault,2025-01-26,Republic Day\ndefault,2024-12-25,Christmas\npune,2025-03-14,Holi\n"
+
+
+def write_holidays(path, text, mtime=None):
+    path.write_text(text, encoding='utf-8')
+    if mtime is not None:
+        os.utime(path, ns=(mtime, mtime))
+    return str(path)
+
+
+def test_holidays_are_compiled_per_site(tmp_path):
+    sites = read_holiday_file(write_holidays(tmp_path / 'holidays.csv', HOLIDAYS))
+    assert sorted(sites) == ['default', 'pune']
+    assert sites['default'].lookup == {'2025-01-26': 'Republic Day', '2024-12-25': 'Christmas'}
+    assert datetime.date(2025, 1, 26) in sites['default']
+    assert datetime.date(2025, 3, 14) not in sites['default']
+    assert datetime.date(2025, 3, 14) in sites['pune']
+
+
+def test_invalid_date_names_the_line(tmp_path):
+    path = write_holidays(tmp_path / 'holidays.csv', "site,date,name\ndefault,2025-13-01,Typo\n")
+    with pytest.raises(ValueError, match='line 2'):
+        read_holiday_file(path)
+
+
+def test_mask_matches_membership():
+    calendar = HolidayCalendar('default', [(datetime.date(2025, 1, 26), 'Republic Day'),
+                                           (datetime.date(2024, 12, 25), 'Christmas')])
+    dates = [datetime.date(2024, 12, 24) + datetime.timedelta(days=n) for n in range(40)]
+    mask = calendar.mask([date.toordinal() for date in dates])
+    assert mask.tolist() == [date in calendar for date in dates]
+    assert mask.sum() == 2
+
+
+def test_empty_calendar_masks_nothing():
+    calendar = HolidayCalendar('default', [])
+    assert len(calendar) == 0
+    assert not calendar.mask(np.arange(738000, 738010)).any()
+
+
+def test_fingerprint_follows_the_holiday_list():
+    christmas = [(datetime.date(2024, 12, 25), 'Christmas')]
+    assert HolidayCalendar('default', christmas).fingerprint == HolidayCalendar('default', christmas).fingerprint
+    assert HolidayCalendar('default', christmas).fingerprint != HolidayCalendar('pune', christmas).fingerprint
+    renamed = [(datetime.date(2024, 12, 25), 'Xmas')]
+    assert HolidayCalendar('default', christmas).fingerprint != HolidayCalendar('default', renamed).fingerprint
+
+
+def test_unchanged_file_is_not_read_again(tmp_path):
+    path = write_holidays(tmp_path / 'holidays.csv', HOLIDAYS)
+    assert load_holiday_calendar(file_path=path) is load_holiday_calendar(file_path=path)
+
+
+def test_edited_file_is_reloaded(tmp_path):
+    path = write_holidays(tmp_path / 'holidays.csv', HOLIDAYS, mtime=1_000_000_000_000_000_000)
+    before = load_holiday_calendar(file_path=path)
+
+    write_holidays(tmp_path / 'holidays.csv', HOLIDAYS + "default,2025-08-15,Independence Day\n",
+                   mtime=1_000_000_001_000_000_000)
+    after = load_holiday_calendar(file_path=path)
+    assert after is not before
+    assert datetime.date(2025, 8, 15) in after
+    assert after.fingerprint != before.fingerprint
+
+
+def test_unknown_site_lists_the_available_ones(tmp_path):
+    path = write_holidays(tmp_path / 'holidays.csv', HOLIDAYS)
+    with pytest.raises(ValueError, match='default, pune'):
+        load_holiday_calendar('mumbai', file_path=path)
@@ -0,0 +1,73 @@
+import copy
+
+from functions.hrone_functions import calendar_date_key, merge_hrone_records
+from functions.time_utils import MISSING_MINUTES
+
+M = MISSING_MINUTES
+BIOMETRIC_DAYS = ['1 W (01 January 2025, Wednesday)', '2 T (02 January 2025, Thursday)',
+                  '3 F (03 January 2025, Friday)']
+
+
+def biometric_month():
+    return {
+        'Asha': {'employee_id': '1', 'Days': BIOMETRIC_DAYS, 'Status': ['P', 'A', 'P'],
+                 'InTime': [540, M, M], 'OutTime': [M, M, 1080]},
+        'Ravi': {'employee_id': '2', 'Days': BIOMETRIC_DAYS, 'Status': ['P', 'P', 'P'],
+                 'InTime': [545, 550, 555], 'OutTime': [1085, 1090, 1095]},
+    }
+
+
+def hrone_month():
+    # Other day order, one extra date and one employee the biometric export does not list
+    days = ['03 Jan 2025', '01 Jan 2025', '04 Jan 2025']
+    return {
+        'Asha': {'Days': days, 'InTime': [600, 530, 500], 'OutTime': [1100, 1070, 1000]},
+        'Meera': {'Days': days, 'InTime': [610, 620, M], 'OutTime': [1110, 1120, M]},
+    }
+
+
+def test_date_keys_of_both_label_formats():
+    assert calendar_date_key('1 W (01 January 2025, Wednesday)') == '2025-01-01'
+    assert calendar_date_key('01 Jan 2025') == '2025-01-01'
+    assert calendar_date_key('Total') is None
+
+
+def test_missing_punches_are_filled_by_date():
+    employee_dict, stats = merge_hrone_records(biometric_month(), hrone_month())
+
+    # 01 Jan: InTime kept, OutTime filled; 02 Jan: not in HROne; 03 Jan: InTime filled, OutTime kept
+    assert employee_dict['Asha']['InTime'] == [540, M, 600]
+    assert employee_dict['Asha']['OutTime'] == [1070, M, 1080]
+    assert employee_dict['Ravi'] == biometric_month()['Ravi']
+    assert stats['filled_in_times'] == 1
+    assert stats['filled_out_times'] == 1
+    assert stats['matched_employees'] == 1
+    assert stats['hrone_only_employees'] == 1
+    assert stats['shared_dates'] == 2
+    assert stats['biometric_only_dates'] == 1
+    assert stats['hrone_only_dates'] == 1
+    assert stats['missing_punches_before'] - stats['missing_punches_after'] == 2
+
+
+def test_hrone_only_employees_take_the_layout_days():
+    employee_dict, _ = merge_hrone_records(biometric_month(), hrone_month(), layout_days=BIOMETRIC_DAYS)
+    assert employee_dict['Meera'] == {
+        'employee_id': '',
+        'Days': BIOMETRIC_DAYS,
+        'Status': ['NaT'] * 3,
+        'InTime': [620, M, 610],
+        'OutTime': [1120, M, 1110],
+    }
+
+
+def test_hrone_only_employees_are_appended_as_they_are_without_layout():
+    hrone = hrone_month()
+    employee_dict, _ = merge_hrone_records(biometric_month(), hrone)
+    assert employee_dict['Meera'] == hrone['Meera']
+
+
+def test_hrone_dictionary_is_not_modified():
+    hrone = hrone_month()
+    before = copy.deepcopy(hrone)
+    merge_hrone_records(biometric_month(), hrone, layout_days=BIOMETRIC_DAYS)
+    assert hrone == before
@@ -0,0 +1,49 @@
+import os
+from types import SimpleNamespace
+
+from functions.biometric_function_new import process_attendance_file
+from functions.hrone_functions import dict_cleaning_hrone, merge_hrone_records, process_employee_hroneData
+from functions.ingestion import ingest_month
+from tests import BIOMETRIC_FOLDER
+
+BIOMETRIC_EXPORT = os.path.join(BIOMETRIC_FOLDER, 'jan_2025_biometric.csv')
+HRONE_REGISTER = os.path.join(os.path.dirname(BIOMETRIC_FOLDER), 'HRONE_DATA', 'JanuaryHrone.xlsx')
+
+
+def test_biometric_only_month():
+    employee_dict, stats = ingest_month(BIOMETRIC_EXPORT)
+    assert stats is None
+    assert employee_dict == process_attendance_file(BIOMETRIC_EXPORT)
+
+
+def test_concurrent_hrone_load_matches_sequential_merge():
+    employee_dict, stats = ingest_month(BIOMETRIC_EXPORT, HRONE_REGISTER)
+
+    biometric = process_attendance_file(BIOMETRIC_EXPORT)
+    layout_days = next(iter(biometric.values()))['Days']
+    expected, expected_stats = merge_hrone_records(biometric, dict_cleaning_hrone(process_employee_hroneData(HRONE_REGISTER)),
+                                                   layout_days)
+    assert employee_dict == expected
+    assert stats == expected_stats
+    assert stats['filled_in_times'] + stats['filled_out_times'] > 0
+
+
+def test_upload_stages_the_hrone_register(monkeypatch):
+    import app as app_module
+
+    submitted = []
+    monkeypatch.setattr(app_module.processing_jobs, 'submit',
+                        lambda task, *args: submitted.append(args) or SimpleNamespace(job_id='test'))
+    with open(BIOMETRIC_EXPORT, 'rb') as biometric, open(HRONE_REGISTER, 'rb') as hrone:
+        response = app_module.app.test_client().post('/upload', content_type='multipart/form-data', data={
+            'biometric_file': (biometric, 'jan_2025_biometric.csv'),
+            'hrone_file': (hrone, 'JanuaryHrone.xlsx'),
+        })
+    assert response.status_code == 200
+
+    _, staged_paths, file_paths = submitted[0]
+    try:
+        assert file_paths['hrone_path'] == os.path.join(app_module.app.config['UPLOAD_FOLDER_HRONE'], 'JanuaryHrone.xlsx')
+        assert os.path.exists(staged_paths['hrone_path'])
+    finally:
+        app_module.discard_staged(staged_paths)
@@ -0,0 +1,96 @@
+import os
+import threading
+import time
+
+import pytest
+
+from functions.processing_jobs import JOB_STAGES, JobRunner, ProcessingJob
+
+
+def wait_for(runner, job_id, timeout=10):
+    """Polls a job's status file until it is done or failed."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        status = runner.status(job_id)
+        if status['state'] in ('done', 'failed'):
+            return status
+        time.sleep(0.01)
+    raise AssertionError(f"job {job_id} did not finish")
+
+
+def test_new_job_is_queued_with_pending_stages(tmp_path):
+    job = ProcessingJob('abc123', str(tmp_path))
+    status = JobRunner(str(tmp_path)).status('abc123')
+    assert status['state'] == 'queued'
+    assert list(status['stages']) == list(JOB_STAGES)
+    assert all(stage['state'] == 'pending' for stage in status['stages'].values())
+    assert job.to_dict() == status
+
+
+def test_job_reports_stages_and_skips_unused_ones(tmp_path):
+    runner = JobRunner(str(tmp_path))
+    started = threading.Event()
+    release = threading.Event()
+
+    def task(job, total):
+        job.start_stage('parse')
+        job.start_stage('rules', total=total)
+        job.advance(total)
+        started.set()
+        release.wait(5)
+
+    job = runner.submit(task, 3)
+    assert started.wait(5)
+    running = runner.status(job.job_id)
+    assert running['state'] == 'running'
+    assert running['current_stage'] == 'rules'
+    assert running['stages']['rules'] == {'state': 'running', 'done': 3, 'total': 3, 'seconds': None}
+    assert running['stages']['parse']['state'] == 'done'
+
+    release.set()
+    status = wait_for(runner, job.job_id)
+    assert status['state'] == 'done'
+    assert status['current_stage'] is None
+    assert status['stages']['rules']['state'] == 'done'
+    assert status['stages']['publish']['state'] == 'skipped'
+    assert status['error'] is None
+
+
+def test_failed_job_marks_its_stage_and_keeps_the_error(tmp_path):
+    runner = JobRunner(str(tmp_path))
+
+    def task(job):
+        job.start_stage('parse')
+        raise ValueError("bad export")
+
+    job = runner.submit(task)
+    status = wait_for(runner, job.job_id)
+    assert status['state'] == 'failed'
+    assert status['error'] == "bad export"
+    assert status['stages']['parse']['state'] == 'failed'
+    assert status['stages']['rules']['state'] == 'pending'
+
+
+def test_next_job_runs_after_a_failure(tmp_path):
+    runner = JobRunner(str(tmp_path))
+    failing = runner.submit(lambda job: 1 / 0)
+    following = runner.submit(lambda job: None)
+    assert wait_for(runner, failing.job_id)['state'] == 'failed'
+    assert wait_for(runner, following.job_id)['state'] == 'done'
+
+
+@pytest.mark.parametrize('job_id', ['missing0', '../etc/passwd', 'ABC'])
+def test_unknown_or_invalid_job_ids_have_no_status(tmp_path, job_id):
+    assert JobRunner(str(tmp_path)).status(job_id) is None
+
+
+def test_only_old_status_files_are_removed(tmp_path):
+    runner = JobRunner(str(tmp_path))
+    ProcessingJob('0a0a', str(tmp_path))
+    ProcessingJob('1b1b', str(tmp_path))
+    an_hour_ago = time.time() - 3600
+    os.utime(os.path.join(str(tmp_path), '0a0a.json'), (an_hour_ago, an_hour_ago))
+
+    runner.remove_old_status(max_age=60)
+    assert runner.status('0a0a') is None
+    assert runner.status('1b1b')['state'] == 'queued'
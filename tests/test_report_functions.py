@@ -0,0 +1,65 @@
+import os
+import re
+
+import pandas as pd
+import pytest
+
+from functions import report_functions
+from functions.attendance_engine import run_attendance_pipeline
+from functions.biometric_function_new import process_attendance_file
+from functions.report_functions import (PANDAS_HTML_VERSION, REPORT_ROLES, mirrors_installed_pandas,
+                                        render_report_table, report_columns, write_html_table)
+from tests import EXPORTS, export_id
+
+REQUIREMENTS = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'requirements.txt')
+
+# The direct writer is only compared with the pandas release it reproduces
+mirrored_pandas = pytest.mark.skipif(not mirrors_installed_pandas(),
+                                     reason=f"write_html_table reproduces pandas {PANDAS_HTML_VERSION}")
+
+
+def pandas_html(table, headers):
+    return pd.DataFrame(table).rename(columns=headers).to_html(index=False)
+
+
+def test_requirements_pin_the_mirrored_pandas_release():
+    with open(REQUIREMENTS) as f:
+        pinned = re.search(r'^pandas==(\S+)', f.read(), re.MULTILINE).group(1)
+    assert pinned.split('.')[:2] == PANDAS_HTML_VERSION.split('.')
+
+
+@mirrored_pandas
+@pytest.mark.parametrize('role', sorted(REPORT_ROLES))
+@pytest.mark.parametrize('file_path', EXPORTS, ids=export_id)
+def test_report_table_matches_pandas(file_path, role):
+    employee_dict, _ = run_attendance_pipeline(process_attendance_file(file_path, workers=1), 'vectorized')
+    columns, headers = REPORT_ROLES[role]
+    table = report_columns(employee_dict, columns)
+    html = write_html_table(table, headers)
+    assert html is not None
+    assert html == pandas_html(table, headers)
+
+
+@mirrored_pandas
+def test_html_table_escapes_and_formats_like_pandas():
+    table = {
+        'Employee': ['A & B', '<C>', 'D "E"'],
+        'Days': [20, 0, 31],
+        'Hours': [7.5, 8.0, 0.125],
+        'Ratio': [1, 2.25, 3],
+    }
+    headers = {'Hours': 'Avg <hours>'}
+    assert write_html_table(table, headers) == pandas_html(table, headers)
+
+
+def test_unsupported_values_are_left_to_pandas():
+    assert write_html_table({'Employee': ['A'], 'Ratio': [float('nan')]}, {}) is None
+    assert write_html_table({'Employee': ['A'], 'Ratio': [1e7]}, {}) is None
+
+
+def test_other_pandas_releases_render_with_pandas(monkeypatch):
+    employee_dict, _ = run_attendance_pipeline(process_attendance_file(EXPORTS[0], workers=1), 'vectorized')
+    monkeypatch.setattr(report_functions, 'PANDAS_HTML_VERSION', '0.0')
+    monkeypatch.setattr(report_functions, 'write_html_table', lambda table, headers: pytest.fail('direct writer used'))
+    columns, headers = REPORT_ROLES['admin']
+    assert render_report_table(employee_dict, 'admin') == pandas_html(report_columns(employee_dict, columns), headers)
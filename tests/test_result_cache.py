@@ -0,0 +1,84 @@
+import json
+import os
+import shutil
+
+import pytest
+
+from functions import result_cache
+from functions.result_cache import HASH_INDEX, ResultCache
+from tests import EXPORTS
+
+
+@pytest.fixture
+def uploads(tmp_path):
+    """Copies of two bundled exports in a temporary upload folder."""
+    folder = tmp_path / 'uploads'
+    folder.mkdir()
+    paths = []
+    for source in EXPORTS[:2]:
+        path = str(folder / os.path.basename(source))
+        shutil.copy2(source, path)
+        paths.append(path)
+    return paths
+
+
+def fail(*args, **kwargs):
+    raise AssertionError("unexpected call")
+
+
+def saved_index(snapshot_folder):
+    with open(os.path.join(snapshot_folder, HASH_INDEX), 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def test_restarted_cache_maps_published_results_without_hashing_or_processing(tmp_path, uploads, monkeypatch):
+    snapshot_folder = str(tmp_path / 'results')
+    month = ResultCache(snapshot_folder).get(uploads[0], 'lazy')
+
+    monkeypatch.setattr(result_cache, 'dataset_hash', fail)
+    monkeypatch.setattr(result_cache, 'process_month', fail)
+    restarted = ResultCache(snapshot_folder).load_published(uploads[0], 'lazy')
+
+    assert restarted.key == month.key
+    assert restarted.report_tables == month.report_tables
+    assert restarted.records.to_employee_dict() == month.records.to_employee_dict()
+
+
+def test_nothing_published_maps_nothing(tmp_path, uploads, monkeypatch):
+    monkeypatch.setattr(result_cache, 'process_month', fail)
+    assert ResultCache(str(tmp_path / 'results')).load_published(uploads[0], 'lazy') is None
+
+
+def test_hash_index_merges_the_entries_of_every_process(tmp_path, uploads):
+    snapshot_folder = str(tmp_path / 'results')
+    ResultCache(snapshot_folder).file_hash(uploads[0])
+    ResultCache(snapshot_folder).file_hash(uploads[1])
+    assert sorted(saved_index(snapshot_folder)) == sorted(os.path.abspath(path) for path in uploads)
+
+
+def test_hash_index_drops_removed_and_changed_files(tmp_path, uploads):
+    snapshot_folder = str(tmp_path / 'results')
+    cache = ResultCache(snapshot_folder)
+    first_hash = cache.file_hash(uploads[0])
+    cache.file_hash(uploads[1])
+
+    os.remove(uploads[1])
+    with open(uploads[0], 'a', encoding='utf-8') as f:
+        f.write('\n')
+    assert ResultCache(snapshot_folder).file_hash(uploads[0]) != first_hash
+
+    index = saved_index(snapshot_folder)
+    assert sorted(index) == [os.path.abspath(uploads[0])]
+    assert index[os.path.abspath(uploads[0])][2] != first_hash
+
+
+def test_moved_file_keeps_its_hash(tmp_path, uploads, monkeypatch):
+    snapshot_folder = str(tmp_path / 'results')
+    cache = ResultCache(snapshot_folder)
+    content_hash = cache.file_hash(uploads[0])
+    target = str(tmp_path / 'final' / os.path.basename(uploads[0]))
+    cache.move_file(uploads[0], target)
+
+    monkeypatch.setattr(result_cache, 'dataset_hash', fail)
+    assert ResultCache(snapshot_folder).file_hash(target) == content_hash
+    assert list(saved_index(snapshot_folder)) == [os.path.abspath(target)]
@@ -0,0 +1,87 @@
+import os
+
+import numpy as np
+import pytest
+
+from functions.result_cache import process_month
+from functions.shared_store import (KEEP_VERSIONS, SNAPSHOT_META, is_complete, publish_snapshot, read_snapshot,
+                                    remove_old_versions)
+from tests import EXPORTS
+
+
+@pytest.fixture(scope='module')
+def month():
+    return process_month(EXPORTS[0], 'lazy')
+
+
+def set_mtime(path, seconds):
+    os.utime(path, (seconds, seconds))
+
+
+def test_published_snapshot_reads_back(tmp_path, month):
+    folder = str(tmp_path)
+    publish_snapshot(folder, 'v1', month)
+    records, meta = read_snapshot(folder, 'v1')
+
+    assert records.names == month.records.names
+    assert records.days == month.records.days
+    for field, array in month.records.arrays.items():
+        assert isinstance(records.arrays[field], np.memmap)
+        assert np.array_equal(records.arrays[field], array)
+    assert records.to_employee_dict() == month.records.to_employee_dict()
+    assert meta['report_tables'] == month.report_tables
+    assert meta['missing_data_html'] == month.missing_data_html
+
+
+def test_unpublished_or_damaged_versions_read_as_none(tmp_path, month):
+    folder = str(tmp_path)
+    assert read_snapshot(folder, 'missing') is None
+
+    publish_snapshot(folder, 'v1', month)
+    os.remove(os.path.join(folder, 'v1', 'Status.npy'))
+    assert not is_complete(os.path.join(folder, 'v1'))
+    assert read_snapshot(folder, 'v1') is None
+
+
+def test_incomplete_leftover_is_rebuilt(tmp_path, month):
+    folder = str(tmp_path)
+    publish_snapshot(folder, 'v1', month)
+    os.remove(os.path.join(folder, 'v1', 'InTime.npy'))
+
+    publish_snapshot(folder, 'v1', month)
+    assert is_complete(os.path.join(folder, 'v1'))
+    assert read_snapshot(folder, 'v1') is not None
+
+
+def test_republishing_keeps_the_existing_version(tmp_path, month):
+    folder = str(tmp_path)
+    publish_snapshot(folder, 'v1', month)
+    array_path = os.path.join(folder, 'v1', 'Status.npy')
+    set_mtime(array_path, 1_000_000)
+
+    publish_snapshot(folder, 'v1', month)
+    assert os.path.getmtime(array_path) == 1_000_000
+    assert not [name for name in os.listdir(folder) if name.startswith('.staging-')]
+
+
+def test_only_the_most_recently_published_versions_are_kept(tmp_path, month):
+    folder = str(tmp_path)
+    for n, version in enumerate(('v1', 'v2')):
+        publish_snapshot(folder, version, month)
+        set_mtime(os.path.join(folder, version, SNAPSHOT_META), 1_000_000 + n)
+
+    # Publishing v1 again makes it the most recently used version, so v3 replaces v2
+    publish_snapshot(folder, 'v1', month)
+    publish_snapshot(folder, 'v3', month)
+    assert KEEP_VERSIONS == 2
+    assert sorted(os.listdir(folder)) == ['v1', 'v3']
+
+
+def test_folders_without_meta_are_removed(tmp_path, month):
+    folder = str(tmp_path)
+    publish_snapshot(folder, 'v1', month)
+    os.makedirs(os.path.join(folder, 'broken'))
+    os.makedirs(os.path.join(folder, '.staging-inprogress'))
+
+    remove_old_versions(folder)
+    assert sorted(os.listdir(folder)) == ['.staging-inprogress', 'v1']
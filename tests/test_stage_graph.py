@@ -0,0 +1,86 @@
+import copy
+import datetime
+
+import pytest
+
+from functions.attendance_engine import run_reference_pipeline
+from functions.biometric_function_new import process_attendance_file
+from functions.holiday_calendar import HolidayCalendar, load_holiday_calendar
+from functions.stage_graph import StagePipeline
+from tests import EXPORTS, export_id
+
+
+def stage_levels(pipeline):
+    return [[pipeline.stages[i].name for i in level] for level in pipeline.levels(range(len(pipeline.stages)))]
+
+
+def test_independent_stages_share_a_level():
+    levels = stage_levels(StagePipeline())
+    assert ['early_leave', 'nonworking_days_compoff', 'overtime'] in levels
+
+
+def test_stages_updating_the_same_field_run_in_order():
+    levels = stage_levels(StagePipeline())
+    ratio_stages = ('calculate_adherence_ratio', 'calculate_work_deficit_ratio', 'calculate_adjusted_absentee_rate')
+    positions = [next(n for n, level in enumerate(levels) if name in level) for name in ratio_stages]
+    assert positions == sorted(set(positions))
+
+
+@pytest.mark.parametrize('file_path', EXPORTS, ids=export_id)
+def test_run_matches_reference(file_path):
+    employee_dict = process_attendance_file(file_path, workers=1)
+    holidays = load_holiday_calendar()
+    pipeline = StagePipeline()
+    assert pipeline.run(copy.deepcopy(employee_dict), holidays) == run_reference_pipeline(employee_dict, holidays)
+    assert pipeline.last_run == [name for level in stage_levels(pipeline) for name in level]
+
+
+def with_holiday(holidays, date, name):
+    """Copy of a holiday calendar with one more holiday."""
+    listing = [(datetime.date.fromisoformat(date_key), holiday) for date_key, holiday in holidays.lookup.items()]
+    return HolidayCalendar(holidays.site, listing + [(datetime.date.fromisoformat(date), name)])
+
+
+def jan_2025():
+    return process_attendance_file(next(path for path in EXPORTS if export_id(path) == 'jan_2025'), workers=1)
+
+
+def test_rerun_needs_a_run():
+    with pytest.raises(ValueError):
+        StagePipeline().rerun(load_holiday_calendar())
+
+
+def test_rerun_with_unchanged_parameters_runs_nothing():
+    holidays = load_holiday_calendar()
+    pipeline = StagePipeline()
+    expected = pipeline.run(jan_2025(), holidays)
+    assert pipeline.rerun(holidays) == expected
+    assert pipeline.last_run == []
+
+
+def test_rerun_after_holiday_change_runs_only_dependent_stages():
+    employee_dict = jan_2025()
+    holidays = load_holiday_calendar()
+    pipeline = StagePipeline()
+    pipeline.run(copy.deepcopy(employee_dict), holidays)
+
+    edited = with_holiday(holidays, '2025-01-15', 'Test holiday')
+    result = pipeline.rerun(edited)
+
+    assert result == run_reference_pipeline(employee_dict, edited)
+    assert 'fixed_holidays' in pipeline.last_run
+    for name in ('date_cleaning', 'status_reset', 'sunday_finder', 'daily_working_hours_calculation_bulk',
+                 'calculate_daily_working_hours'):
+        assert name not in pipeline.last_run
+
+
+def test_rerun_after_expected_hours_change_starts_at_the_hour_rules():
+    pipeline = StagePipeline()
+    holidays = load_holiday_calendar()
+    pipeline.run(jan_2025(), holidays)
+    pipeline.rerun(holidays, expected_work_hours=8)
+    assert pipeline.last_run[:2] == ['early_leave', 'overtime']
+    assert 'fixed_holidays' not in pipeline.last_run
+
+    fresh = StagePipeline()
+    assert pipeline.result() == fresh.run(jan_2025(), holidays, expected_work_hours=8)